@@ -0,0 +1,15 @@
+PATHFINDERS = ("astar", "hpa")
+
+
+def get_pathfinder(name="astar"):
+    """
+    Path search function by name, all with the signature of ai.pathfinding.astar.astar:
+    "astar" searches every cell, "hpa" uses the cluster hierarchy of ai.pathfinding.hpa.
+    """
+    if name == "astar":
+        from ai.pathfinding.astar import astar
+        return astar
+    if name == "hpa":
+        from ai.pathfinding.hpa import astar
+        return astar
+    raise ValueError(f"Unknown pathfinder {name!r}, expected one of {PATHFINDERS}")
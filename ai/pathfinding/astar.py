@@ -1,48 +1,138 @@
 import heapq
 from utils.enums import CellType
 
-def heuristic(a, b):
-    """Calculate Manhattan distance (suitable for grid-based movement)"""
-    return abs(a[0] - b[0]) + abs(a[1] - b[1])
+# Cell types each role may step into, mirroring Grid.get_neighbors / get_knight_neighbors
+ROLE_PASSABLE = {
+    "default": {CellType.EMPTY, CellType.TREASURE, CellType.HIDEOUT},
+    "knight": {CellType.EMPTY, CellType.HUNTER},
+}
+# The same sets as lookup tables indexed by CellType value
+PASSABLE_CODES = {
+    role: tuple(cell_type in passable for cell_type in sorted(CellType, key=lambda t: t.value))
+    for role, passable in ROLE_PASSABLE.items()
+}
 
-def astar(grid, start, goal, role="default"):
+
+def heuristic(a, b, size=None):
+    """
+    Manhattan distance between two positions. With the grid size given, distances are
+    measured the short way around the torus, so the estimate never overshoots across the seam.
+    """
+    dx = abs(a[0] - b[0])
+    dy = abs(a[1] - b[1])
+    if size is not None:
+        dx = min(dx, size - dx)
+        dy = min(dy, size - dy)
+    return dx + dy
+
+
+class SearchSpace:
+    """
+    Per-grid A* buffers indexed by flat cell index (y * size + x), allocated once and reused.
+    Entries are only valid when their stamp equals the current search generation,
+    so starting a new search never has to clear the arrays.
+    """
+
+    def __init__(self, size):
+        self.size = size
+        cells = size * size
+        self.g_score = [0] * cells
+        self.parent = [0] * cells
+        self.seen = [0] * cells    # Generation in which g_score/parent were last written
+        self.closed = [0] * cells  # Generation in which the cell was expanded
+        self.generation = 0
+
+    def next_generation(self):
+        self.generation += 1
+        return self.generation
+
+
+def search_space(grid):
+    """The grid's reusable SearchSpace, created on first use."""
+    space = getattr(grid, "_search_space", None)
+    if space is None or space.size != grid.size:
+        space = SearchSpace(grid.size)
+        grid._search_space = space
+    return space
+
+
+def astar(grid, start, goal, role="default", max_nodes=None):
     """
     Finds the shortest path from start to goal using the A* algorithm on a grid.
     :param grid: Grid object
     :param start: (x, y) tuple
     :param goal: (x, y) tuple
+    :param role: "default" (hunters) or "knight", selecting the cells that may be entered
+    :param max_nodes: optional budget of expanded cells; the search gives up (returns [])
+                      when it is exhausted
     :return: path as a list of (x, y) tuples: [(x1, y1), (x2, y2), ...]
     """
-    open_set = []
-    heapq.heappush(open_set, (0, start))
-    came_from = {}
-    g_score = {start: 0}
-    f_score = {start: heuristic(start, goal)}
+    size = grid.size
+    codes = grid.type_codes
+    passable = PASSABLE_CODES[role]
+    goal_x, goal_y = goal
+    goal_index = goal_y * size + goal_x
+    start_index = start[1] * size + start[0]
 
-    while open_set:
-        _, current = heapq.heappop(open_set)
+    path = []
+    expanded = 0
+    # The goal can only be reached by stepping onto it, so an impassable goal has no path
+    if start_index != goal_index and passable[codes[goal_index]]:
+        space = search_space(grid)
+        generation = space.next_generation()
+        g_score = space.g_score
+        parent = space.parent
+        seen = space.seen
+        closed = space.closed
 
-        if current == goal:
-            # Reconstruct path by backtracking from goal
-            path = []
-            while current in came_from:
-                path.append(current)
-                current = came_from[current]
-            path.reverse()
-            return path
+        g_score[start_index] = 0
+        seen[start_index] = generation
+        # Entries are (f, h, index): among equal f, cells closer to the goal are expanded first
+        start_h = heuristic(start, goal, size)
+        open_set = [(start_h, start_h, start_index)]
+        found = False
 
-        # Use different neighbor selection based on role
-        if role == "knight":
-            neighbors = grid.get_knight_neighbors(*current)
-        else:
-            neighbors = grid.get_neighbors(*current)
+        while open_set:
+            _, _, current = heapq.heappop(open_set)
+            if closed[current] == generation:
+                continue  # Stale entry for a cell already expanded with a shorter path
+            closed[current] = generation
+            expanded += 1
 
-        for neighbor in neighbors:
+            if current == goal_index:
+                found = True
+                break
+            if max_nodes is not None and expanded >= max_nodes:
+                break
+
+            x = current % size
+            y = current // size
+            row = current - x
             tentative_g = g_score[current] + 1
-            if neighbor not in g_score or tentative_g < g_score[neighbor]:
-                came_from[neighbor] = current
+            # Same neighbor order as Grid.get_neighbors: left, right, up, down (wrapping)
+            for neighbor in (row + (x - 1) % size, row + (x + 1) % size,
+                             ((y - 1) % size) * size + x, ((y + 1) % size) * size + x):
+                if not passable[codes[neighbor]] or closed[neighbor] == generation:
+                    continue
+                if seen[neighbor] == generation and g_score[neighbor] <= tentative_g:
+                    continue
+                seen[neighbor] = generation
                 g_score[neighbor] = tentative_g
-                f_score[neighbor] = tentative_g + heuristic(neighbor, goal)
-                heapq.heappush(open_set, (f_score[neighbor], neighbor))
+                parent[neighbor] = current
+                dx = abs(neighbor % size - goal_x)
+                dy = abs(neighbor // size - goal_y)
+                h = min(dx, size - dx) + min(dy, size - dy)
+                heapq.heappush(open_set, (tentative_g + h, h, neighbor))
+
+        if found:
+            # Reconstruct path by backtracking from goal
+            current = goal_index
+            while current != start_index:
+                path.append((current % size, current // size))
+                current = parent[current]
+            path.reverse()
 
-    return []
+    if grid.instrumentation is not None:
+        grid.instrumentation.count("astar_calls")
+        grid.instrumentation.count("astar_nodes", expanded)
+    return path
@@ -0,0 +1,149 @@
+from collections import deque
+
+from utils.enums import CellType
+
+UNREACHABLE = -1
+
+# Directions in the same order as Grid.get_neighbors
+DIRECTIONS = [(-1, 0), (1, 0), (0, -1), (0, 1)]
+
+# Field kind -> (cell type of the sources, cell types that may be walked through).
+# The walkable sets follow the safety rules the controllers apply to A* paths:
+# hunters heading for treasure avoid hideouts, knights only cross empty and hunter cells.
+FIELD_KINDS = {
+    "treasure": (CellType.TREASURE, {CellType.EMPTY, CellType.TREASURE}),
+    "hideout": (CellType.HIDEOUT, {CellType.EMPTY, CellType.TREASURE, CellType.HIDEOUT}),
+    "hunter": (CellType.HUNTER, {CellType.EMPTY, CellType.HUNTER}),
+}
+
+
+def _code_table(cell_types):
+    """bytes.translate() table mapping the codes of the given cell types to 1, all others to 0."""
+    codes = {cell_type.value for cell_type in cell_types}
+    return bytes(code in codes for code in range(256))
+
+
+def _is_open_hideout(cell):
+    hideout = cell.content
+    return hideout is not None and len(hideout.hunters) < hideout.capacity
+
+
+class DistanceField:
+    """
+    Multi-source breadth-first distance field over the toroidal grid.
+    Every cell stores the number of moves to the nearest source and which source that is,
+    so an agent can pick its next move with a constant-time gradient lookup.
+    """
+
+    def __init__(self, grid, kind):
+        self.grid = grid
+        self.kind = kind
+        self.source_type, self.walkable = FIELD_KINDS[kind]
+        self._walkable_table = _code_table(self.walkable)
+        # Cells next_step() may move onto, by cell type code
+        self._enterable = _code_table(self.walkable | {self.source_type})
+        size = grid.size
+        self.size = size
+        self.distance = [UNREACHABLE] * (size * size)
+        self.origin = [None] * (size * size)
+        self._build()
+
+    def _is_source(self, cell):
+        if cell.cell_type != self.source_type or cell.content is None:
+            return False
+        if self.source_type == CellType.HIDEOUT:
+            return _is_open_hideout(cell)
+        return True
+
+    def _build(self):
+        size = self.size
+        distance = self.distance
+        origin = self.origin
+        # Both grid backends expose their cell type codes as one flat buffer; the walkable mask
+        # is computed from a snapshot of it in a single translate() pass
+        types = self.grid.type_bytes()
+        walkable = types.translate(self._walkable_table)
+
+        queue = deque()
+        source_code = self.source_type.value
+        index = types.find(source_code)
+        while index != -1:
+            x, y = index % size, index // size
+            if self._is_source(self.grid.get_cell(x, y)):
+                distance[index] = 0
+                origin[index] = (x, y)
+                queue.append((x, y))
+            index = types.find(source_code, index + 1)
+
+        # Cells that are not walkable (e.g. the agents themselves) still receive a distance
+        # so they can look up their next move, but the search does not continue through them.
+        while queue:
+            x, y = queue.popleft()
+            index = y * size + x
+            next_distance = distance[index] + 1
+            source = origin[index]
+            for dx, dy in DIRECTIONS:
+                nx, ny = (x + dx) % size, (y + dy) % size
+                neighbor = ny * size + nx
+                if distance[neighbor] != UNREACHABLE:
+                    continue
+                distance[neighbor] = next_distance
+                origin[neighbor] = source
+                if walkable[neighbor]:
+                    queue.append((nx, ny))
+
+    def distance_at(self, x, y):
+        """Number of moves from (x, y) to the nearest source, or UNREACHABLE."""
+        return self.distance[y * self.size + x]
+
+    def source_at(self, x, y):
+        """Position of the source nearest to (x, y), or None if no source is reachable."""
+        return self.origin[y * self.size + x]
+
+    def is_live_source(self, pos):
+        """Check against the current grid that pos is still a valid source for this field."""
+        cell = self.grid.get_cell(*pos)
+        return cell is not None and self._is_source(cell)
+
+    def next_step(self, x, y):
+        """
+        Follow the gradient one move from (x, y).
+        Returns ((nx, ny), source_pos) or None when no source is reachable or the
+        downhill cells have been occupied since the field was built.
+        """
+        size = self.size
+        current = self.distance[y * size + x]
+        if current <= 0:
+            return None
+
+        codes = self.grid.type_codes
+        enterable = self._enterable
+        for dx, dy in DIRECTIONS:
+            nx, ny = (x + dx) % size, (y + dy) % size
+            neighbor = ny * size + nx
+            if self.distance[neighbor] != current - 1:
+                continue
+            if enterable[codes[neighbor]]:
+                return (nx, ny), self.origin[neighbor]
+        return None
+
+
+class DistanceFieldCache:
+    """
+    Builds each kind of distance field at most once per simulation step, so every agent
+    of a role shares the same sweep. Call invalidate() when a new step starts.
+    """
+
+    def __init__(self, grid):
+        self.grid = grid
+        self._fields = {}
+
+    def get(self, kind):
+        field = self._fields.get(kind)
+        if field is None:
+            field = DistanceField(self.grid, kind)
+            self._fields[kind] = field
+        return field
+
+    def invalidate(self):
+        self._fields.clear()
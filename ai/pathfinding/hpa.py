@@ -0,0 +1,316 @@
+"""
+Hierarchical pathfinding (HPA*) for large grids.
+
+The grid is cut into square clusters. Where two neighboring clusters share passable border
+cells, entrance nodes are placed on both sides; inside each cluster, the distances between
+its entrance nodes are precomputed. A query only searches this small abstract graph and then
+refines each abstract hop with a search limited to one cluster, so long trips no longer
+expand every cell between start and goal. Paths are close to, but not always, the shortest.
+
+Cells that change passability mark their cluster dirty through the grid's listeners, and
+dirty clusters are rebuilt lazily before the next query.
+"""
+import heapq
+from collections import deque
+
+from ai.pathfinding import astar as grid_astar
+from ai.pathfinding.astar import PASSABLE_CODES
+
+CLUSTER_SIZE = 10
+MAX_ENTRANCE_WIDTH = 5  # Longer runs of open border cells get an entrance at both ends
+
+
+class Hierarchy:
+    """Abstract graph of one grid for one role, kept up to date with the grid's cell changes."""
+
+    def __init__(self, grid, role="default", cluster_size=CLUSTER_SIZE):
+        self.grid = grid
+        self.role = role
+        self.size = grid.size
+        self.cluster_size = cluster_size
+        self.clusters_per_side = -(-grid.size // cluster_size)
+        self.passable = PASSABLE_CODES[role]
+
+        count = self.clusters_per_side ** 2
+        self.borders = {}                             # (cluster, "right"|"down") -> [(cell, neighbor cell)]
+        self.links = {}                               # Entrance cell -> set of cells across a border
+        self.entrances = [set() for _ in range(count)]  # Cluster -> entrance cells inside it
+        self.intra = [{} for _ in range(count)]       # Cluster -> {entrance: [(other, distance)]}
+        # Clusters whose intra distances and borders whose entrances need rebuilding
+        self.dirty = set(range(count))
+        self.dirty_borders = {(cluster, direction) for cluster in range(count) for direction in ("right", "down")}
+        grid.add_listener(self.cell_changed)
+
+    # --- Geometry ---
+
+    def cluster_of(self, index):
+        size = self.size
+        cluster_size = self.cluster_size
+        return (index // size // cluster_size) * self.clusters_per_side + (index % size) // cluster_size
+
+    def bounds(self, cluster):
+        """(x0, y0, x1, y1) of a cluster, end exclusive."""
+        cy, cx = divmod(cluster, self.clusters_per_side)
+        x0, y0 = cx * self.cluster_size, cy * self.cluster_size
+        return x0, y0, min(self.size, x0 + self.cluster_size), min(self.size, y0 + self.cluster_size)
+
+    def _neighbor_cluster(self, cluster, direction, step=1):
+        cy, cx = divmod(cluster, self.clusters_per_side)
+        if direction == "right":
+            cx = (cx + step) % self.clusters_per_side
+        else:
+            cy = (cy + step) % self.clusters_per_side
+        return cy * self.clusters_per_side + cx
+
+    # --- Incremental maintenance ---
+
+    def cell_changed(self, cell, old_type):
+        if self.passable[old_type.value] == self.passable[cell.cell_type.value]:
+            return
+        cluster = self.cluster_of(cell.y * self.size + cell.x)
+        self.dirty.add(cluster)
+        # Cells on a cluster edge may also open or close an entrance
+        x0, y0, x1, y1 = self.bounds(cluster)
+        if cell.x == x1 - 1:
+            self.dirty_borders.add((cluster, "right"))
+        if cell.x == x0:
+            self.dirty_borders.add((self._neighbor_cluster(cluster, "right", -1), "right"))
+        if cell.y == y1 - 1:
+            self.dirty_borders.add((cluster, "down"))
+        if cell.y == y0:
+            self.dirty_borders.add((self._neighbor_cluster(cluster, "down", -1), "down"))
+
+    def refresh(self):
+        """Rebuild the dirty borders and the intra-cluster distances of dirty clusters."""
+        for cluster, direction in self.dirty_borders:
+            self._build_border(cluster, direction)
+            # The entrances on both sides changed
+            self.dirty.add(cluster)
+            self.dirty.add(self._neighbor_cluster(cluster, direction))
+        self.dirty_borders.clear()
+        for cluster in self.dirty:
+            self._build_intra(cluster)
+        self.dirty.clear()
+
+    def _build_border(self, cluster, direction):
+        key = (cluster, direction)
+        for a, b in self.borders.pop(key, ()):
+            self._unlink(a, b)
+
+        size = self.size
+        codes = self.grid.type_codes
+        passable = self.passable
+        x0, y0, x1, y1 = self.bounds(cluster)
+        if direction == "right":
+            x, nx = x1 - 1, x1 % size
+            pairs = [(y * size + x, y * size + nx) for y in range(y0, y1)]
+        else:
+            y, ny = y1 - 1, y1 % size
+            pairs = [(y * size + x, ny * size + x) for x in range(x0, x1)]
+
+        entrances = []
+        run = []
+        for pair in pairs + [None]:
+            if pair is not None and passable[codes[pair[0]]] and passable[codes[pair[1]]]:
+                run.append(pair)
+                continue
+            if run:
+                if len(run) <= MAX_ENTRANCE_WIDTH:
+                    entrances.append(run[len(run) // 2])
+                else:
+                    entrances.append(run[0])
+                    entrances.append(run[-1])
+                run = []
+
+        self.borders[key] = entrances
+        for a, b in entrances:
+            self.links.setdefault(a, set()).add(b)
+            self.links.setdefault(b, set()).add(a)
+
+    def _unlink(self, a, b):
+        for node, other in ((a, b), (b, a)):
+            partners = self.links.get(node)
+            if partners is not None:
+                partners.discard(other)
+                if not partners:
+                    del self.links[node]
+
+    def _build_intra(self, cluster):
+        # Entrance cells inside the cluster: the near side of its own right and down borders
+        # and the far side of the borders of its left and upper neighbors
+        nodes = {a for direction in ("right", "down") for a, _ in self.borders.get((cluster, direction), ())}
+        nodes.update(b for direction in ("right", "down")
+                     for _, b in self.borders.get((self._neighbor_cluster(cluster, direction, -1), direction), ()))
+        self.entrances[cluster] = nodes
+        edges = {}
+        for node in nodes:
+            distances = self.local_distances(node, cluster)
+            edges[node] = [(other, distances[other]) for other in nodes if other != node and other in distances]
+        self.intra[cluster] = edges
+
+    # --- Searches limited to one cluster ---
+
+    def local_distances(self, origin, cluster, parents=None, target=None):
+        """
+        Breadth-first distances from origin to the passable cells of a cluster.
+        With a target the search stops as soon as the target is reached.
+        """
+        size = self.size
+        codes = self.grid.type_codes
+        passable = self.passable
+        x0, y0, x1, y1 = self.bounds(cluster)
+        distances = {origin: 0}
+        queue = deque([origin])
+        while queue:
+            current = queue.popleft()
+            x, y = current % size, current // size
+            for nx, ny in ((x - 1, y), (x + 1, y), (x, y - 1), (x, y + 1)):
+                if not (x0 <= nx < x1 and y0 <= ny < y1):
+                    continue
+                neighbor = ny * size + nx
+                if neighbor in distances or not passable[codes[neighbor]]:
+                    continue
+                distances[neighbor] = distances[current] + 1
+                if parents is not None:
+                    parents[neighbor] = current
+                if neighbor == target:
+                    return distances
+                queue.append(neighbor)
+        return distances
+
+    def local_path(self, origin, target, cluster):
+        """Cells after origin up to target, staying inside the cluster; None if unreachable."""
+        parents = {}
+        distances = self.local_distances(origin, cluster, parents, target)
+        if target not in distances:
+            return None
+        path = []
+        current = target
+        while current != origin:
+            path.append(current)
+            current = parents[current]
+        path.reverse()
+        return path
+
+    # --- Queries ---
+
+    def find_path(self, start, goal, max_nodes=None):
+        """Abstract search between two flat indices; returns flat indices after start, or None."""
+        self.refresh()
+        size = self.size
+        start_cluster = self.cluster_of(start)
+        goal_cluster = self.cluster_of(goal)
+
+        from_start = self.local_distances(start, start_cluster)
+        to_goal = self.local_distances(goal, goal_cluster)
+        goal_entries = {node: to_goal[node] for node in self.entrances[goal_cluster] if node in to_goal}
+        if not goal_entries:
+            return None
+
+        goal_x, goal_y = goal % size, goal // size
+
+        def estimate(node):
+            dx = abs(node % size - goal_x)
+            dy = abs(node // size - goal_y)
+            return min(dx, size - dx) + min(dy, size - dy)
+
+        g_score = {}
+        parent = {}
+        open_set = []
+        for node in self.entrances[start_cluster]:
+            if node in from_start:
+                g_score[node] = from_start[node]
+                parent[node] = start
+                h = estimate(node)
+                heapq.heappush(open_set, (from_start[node] + h, h, node))
+
+        closed = set()
+        best_total, best_node = None, None
+        expanded = 0
+        while open_set:
+            f, _, node = heapq.heappop(open_set)
+            if best_total is not None and f >= best_total:
+                break
+            if node in closed:
+                continue
+            closed.add(node)
+            expanded += 1
+            if max_nodes is not None and expanded > max_nodes:
+                return None
+
+            if node in goal_entries:
+                total = g_score[node] + goal_entries[node]
+                if best_total is None or total < best_total:
+                    best_total, best_node = total, node
+
+            base = g_score[node]
+            cluster = self.cluster_of(node)
+            successors = list(self.intra[cluster].get(node, ()))
+            successors.extend((other, 1) for other in self.links.get(node, ()))
+            for other, cost in successors:
+                tentative = base + cost
+                if other not in closed and tentative < g_score.get(other, tentative + 1):
+                    g_score[other] = tentative
+                    parent[other] = node
+                    h = estimate(other)
+                    heapq.heappush(open_set, (tentative + h, h, other))
+
+        if best_node is None:
+            return None
+
+        # Refine the abstract route cell by cell
+        route = [goal]
+        node = best_node
+        while node != start:
+            route.append(node)
+            node = parent[node]
+        route.append(start)
+        route.reverse()
+
+        path = []
+        for a, b in zip(route, route[1:]):
+            if a == b:
+                continue
+            if b in self.links.get(a, ()):
+                path.append(b)
+                continue
+            segment = self.local_path(a, b, self.cluster_of(b))
+            if segment is None:
+                return None
+            path.extend(segment)
+        return path
+
+
+def hierarchy(grid, role="default", cluster_size=CLUSTER_SIZE):
+    """The grid's Hierarchy for a role, built on first use."""
+    hierarchies = getattr(grid, "_hierarchies", None)
+    if hierarchies is None:
+        hierarchies = grid._hierarchies = {}
+    built = hierarchies.get(role)
+    if built is None or built.cluster_size != cluster_size:
+        built = hierarchies[role] = Hierarchy(grid, role, cluster_size)
+    return built
+
+
+def astar(grid, start, goal, role="default", max_nodes=None):
+    """
+    Drop-in replacement for ai.pathfinding.astar.astar using the cluster hierarchy.
+    Short trips (start and goal in the same or neighboring clusters) use plain A*, which is
+    exact and already cheap; so does any trip the hierarchy cannot resolve.
+    :return: path as a list of (x, y) tuples after start, ending at goal, or [] if none
+    """
+    size = grid.size
+    start_index = start[1] * size + start[0]
+    goal_index = goal[1] * size + goal[0]
+    if start_index == goal_index or not PASSABLE_CODES[role][grid.type_codes[goal_index]]:
+        return []
+
+    if grid_astar.heuristic(start, goal, size) <= 2 * CLUSTER_SIZE:
+        return grid_astar.astar(grid, start, goal, role, max_nodes)
+
+    path = hierarchy(grid, role).find_path(start_index, goal_index, max_nodes)
+    if path is None:
+        return grid_astar.astar(grid, start, goal, role, max_nodes)
+    if grid.instrumentation is not None:
+        grid.instrumentation.count("hpa_calls")
+    return [(index % size, index // size) for index in path]
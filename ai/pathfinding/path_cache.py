@@ -0,0 +1,139 @@
+from collections import deque
+
+from ai.pathfinding.astar import ROLE_PASSABLE
+from utils.enums import CellType
+
+
+class CachedPath:
+    __slots__ = ("kind", "steps", "goal", "role", "passable", "target")
+
+    def __init__(self, kind, steps, role, target=None):
+        self.kind = kind
+        self.steps = steps  # deque, consumed from the left as the agent walks
+        self.goal = steps[-1]
+        self.role = role
+        self.passable = ROLE_PASSABLE[role]
+        self.target = target  # Moving agent at the goal that the path follows, if any
+
+
+class PathCache:
+    """
+    Remembers the rest of every agent's last A* path so it can be followed on later steps
+    instead of searching again. The cache listens to the grid's cell changes: a path is
+    dropped as soon as one of its cells becomes impassable for the agent's role (a knight
+    steps onto it) or its goal cell changes in any way. Hunters crossing a path further
+    ahead are only passing through, so they only matter once they block the next step,
+    which path() checks on every lookup. Cells the agent itself walks onto are consumed.
+    A path stored with a moving target (a knight chasing a hunter) is not dropped when the
+    target steps off the goal; path() instead follows it onto the neighbouring cell it moved to.
+    """
+
+    def __init__(self, grid):
+        self.grid = grid
+        self.paths = {}     # Agent -> CachedPath
+        self.watchers = {}  # Position -> set of agents whose remaining path crosses it
+        grid.add_listener(self.cell_changed)
+
+    def store(self, agent, kind, path, role="default", target=None):
+        """
+        Cache a freshly computed path (steps after the agent's position, ending at the goal).
+        :param target: optional agent standing on the goal whose moves the path should follow
+        """
+        self.invalidate(agent)
+        if not path:
+            return
+        self.paths[agent] = CachedPath(kind, deque(path), role, target)
+        for pos in path:
+            self.watchers.setdefault(pos, set()).add(agent)
+
+    def path(self, agent, kind, goal_is_live=None):
+        """
+        The agent's remaining cached path towards a goal of the given kind (a deque), or None.
+        :param goal_is_live: optional check of the goal position, e.g. that a hideout still has room
+        """
+        entry = self.paths.get(agent)
+        if entry is None:
+            return None
+        if entry.target is not None and not self._follow_target(agent, entry):
+            self.invalidate(agent)
+            return None
+        if entry.kind != kind or (goal_is_live is not None and not goal_is_live(entry.goal)):
+            self.invalidate(agent)
+            return None
+
+        steps = entry.steps
+        position = (agent.x, agent.y)
+        while steps and steps[0] == position:
+            self._unwatch(agent, steps.popleft())
+        if not steps or not self._adjacent(position, steps[0]):
+            # Reached the goal, or the agent was moved off its path
+            self.invalidate(agent)
+            return None
+        if self.grid.get_cell(*steps[0]).cell_type not in entry.passable:
+            self.invalidate(agent)
+            return None
+
+        instrumentation = self.grid.instrumentation
+        if instrumentation is not None:
+            instrumentation.count("path_cache_hits")
+        return steps
+
+    def invalidate(self, agent):
+        """Forget the agent's cached path."""
+        entry = self.paths.pop(agent, None)
+        if entry is None:
+            return
+        for pos in entry.steps:
+            self._unwatch(agent, pos)
+        instrumentation = self.grid.instrumentation
+        if instrumentation is not None:
+            instrumentation.count("path_cache_invalidations")
+
+    def cell_changed(self, cell, old_type):
+        agents = self.watchers.get((cell.x, cell.y))
+        if not agents:
+            return
+        pos = (cell.x, cell.y)
+        for agent in list(agents):
+            if cell.content is agent:
+                continue  # The agent stepping along its own path
+            entry = self.paths[agent]
+            if pos == entry.goal and entry.target is not None:
+                continue  # path() follows the target when it is next looked up
+            if pos == entry.goal or (cell.cell_type not in entry.passable and cell.cell_type != CellType.HUNTER):
+                self.invalidate(agent)
+
+    def _follow_target(self, agent, entry):
+        """Move the goal to where the target went; False if it is no longer one step away from it."""
+        target = entry.target
+        position = (target.x, target.y)
+        if position == entry.goal:
+            return True
+        if not self._adjacent(entry.goal, position):
+            return False
+        steps = entry.steps
+        if position in steps:
+            # The target came back along the path: cut it short
+            while steps[-1] != position:
+                self._unwatch(agent, steps.pop())
+        else:
+            steps.append(position)
+            self.watchers.setdefault(position, set()).add(agent)
+        entry.goal = position
+        return True
+
+    def _unwatch(self, agent, pos):
+        agents = self.watchers.get(pos)
+        if agents is not None:
+            agents.discard(agent)
+            if not agents:
+                del self.watchers[pos]
+
+    def _adjacent(self, a, b):
+        size = self.grid.size
+        dx = abs(a[0] - b[0])
+        dy = abs(a[1] - b[1])
+        return min(dx, size - dx) + min(dy, size - dy) == 1
+
+    def __len__(self):
+        return len(self.paths)
@@ -0,0 +1,72 @@
+"""
+Start-up cost of the simulation: how long a fresh interpreter takes to import the core
+modules, and which optional heavy subsystems those imports pull in.
+
+    python -m benchmarks.import_time --runs 5 --budget 0.1
+"""
+import argparse
+import json
+import os
+import subprocess
+import sys
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+# Modules a headless run and the test suite load
+CORE_MODULES = [
+    "controllers.simulation_controller",
+    "controllers.hunter_controller",
+    "controllers.knight_controller",
+    "controllers.simulation_worker",
+    "controllers.batch_runner",
+    "models.grid",
+    "models.hunter",
+    "models.knight",
+    "models.hideout",
+    "models.garrison",
+    "models.treasure",
+    "ai.pathfinding.astar",
+    "ai.pathfinding.distance_field",
+    "nlp.sentiment_analyzer",
+    "utils.logger",
+]
+
+# Optional subsystems that must only be loaded on first use
+HEAVY_MODULES = ["textblob", "nltk", "tkinter", "numpy", "concurrent.futures.process", "logging.handlers"]
+
+IMPORT_BUDGET = 0.1  # Seconds the best run should stay under on a quiet machine
+
+_PROBE = """
+import json, sys, time
+start = time.perf_counter()
+for name in {modules!r}:
+    __import__(name)
+elapsed = time.perf_counter() - start
+print(json.dumps({{"elapsed": elapsed, "loaded": [m for m in {heavy!r} if m in sys.modules]}}))
+"""
+
+
+def probe():
+    """Import CORE_MODULES in a fresh interpreter; returns {"elapsed": seconds, "loaded": [heavy modules]}."""
+    code = _PROBE.format(modules=CORE_MODULES, heavy=HEAVY_MODULES)
+    result = subprocess.run([sys.executable, "-c", code], cwd=ROOT, capture_output=True, text=True, check=True)
+    return json.loads(result.stdout)
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Measure the import time of the core modules")
+    parser.add_argument("--runs", type=int, default=5, help="fresh interpreters started; the best is reported")
+    parser.add_argument("--budget", type=float, default=IMPORT_BUDGET, help="seconds the best run may take")
+    args = parser.parse_args(argv)
+
+    probes = [probe() for _ in range(args.runs)]
+    best = min(result["elapsed"] for result in probes)
+    loaded = sorted({name for result in probes for name in result["loaded"]})
+    print(f"core imports: best {best * 1000:.1f} ms of {args.runs} runs (budget {args.budget * 1000:.0f} ms)")
+    if loaded:
+        print(f"heavy modules loaded: {', '.join(loaded)}")
+    return 1 if best > args.budget or loaded else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
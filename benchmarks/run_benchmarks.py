@@ -0,0 +1,198 @@
+"""
+Throughput benchmarks for the hot paths of the simulation, over a range of grid sizes and
+entity densities. Results are written as JSON so runs can be compared between releases.
+
+    python -m benchmarks.run_benchmarks --sizes 20 100 1000 --density-scales 1 2 --output bench.json
+"""
+import argparse
+import json
+import platform
+import random
+import sys
+import time
+
+from ai.pathfinding.astar import astar
+from controllers.simulation_controller import DEFAULT_DENSITIES, SimulationController
+from models.grid import Grid
+from utils.enums import CellType
+
+SIZES = (20, 50, 100, 250, 500, 1000)
+DENSITY_SCALES = (1.0, 2.0)  # Multipliers applied to DEFAULT_DENSITIES
+BENCHMARKS = ("astar_open", "astar_cluttered", "radius", "hunter_process", "knight_process", "step")
+
+
+def scaled_densities(scale):
+    densities = {name: density * scale for name, density in DEFAULT_DENSITIES.items()}
+    if sum(densities.values()) > 1:
+        raise ValueError(f"Density scale {scale} fills more than the whole grid")
+    return densities
+
+
+def timed(operation, min_time, max_runs=None):
+    """
+    Call operation() until min_time seconds have passed (at least once, at most max_runs times).
+    Returns (runs, seconds, total of the values operation() returned).
+    """
+    runs = 0
+    work = 0
+    started = time.perf_counter()
+    elapsed = 0.0
+    while runs == 0 or (elapsed < min_time and (max_runs is None or runs < max_runs)):
+        work += operation() or 0
+        runs += 1
+        elapsed = time.perf_counter() - started
+    return runs, elapsed, work
+
+
+def _result(name, size, scale, runs, seconds, unit, work):
+    return {
+        "benchmark": name,
+        "size": size,
+        "density_scale": scale,
+        "runs": runs,
+        "seconds": seconds,
+        "unit": unit,
+        "work": work,
+        "per_second": work / seconds if seconds else 0.0,
+    }
+
+
+def _world(size, scale, seed):
+    return SimulationController(headless=True, seed=seed, grid_size=size, densities=scaled_densities(scale))
+
+
+def _endpoints(grid, rng, count):
+    """Random (start, goal) pairs of cells a hunter could walk between."""
+    open_cells = [(x, y) for y in range(grid.size) for x in range(grid.size)
+                  if grid.get_cell(x, y).cell_type == CellType.EMPTY]
+    return [(rng.choice(open_cells), rng.choice(open_cells)) for _ in range(count)]
+
+
+def bench_astar(grid, size, scale, rng, min_time, name):
+    pairs = _endpoints(grid, rng, 64)
+    cursor = iter(())
+
+    def search():
+        nonlocal cursor
+        pair = next(cursor, None)
+        if pair is None:
+            cursor = iter(pairs)
+            pair = next(cursor)
+        astar(grid, *pair)
+        return 1
+
+    runs, seconds, work = timed(search, min_time)
+    return _result(name, size, scale, runs, seconds, "searches", work)
+
+
+def bench_radius(grid, size, scale, rng, min_time):
+    centers = [(rng.randrange(size), rng.randrange(size)) for _ in range(256)]
+
+    def query():
+        for x, y in centers:
+            grid.get_cells_in_radius(x, y, 3)
+        return len(centers)
+
+    runs, seconds, work = timed(query, min_time)
+    return _result("radius", size, scale, runs, seconds, "queries", work)
+
+
+def bench_hunter_process(sim, size, scale, min_time):
+    def sweep():
+        sim.distance_fields.invalidate()
+        hunters = list(sim.hunters)
+        for hunter in hunters:
+            sim.hunter_controller.process(hunter)
+        return len(hunters)
+
+    runs, seconds, work = timed(sweep, min_time, max_runs=50)
+    return _result("hunter_process", size, scale, runs, seconds, "agent_updates", work)
+
+
+def bench_knight_process(sim, size, scale, min_time):
+    def sweep():
+        sim.distance_fields.invalidate()
+        for knight in sim.knights:
+            sim.knight_controller.process(knight)
+        return len(sim.knights)
+
+    runs, seconds, work = timed(sweep, min_time, max_runs=50)
+    return _result("knight_process", size, scale, runs, seconds, "agent_updates", work)
+
+
+def bench_steps(sim, size, scale, min_time):
+    updates = 0
+
+    def step():
+        nonlocal updates
+        updates += len(sim.hunters) + len(sim.knights)
+        sim.step()
+        return 1
+
+    runs, seconds, work = timed(step, min_time, max_runs=300)
+    result = _result("step", size, scale, runs, seconds, "steps", work)
+    result["agent_updates_per_second"] = updates / seconds if seconds else 0.0
+    return result
+
+
+def run_benchmarks(sizes=SIZES, density_scales=DENSITY_SCALES, benchmarks=BENCHMARKS, min_time=1.0, seed=0,
+                   progress=None):
+    """Run the selected benchmarks for every size and density scale and return the result dicts."""
+    results = []
+    for size in sizes:
+        for scale in density_scales:
+            rng = random.Random(seed)
+            cases = []
+            if "astar_open" in benchmarks and scale == density_scales[0]:
+                cases.append(lambda: bench_astar(Grid(size), size, 0.0, rng, min_time, "astar_open"))
+            if "astar_cluttered" in benchmarks:
+                cases.append(lambda: bench_astar(_world(size, scale, seed).grid, size, scale, rng, min_time,
+                                                 "astar_cluttered"))
+            if "radius" in benchmarks:
+                cases.append(lambda: bench_radius(_world(size, scale, seed).grid, size, scale, rng, min_time))
+            if "hunter_process" in benchmarks:
+                cases.append(lambda: bench_hunter_process(_world(size, scale, seed), size, scale, min_time))
+            if "knight_process" in benchmarks:
+                cases.append(lambda: bench_knight_process(_world(size, scale, seed), size, scale, min_time))
+            if "step" in benchmarks:
+                cases.append(lambda: bench_steps(_world(size, scale, seed), size, scale, min_time))
+
+            for case in cases:
+                result = case()
+                if progress:
+                    progress(result)
+                results.append(result)
+    return results
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Benchmark the simulation hot paths")
+    parser.add_argument("--sizes", type=int, nargs="+", default=list(SIZES))
+    parser.add_argument("--density-scales", type=float, nargs="+", default=list(DENSITY_SCALES),
+                        help="multipliers applied to the default entity densities")
+    parser.add_argument("--benchmarks", nargs="+", choices=BENCHMARKS, default=list(BENCHMARKS))
+    parser.add_argument("--min-time", type=float, default=1.0, help="seconds spent on each measurement")
+    parser.add_argument("--seed", type=int, default=0)
+    parser.add_argument("--output", default="benchmark_results.json")
+    args = parser.parse_args(argv)
+
+    def progress(result):
+        print(f"{result['benchmark']:>16}  size={result['size']:<5} density x{result['density_scale']:<4}"
+              f"  {result['per_second']:12.1f} {result['unit']}/s", flush=True)
+
+    results = run_benchmarks(args.sizes, args.density_scales, args.benchmarks, args.min_time, args.seed,
+                             progress=progress)
+    report = {
+        "created": time.strftime("%Y-%m-%dT%H:%M:%S"),
+        "python": platform.python_version(),
+        "platform": platform.platform(),
+        "min_time": args.min_time,
+        "seed": args.seed,
+        "results": results,
+    }
+    with open(args.output, "w") as handle:
+        json.dump(report, handle, indent=2)
+
+
+if __name__ == "__main__":
+    sys.exit(main())
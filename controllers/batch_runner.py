@@ -0,0 +1,165 @@
+"""
+Monte Carlo batch runner: runs many seeded headless simulations over a parameter grid
+on a process pool and aggregates their outcome metrics into a table.
+
+    python -m controllers.batch_runner --grid-size 20 30 --hunter 0.1 0.2 --seeds 50 --workers 8
+    python -m controllers.batch_runner --set hunter_move_cost=0.01,0.02 --set hideout_capacity=3,5
+"""
+import argparse
+import csv
+import itertools
+import math
+import os
+import statistics
+import sys
+
+from controllers.simulation_controller import SimulationController
+from utils.config import CONFIG_FIELDS, DEFAULT_CONFIG, DEFAULT_DENSITIES, WorldConfig
+
+# Outcome metrics of one run, in the order run_one() returns them
+METRICS = (
+    "steps",
+    "hunters_alive",
+    "treasures_delivered",
+    "value_delivered",
+    "detentions",
+)
+
+
+def expand_grid(param_grid):
+    """
+    Turn {"grid_size": [20, 30], "hunter": [0.1, 0.2]} into the list of every combination.
+    Recognised keys are the WorldConfig fields and the entity names of DEFAULT_DENSITIES.
+    """
+    unknown = set(param_grid) - set(CONFIG_FIELDS) - set(DEFAULT_DENSITIES)
+    if unknown:
+        raise ValueError(f"Unknown parameters: {sorted(unknown)}")
+    names = sorted(param_grid)
+    return [dict(zip(names, values)) for values in itertools.product(*(param_grid[name] for name in names))]
+
+
+def make_config(params):
+    """WorldConfig of one combination; entity names such as "hunter" set that entity's density."""
+    densities = {name: value for name, value in params.items() if name in DEFAULT_DENSITIES}
+    changes = {name: value for name, value in params.items() if name not in DEFAULT_DENSITIES}
+    return DEFAULT_CONFIG.replace(densities=densities, **changes)
+
+
+def run_one(params, seed, steps):
+    """
+    Run one headless simulation and return its metrics as a plain tuple (cheap to pickle).
+    :param params: a combination from expand_grid(), or a WorldConfig
+    """
+    config = params if isinstance(params, WorldConfig) else make_config(params)
+    sim = SimulationController(headless=True, seed=seed, config=config)
+    sim.run(steps=steps)
+    return (
+        sim.step_count,
+        sum(1 for hunter in sim.hunters if hunter.alive),
+        sum(len(hideout.stored_treasures) for hideout in sim.hideouts),
+        sum(treasure.value for hideout in sim.hideouts for treasure in hideout.stored_treasures),
+        sum(knight.detentions for knight in sim.knights),
+    )
+
+
+def _run_chunk(chunk):
+    """Worker entry point: run a list of (combination index, params, seed, steps) tasks."""
+    return [(index, run_one(params, seed, steps)) for index, params, seed, steps in chunk]
+
+
+def _chunks(tasks, size):
+    return [tasks[start:start + size] for start in range(0, len(tasks), size)]
+
+
+def run_batch(param_grid, seeds=range(10), steps=300, workers=None, chunksize=None):
+    """
+    Run every parameter combination once per seed and aggregate the results.
+    :param param_grid: mapping of parameter name -> list of values, see expand_grid()
+    :param seeds: seeds run for every combination
+    :param workers: number of worker processes (default: all cores); 1 runs in this process
+    :param chunksize: tasks sent to a worker at once (default: about four chunks per worker)
+    :return: one dict per combination with its parameters, the number of runs and the
+             mean and standard deviation of every metric in METRICS
+    """
+    combinations = expand_grid(param_grid)
+    # Invalid combinations fail here, before any worker starts; workers receive the configs
+    configs = [make_config(params) for params in combinations]
+    tasks = [(index, config, seed, steps) for index, config in enumerate(configs) for seed in seeds]
+    workers = workers or os.cpu_count() or 1
+    chunksize = chunksize or max(1, math.ceil(len(tasks) / (workers * 4)))
+
+    results = [[] for _ in combinations]
+    if workers == 1:
+        chunk_results = map(_run_chunk, _chunks(tasks, chunksize))
+        for chunk in chunk_results:
+            for index, metrics in chunk:
+                results[index].append(metrics)
+    else:
+        # Imported here so in-process runs (and importing this module) skip multiprocessing
+        from concurrent.futures import ProcessPoolExecutor
+        with ProcessPoolExecutor(max_workers=workers) as executor:
+            for chunk in executor.map(_run_chunk, _chunks(tasks, chunksize)):
+                for index, metrics in chunk:
+                    results[index].append(metrics)
+
+    rows = []
+    for params, runs in zip(combinations, results):
+        row = dict(params)
+        row["runs"] = len(runs)
+        for position, name in enumerate(METRICS):
+            values = [run[position] for run in runs]
+            row[f"{name}_mean"] = statistics.fmean(values) if values else 0.0
+            row[f"{name}_std"] = statistics.pstdev(values) if values else 0.0
+        rows.append(row)
+    return rows
+
+
+def format_table(rows):
+    """Render aggregated rows as a fixed-width text table."""
+    if not rows:
+        return ""
+    columns = list(rows[0])
+    cells = [[f"{row[column]:.3f}" if isinstance(row[column], float) else str(row[column]) for column in columns]
+             for row in rows]
+    widths = [max(len(column), *(len(line[i]) for line in cells)) for i, column in enumerate(columns)]
+    lines = ["  ".join(column.rjust(width) for column, width in zip(columns, widths))]
+    lines += ["  ".join(value.rjust(width) for value, width in zip(line, widths)) for line in cells]
+    return "\n".join(lines)
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Run seeded simulations over a parameter grid")
+    parser.add_argument("--grid-size", type=int, nargs="+", default=[20])
+    for name, density in DEFAULT_DENSITIES.items():
+        parser.add_argument(f"--{name}", type=float, nargs="+", default=[density],
+                            help=f"{name} density (default {density})")
+    parser.add_argument("--set", action="append", default=[], metavar="FIELD=V1,V2",
+                        help="values of any WorldConfig field to sweep, e.g. hunter_move_cost=0.01,0.02")
+    parser.add_argument("--seeds", type=int, default=10, help="number of seeds per combination")
+    parser.add_argument("--steps", type=int, default=300)
+    parser.add_argument("--workers", type=int, default=None)
+    parser.add_argument("--chunksize", type=int, default=None)
+    parser.add_argument("--csv", help="also write the table to this CSV file")
+    args = parser.parse_args(argv)
+
+    param_grid = {"grid_size": args.grid_size}
+    param_grid.update({name: getattr(args, name) for name in DEFAULT_DENSITIES})
+    for setting in args.set:
+        name, _, values = setting.partition("=")
+        if name not in CONFIG_FIELDS or not values:
+            parser.error(f"--set expects FIELD=V1,V2 with a WorldConfig field, got {setting!r}")
+        kind = type(getattr(DEFAULT_CONFIG, name))
+        param_grid[name] = [kind(value) for value in values.split(",")]
+    rows = run_batch(param_grid, seeds=range(args.seeds), steps=args.steps,
+                     workers=args.workers, chunksize=args.chunksize)
+
+    print(format_table(rows))
+    if args.csv and rows:
+        with open(args.csv, "w", newline="") as handle:
+            writer = csv.DictWriter(handle, fieldnames=list(rows[0]))
+            writer.writeheader()
+            writer.writerows(rows)
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,472 @@
+"""
+Checkpoints: save a running simulation to a compact binary file and restore it.
+
+The object graph (hunters, knights, treasures, hideouts, garrisons and the grid cells holding
+them) is flattened into entity tables stored column by column. Every reference between objects
+(a hunter's carried treasure, the hideout it rests in, a knight's target, the grid's occupants)
+is written as an entity id instead of a pointer. Ids are global: 0 means "nothing" and the
+tables are numbered one after another in ENTITY_KINDS order, so the grid's occupant column can
+be copied straight into an ArrayGrid.
+
+File layout, in native byte order (checked on load):
+    header     MAGIC, FORMAT_VERSION, byte order mark, number of columns
+    directory  one entry per column: name, array typecode, offset, item count
+    columns    raw array data, each starting on an 8 byte boundary
+
+load_checkpoint() memory-maps the file and only reads the columns it uses; the grid arrays
+are copied from the mapped pages in one go, so many runs can be forked from one saved world.
+Per-step caches (distance fields, HPA clusters) are rebuilt on demand; cached A* paths are
+saved so a restored run continues exactly like the original.
+"""
+import math
+import mmap
+import struct
+from array import array
+
+from controllers.simulation_controller import GRID_BACKENDS, SimulationController
+from models.garrison import Garrison
+from models.hideout import Hideout
+from models.hunter import Hunter
+from models.knight import Knight
+from models.treasure import Treasure
+from utils.config import CONFIG_FIELDS, DEFAULT_CONFIG, WorldConfig
+from utils.enums import CellType, HunterSkill, TreasureType
+
+MAGIC = b"KOECKPT\0"
+FORMAT_VERSION = 3
+BYTE_ORDER_MARK = 0x0102
+HEADER = struct.Struct("=8sHHI")
+ENTRY = struct.Struct("=32scQQ")
+ALIGNMENT = 8
+
+# Entity tables in id order, and the grid cell type each kind occupies
+ENTITY_KINDS = ("garrison", "hideout", "treasure", "knight", "hunter")
+KIND_CELL_TYPES = {
+    "garrison": CellType.GARRISON,
+    "hideout": CellType.HIDEOUT,
+    "treasure": CellType.TREASURE,
+    "knight": CellType.KNIGHT,
+    "hunter": CellType.HUNTER,
+}
+BACKENDS = GRID_BACKENDS  # Stored by index
+
+# Knowledge stores, by the code written in the knowledge table
+KNOWLEDGE_STORES = (
+    ("hunter", "known_treasures"),
+    ("hunter", "known_hideouts"),
+    ("hunter", "known_knights"),
+    ("knight", "memory"),
+    ("hideout", "known_treasures"),
+    ("hideout", "known_hideouts"),
+)
+PATH_KINDS = ("treasure", "hideout", "hunter")
+PATH_ROLES = ("default", "knight")
+
+# Bit flags of the hunter and knight tables
+HUNTER_ALIVE, HUNTER_COLLAPSING, HUNTER_RESTING = 1, 2, 4
+KNIGHT_ALIVE, KNIGHT_RESTING = 1, 2
+
+NOT_IN_POOL = math.nan  # Depletion step of treasures that are carried off or stored
+
+
+class CheckpointError(ValueError):
+    """The file is not a checkpoint this version can read."""
+
+
+class _Registry:
+    """Numbers the entities of a world, table after table."""
+
+    def __init__(self, tables):
+        self.tables = tables
+        self.ids = {}
+        next_id = 1
+        for kind in ENTITY_KINDS:
+            for entity in tables[kind]:
+                self.ids[entity] = next_id
+                next_id += 1
+
+    def id(self, entity):
+        """Entity id, 0 for None or an entity that is no longer part of the world."""
+        return self.ids.get(entity, 0)
+
+
+def collect_entities(sim):
+    """
+    Every entity reachable from a simulation, by kind: {kind: {entity: None}}, in a stable order.
+    Besides the simulation's own lists this finds the entities only referenced from others.
+    """
+    grid = sim.grid
+    tables = {kind: {} for kind in ENTITY_KINDS}
+
+    def add(kind, entity):
+        if entity is not None:
+            tables[kind].setdefault(entity)
+
+    for hideout in sim.hideouts:
+        add("hideout", hideout)
+    for garrison in sim.garrisons:
+        add("garrison", garrison)
+    for treasure in sim.treasures:
+        add("treasure", treasure)
+    for knight in sim.knights:
+        add("knight", knight)
+    for hunter in sim.hunters:
+        add("hunter", hunter)
+    # Entities that left the simulation lists but are still referenced
+    for hideout in sim.hideouts:
+        for hunter in hideout.hunters:
+            add("hunter", hunter)
+        for treasure in hideout.stored_treasures:
+            add("treasure", treasure)
+    for garrison in sim.garrisons:
+        for knight in garrison.knights:
+            add("knight", knight)
+    for entry in sim.path_cache.paths.values():
+        add("hunter", entry.target)
+    for knight in list(tables["knight"]):
+        add("hunter", knight.target)
+        add("garrison", knight.garrison)
+    for hunter in list(tables["hunter"]):
+        add("treasure", hunter.carrying)
+        add("hideout", hunter.in_hideout)
+    for kind, cell_type in KIND_CELL_TYPES.items():
+        for x, y in grid.positions_of(cell_type):
+            add(kind, grid.get_cell(x, y).content)
+    return tables
+
+
+def save_checkpoint(sim, path):
+    """
+    Write the full state of a SimulationController to path.
+    :return: the id every entity was written with, {entity: id}
+    """
+    grid = sim.grid
+    registry = _Registry(collect_entities(sim))
+
+    columns = {}
+    rng_version, rng_words, gauss_next = sim.rng.getstate()
+    columns["sim"] = array("q", [
+        rng_version, sim.step_count, grid.size, BACKENDS.index(sim.grid_backend), sim.treasures.step,
+        len(sim.hunters), len(sim.knights), sim.seed is not None, sim.seed if isinstance(sim.seed, int) else 0,
+    ])
+    # The config is written with its field names, so fields added later fall back to their defaults
+    columns["config"] = array("d", (getattr(sim.config, name) for name in CONFIG_FIELDS))
+    columns["config.fields"] = array("B", "\0".join(CONFIG_FIELDS).encode("ascii"))
+    columns["sim.gauss"] = array("d", [math.nan if gauss_next is None else gauss_next])
+    columns["sim.rng"] = array("I", rng_words)
+    names = [sim.pathfinder]
+    names.extend(hunter.name for hunter in registry.tables["hunter"])
+    names.extend(knight.name for knight in registry.tables["knight"])
+    columns["names"] = array("B", "\0".join(names).encode("utf-8"))
+
+    garrisons = registry.tables["garrison"]
+    columns["garrison.x"] = array("i", (g.x for g in garrisons))
+    columns["garrison.y"] = array("i", (g.y for g in garrisons))
+    columns["garrison.capacity"] = array("i", (g.capacity for g in garrisons))
+
+    hideouts = registry.tables["hideout"]
+    columns["hideout.x"] = array("i", (h.x for h in hideouts))
+    columns["hideout.y"] = array("i", (h.y for h in hideouts))
+    columns["hideout.capacity"] = array("i", (h.capacity for h in hideouts))
+    columns["hideout.version"] = array("q", (h.version for h in hideouts))
+    columns["hideout.shared"] = array("q", (h.shared_version for h in hideouts))
+
+    treasures = registry.tables["treasure"]
+    pool = sim.treasures
+    columns["treasure.type"] = array("B", (t.treasure_type.value for t in treasures))
+    columns["treasure.x"] = array("i", (t.x for t in treasures))
+    columns["treasure.y"] = array("i", (t.y for t in treasures))
+    columns["treasure.value"] = array("d", (t._value for t in treasures))
+    columns["treasure.epoch"] = array("q", (t._epoch for t in treasures))
+    columns["treasure.due"] = array("d", (pool.due(t) if t in pool else NOT_IN_POOL for t in treasures))
+
+    knights = registry.tables["knight"]
+    columns["knight.x"] = array("i", (k.x for k in knights))
+    columns["knight.y"] = array("i", (k.y for k in knights))
+    columns["knight.energy"] = array("d", (k.energy for k in knights))
+    columns["knight.flags"] = array("B", (KNIGHT_ALIVE * k.alive | KNIGHT_RESTING * k.resting for k in knights))
+    columns["knight.target"] = array("i", (registry.id(k.target) for k in knights))
+    columns["knight.garrison"] = array("i", (registry.id(k.garrison) for k in knights))
+    columns["knight.detentions"] = array("i", (k.detentions for k in knights))
+
+    hunters = registry.tables["hunter"]
+    columns["hunter.skill"] = array("B", (h.skill.value for h in hunters))
+    columns["hunter.x"] = array("i", (h.x for h in hunters))
+    columns["hunter.y"] = array("i", (h.y for h in hunters))
+    columns["hunter.stamina"] = array("d", (h.stamina for h in hunters))
+    columns["hunter.flags"] = array("B", (
+        HUNTER_ALIVE * h.alive | HUNTER_COLLAPSING * h.collapsing | HUNTER_RESTING * h.resting for h in hunters))
+    columns["hunter.collapses"] = array("i", (h.collapse_counter for h in hunters))
+    columns["hunter.carrying"] = array("i", (registry.id(h.carrying) for h in hunters))
+    columns["hunter.hideout"] = array("i", (registry.id(h.in_hideout) for h in hunters))
+
+    # Ordered memberships: hideout -> resting hunters and stored treasures, garrison -> knights
+    owners, members = array("i"), array("i")
+    for hideout in hideouts:
+        for member in hideout.hunters + hideout.stored_treasures:
+            owners.append(registry.id(hideout))
+            members.append(registry.id(member))
+    for garrison in garrisons:
+        for knight in garrison.knights:
+            owners.append(registry.id(garrison))
+            members.append(registry.id(knight))
+    columns["link.owner"], columns["link.member"] = owners, members
+
+    owners, stores, xs, ys, seen = array("i"), array("B"), array("i"), array("i"), array("q")
+    for code, (kind, attribute) in enumerate(KNOWLEDGE_STORES):
+        for entity in registry.tables[kind]:
+            store = getattr(entity, attribute)
+            for pos in store:
+                owners.append(registry.id(entity))
+                stores.append(code)
+                xs.append(pos[0])
+                ys.append(pos[1])
+                seen.append(store.last_seen(pos))
+    columns["know.owner"], columns["know.store"] = owners, stores
+    columns["know.x"], columns["know.y"], columns["know.seen"] = xs, ys, seen
+
+    agents, kinds, roles, lengths, xs, ys = array("i"), array("B"), array("B"), array("i"), array("i"), array("i")
+    targets = array("i")
+    for agent, entry in sim.path_cache.paths.items():
+        agents.append(registry.id(agent))
+        targets.append(registry.id(entry.target))
+        kinds.append(PATH_KINDS.index(entry.kind))
+        roles.append(PATH_ROLES.index(entry.role))
+        lengths.append(len(entry.steps))
+        for x, y in entry.steps:
+            xs.append(x)
+            ys.append(y)
+    columns["path.agent"], columns["path.kind"], columns["path.role"] = agents, kinds, roles
+    columns["path.target"] = targets
+    columns["path.length"], columns["path.x"], columns["path.y"] = lengths, xs, ys
+
+    columns["grid.types"] = memoryview(grid.type_codes).cast("B")
+    columns["grid.occupants"] = _occupant_ids(grid, registry)
+    _write(path, columns)
+    return registry.ids
+
+
+def _occupant_ids(grid, registry):
+    """Entity id of every cell's occupant, row-major."""
+    size = grid.size
+    if hasattr(grid, "occupants"):
+        # ArrayGrid: translate its own occupant ids through a lookup table
+        import numpy as np
+        lookup = np.array([registry.id(entity) for entity in grid._entities], dtype=np.int32)
+        return memoryview(lookup[grid.occupants].reshape(-1)).cast("B").cast("i")
+    ids = array("i", bytes(4 * size * size))
+    for cell_type in KIND_CELL_TYPES.values():
+        for x, y in grid.positions_of(cell_type):
+            ids[y * size + x] = registry.id(grid.cells[y][x].content)
+    return ids
+
+
+def _write(path, columns):
+    offset = HEADER.size + ENTRY.size * len(columns)
+    layout = []
+    for name, data in columns.items():
+        offset += -offset % ALIGNMENT
+        view = memoryview(data)
+        layout.append((name, view, offset))
+        offset += view.nbytes
+    with open(path, "wb") as stream:
+        stream.write(HEADER.pack(MAGIC, FORMAT_VERSION, BYTE_ORDER_MARK, len(columns)))
+        for name, view, offset in layout:
+            stream.write(ENTRY.pack(name.encode("ascii"), view.format.encode("ascii"), offset, len(view)))
+        for name, view, offset in layout:
+            stream.write(b"\0" * (offset - stream.tell()))
+            stream.write(view)
+
+
+class _Reader:
+    """Typed views of the columns of a memory-mapped checkpoint."""
+
+    def __init__(self, mapped):
+        self.mapped = mapped
+        self.buffer = memoryview(mapped)
+        magic, version, mark, count = HEADER.unpack_from(mapped, 0)
+        if magic != MAGIC:
+            raise CheckpointError("Not a simulation checkpoint")
+        if version != FORMAT_VERSION:
+            raise CheckpointError(f"Unsupported checkpoint version {version}")
+        if mark != BYTE_ORDER_MARK:
+            raise CheckpointError("Checkpoint was written with a different byte order")
+        self.entries = {}
+        for index in range(count):
+            name, typecode, offset, length = ENTRY.unpack_from(mapped, HEADER.size + index * ENTRY.size)
+            self.entries[name.rstrip(b"\0").decode("ascii")] = (typecode.decode("ascii"), offset, length)
+
+    def view(self, name):
+        """Zero-copy view of a column over the mapped file."""
+        typecode, offset, length = self.entries[name]
+        return self.buffer[offset:offset + length * struct.calcsize(typecode)].cast(typecode)
+
+    def __getitem__(self, name):
+        return self.view(name).tolist()
+
+    def release(self):
+        self.buffer.release()
+
+
+def load_checkpoint(path, **options):
+    """
+    Restore a simulation saved by save_checkpoint().
+    :param options: SimulationController arguments that are not part of the saved world,
+                    e.g. observer, step_delay or instrumentation. Restored simulations are
+                    headless unless headless=False is passed.
+    :return: a SimulationController ready to continue the saved run
+    """
+    return load_world(path, **options)[0]
+
+
+def load_world(path, **options):
+    """
+    Like load_checkpoint(), but also returns the restored entities by the ids they were saved with.
+    :return: (SimulationController, list of entities indexed by id, entry 0 being None)
+    """
+    options.setdefault("headless", True)
+    journal = options.pop("journal", None)
+    with open(path, "rb") as stream:
+        mapped = mmap.mmap(stream.fileno(), 0, access=mmap.ACCESS_READ)
+    reader = _Reader(mapped)
+    try:
+        sim, entities = _restore(reader, options)
+    finally:
+        reader.release()
+        mapped.close()
+    if journal is not None:
+        # Attached once the world is rebuilt, so the journal starts from the restored grid
+        sim.journal = journal
+        journal.attach(sim.grid)
+    return sim, entities
+
+
+def _restore_config(reader):
+    names = bytes(reader.view("config.fields")).decode("ascii").split("\0")
+    # Values are stored as doubles; integer fields are converted back to the type of their default
+    values = {name: type(getattr(DEFAULT_CONFIG, name))(value)
+              for name, value in zip(names, reader["config"]) if name in CONFIG_FIELDS}
+    return WorldConfig(**values)
+
+
+def _restore(reader, options):
+    (rng_version, step_count, size, backend, pool_step,
+     listed_hunters, listed_knights, has_seed, seed) = reader["sim"]
+    names = bytes(reader.view("names")).decode("utf-8").split("\0")
+    config = _restore_config(reader)
+    sim = SimulationController(grid_backend=BACKENDS[backend], pathfinder=names[0], config=config,
+                               populate=False, **options)
+    gauss_next = reader["sim.gauss"][0]
+    sim.rng.setstate((rng_version, tuple(reader["sim.rng"]), None if math.isnan(gauss_next) else gauss_next))
+    sim.seed = seed if has_seed else None
+    sim.step_count = step_count
+    grid = sim.grid
+
+    entities = [None]
+    garrisons = [Garrison(x, y, rng=sim.rng, config=config) for x, y in zip(reader["garrison.x"], reader["garrison.y"])]
+    for garrison, capacity in zip(garrisons, reader["garrison.capacity"]):
+        garrison.capacity = capacity
+    entities.extend(garrisons)
+
+    hideouts = [Hideout(x, y, config) for x, y in zip(reader["hideout.x"], reader["hideout.y"])]
+    for hideout, capacity, version, shared in zip(
+            hideouts, reader["hideout.capacity"], reader["hideout.version"], reader["hideout.shared"]):
+        hideout.capacity = capacity
+        hideout.version = version
+        hideout.shared_version = shared
+    entities.extend(hideouts)
+
+    pool = sim.treasures
+    pool.step = pool_step
+    treasures = []
+    for type_value, x, y, value, epoch, due in zip(
+            reader["treasure.type"], reader["treasure.x"], reader["treasure.y"],
+            reader["treasure.value"], reader["treasure.epoch"], reader["treasure.due"]):
+        treasure = Treasure(TreasureType(type_value), x, y)
+        if math.isnan(due):
+            treasure._value = value
+            treasure._epoch = epoch
+        else:
+            pool.restore(treasure, value, epoch, due)
+        treasures.append(treasure)
+    entities.extend(treasures)
+
+    hunter_count = len(reader.view("hunter.x"))
+    knights = [Knight(name, x, y, grid, config)
+               for name, x, y in zip(names[1 + hunter_count:], reader["knight.x"], reader["knight.y"])]
+    entities.extend(knights)
+
+    hunters = []
+    for name, skill, x, y, stamina, flags, collapses in zip(
+            names[1:1 + hunter_count], reader["hunter.skill"], reader["hunter.x"], reader["hunter.y"],
+            reader["hunter.stamina"], reader["hunter.flags"], reader["hunter.collapses"]):
+        hunter = Hunter(name, HunterSkill(skill), x, y, config)
+        hunter.stamina = stamina
+        hunter.alive = bool(flags & HUNTER_ALIVE)
+        hunter.collapsing = bool(flags & HUNTER_COLLAPSING)
+        hunter.resting = bool(flags & HUNTER_RESTING)
+        hunter.collapse_counter = collapses
+        hunters.append(hunter)
+    entities.extend(hunters)
+
+    # References are resolved once every entity exists
+    for knight, energy, flags, target, garrison, detentions in zip(
+            knights, reader["knight.energy"], reader["knight.flags"], reader["knight.target"],
+            reader["knight.garrison"], reader["knight.detentions"]):
+        knight.energy = energy
+        knight.alive = bool(flags & KNIGHT_ALIVE)
+        knight.resting = bool(flags & KNIGHT_RESTING)
+        knight.target = entities[target]
+        knight.garrison = entities[garrison]
+        knight.detentions = detentions
+        if knight.garrison is not None:
+            knight.known_knight_patrols = knight.garrison.knight_patrols
+    for hunter, carrying, hideout in zip(hunters, reader["hunter.carrying"], reader["hunter.hideout"]):
+        hunter.carrying = entities[carrying]
+        hunter.in_hideout = entities[hideout]
+        if hunter.in_hideout is not None:
+            hunter.known_knight_patrols = hunter.in_hideout.knight_patrols
+    for owner, member in zip(reader["link.owner"], reader["link.member"]):
+        owner, member = entities[owner], entities[member]
+        if isinstance(owner, Garrison):
+            owner.knights.append(member)
+        elif isinstance(member, Hunter):
+            owner.hunters.append(member)
+        else:
+            owner.stored_treasures.append(member)
+    for owner, code, x, y, seen in zip(
+            reader["know.owner"], reader["know.store"], reader["know.x"], reader["know.y"], reader["know.seen"]):
+        getattr(entities[owner], KNOWLEDGE_STORES[code][1]).add((x, y), seen)
+
+    sim.garrisons = garrisons
+    sim.hideouts = hideouts
+    sim.knights = knights[:listed_knights]
+    sim.hunters = hunters[:listed_hunters]
+
+    _restore_grid(grid, reader, entities)
+    sim.metrics.recount()
+
+    start = 0
+    path_xs, path_ys = reader["path.x"], reader["path.y"]
+    for agent, kind, role, length, target in zip(
+            reader["path.agent"], reader["path.kind"], reader["path.role"], reader["path.length"],
+            reader["path.target"]):
+        steps = list(zip(path_xs[start:start + length], path_ys[start:start + length]))
+        sim.path_cache.store(entities[agent], PATH_KINDS[kind], steps, PATH_ROLES[role], entities[target])
+        start += length
+    return sim, entities
+
+
+def _restore_grid(grid, reader, entities):
+    types = reader.view("grid.types")
+    occupants = reader.view("grid.occupants")
+    if hasattr(grid, "occupants"):
+        # ArrayGrid: both arrays are copied from the mapped file in one go, and the
+        # checkpoint's entity ids become the grid's occupant ids
+        grid.load(types, occupants, entities)
+        return
+    size = grid.size
+    cell_types = {cell_type.value: cell_type for cell_type in CellType}
+    for index, code in enumerate(types):
+        if code:
+            grid.cells[index // size][index % size].set_content(entities[occupants[index]], cell_types[code])
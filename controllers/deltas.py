@@ -0,0 +1,281 @@
+"""
+Entity deltas: the changes to the world's inner state a Journal records between checkpoints.
+
+A Journal with a checkpoint_interval hands the end of every step to a DeltaRecorder, which compares
+each entity with what it recorded last and writes a record for every part that changed: positions,
+stamina and energy, carried treasures and knight targets, status flags, treasure values and
+blackboard versions, the members of hideouts, garrisons and the simulation's lists (the treasure
+pool included), and every knowledge store. Entities that join the world are announced by SPAWN
+and NAME records before any record refers to them, and every checkpoint is followed by BIND
+records tying the journal's ids to the ids the checkpoint saved the entities with.
+
+replay() applies those records to the world restored from a checkpoint, which is how
+Replayer.state() rebuilds any step without running the AI. The random generator and the cached
+paths are not journaled: the rebuilt world is the recorded one, but simulating on from it does
+not continue the recorded run the way restoring a checkpoint does.
+"""
+import struct
+
+from controllers.checkpoint import (
+    ENTITY_KINDS, HUNTER_ALIVE, HUNTER_COLLAPSING, HUNTER_RESTING, KNIGHT_ALIVE, KNIGHT_RESTING,
+    KNOWLEDGE_STORES, collect_entities,
+)
+from models.garrison import Garrison
+from models.hideout import Hideout
+from models.hunter import Hunter
+from models.knight import Knight
+from models.treasure import Treasure
+from models.treasure_pool import TreasurePool
+from utils.enums import CellType, EventType, HunterSkill, TreasureType
+
+NAME_CHUNK = struct.Struct("=ii")  # Name bytes carried by one NAME record, in its x and y fields
+
+KIND_CLASSES = {"garrison": Garrison, "hideout": Hideout, "treasure": Treasure, "knight": Knight, "hunter": Hunter}
+CLASS_KINDS = {cls: kind for kind, cls in KIND_CLASSES.items()}
+
+# Lists a JOIN or LEAVE record changes, by the code in its x field; owner None is the simulation.
+# Members of the treasure pool carry the step they deplete at in the record's value.
+MEMBER_LISTS = (
+    ("hideout", "hunters"),
+    ("hideout", "stored_treasures"),
+    ("garrison", "knights"),
+    (None, "hunters"),
+    (None, "knights"),
+    (None, "treasures"),
+)
+POOL = MEMBER_LISTS.index((None, "treasures"))
+
+_EVENT_TYPES = {event_type.value: event_type for event_type in EventType}
+_MISSING = object()
+
+
+def _changes(old, new):
+    """
+    Keys to remove and (key, value) pairs to set that turn the ordered items old into new.
+    Setting a key that is not there yet appends it, so when new also reorders the keys it
+    keeps from old, every old key is removed and every new pair set again.
+    """
+    old_values = dict(old)
+    new_values = dict(new)
+    kept = [key for key, _ in old if key in new_values]
+    appended = [key for key, _ in new if key not in old_values]
+    if kept + appended != [key for key, _ in new]:
+        return list(old_values), list(new)
+    removed = [key for key in old_values if key not in new_values]
+    return removed, [(key, value) for key, value in new if old_values.get(key, _MISSING) != value]
+
+
+class DeltaRecorder:
+    """Writes the changes of a simulation's entities to a Journal at the end of every step."""
+
+    def __init__(self, journal, sim):
+        self.journal = journal
+        self.sim = sim
+        self._last = {}  # (entity, record kind[, list or store code]) -> what was recorded last
+
+    def bind(self, checkpoint_ids):
+        """Tie journal ids to the ids of the checkpoint just saved, {entity: id}."""
+        journal = self.journal
+        ids = journal.ids
+        for entity, checkpoint_id in checkpoint_ids.items():
+            journal_id = ids.get(entity)
+            if journal_id is None:
+                # Part of the checkpoint, so not announced with SPAWN
+                journal_id = ids[entity] = len(ids) + 1
+            journal.write(EventType.BIND, journal_id, checkpoint_id)
+        # The checkpoint holds everything up to here; later records are relative to it
+        self.record_step(write=False)
+
+    def spawned(self, entity, entity_id):
+        """Announce an entity the journal has just given an id to."""
+        kind = CLASS_KINDS[type(entity)]
+        if kind == "hunter":
+            detail = entity.skill.value
+        elif kind == "treasure":
+            detail = entity.treasure_type.value
+        else:
+            detail = 0
+        journal = self.journal
+        journal.write(EventType.SPAWN, entity_id, ENTITY_KINDS.index(kind), entity.x, entity.y, detail)
+        name = getattr(entity, "name", "").encode("utf-8")
+        name += b"\0" * (-len(name) % NAME_CHUNK.size)
+        for offset in range(0, len(name), NAME_CHUNK.size):
+            journal.write(EventType.NAME, entity_id, 0, *NAME_CHUNK.unpack_from(name, offset))
+
+    def record_step(self, write=True):
+        """Record what changed since the last call; with write=False only remember the current state."""
+        sim = self.sim
+        entity_id = self.journal.id
+        last, self._last = self._last, {}
+        tables = collect_entities(sim)
+
+        for code, (kind, attribute) in enumerate(MEMBER_LISTS):
+            for owner in (None,) if kind is None else tables[kind]:
+                if code == POOL:
+                    members = [(treasure, sim.treasures.due(treasure)) for treasure in sim.treasures]
+                else:
+                    members = [(member, 0.0) for member in getattr(sim if owner is None else owner, attribute)]
+                self._members(last, owner, code, members, write)
+
+        for hunter in tables["hunter"]:
+            flags = HUNTER_ALIVE * hunter.alive | HUNTER_COLLAPSING * hunter.collapsing | HUNTER_RESTING * hunter.resting
+            self._fields(last, hunter, EventType.HUNTER,
+                         (entity_id(hunter.carrying), hunter.x, hunter.y, hunter.stamina), write)
+            self._fields(last, hunter, EventType.HUNTER_STATUS,
+                         (entity_id(hunter.in_hideout), flags, hunter.collapse_counter, 0.0), write)
+        for knight in tables["knight"]:
+            flags = KNIGHT_ALIVE * knight.alive | KNIGHT_RESTING * knight.resting
+            self._fields(last, knight, EventType.KNIGHT,
+                         (entity_id(knight.target), knight.x, knight.y, knight.energy), write)
+            self._fields(last, knight, EventType.KNIGHT_STATUS,
+                         (entity_id(knight.garrison), flags, knight.detentions, 0.0), write)
+        for treasure in tables["treasure"]:
+            self._fields(last, treasure, EventType.TREASURE,
+                         (treasure._epoch, treasure.x, treasure.y, treasure._value), write)
+        for hideout in tables["hideout"]:
+            self._fields(last, hideout, EventType.HIDEOUT, (hideout.version, hideout.shared_version, 0, 0.0), write)
+
+        for code, (kind, attribute) in enumerate(KNOWLEDGE_STORES):
+            for owner in tables[kind]:
+                self._knowledge(last, owner, code, list(getattr(owner, attribute).items()), write)
+
+    def _fields(self, last, entity, kind, fields, write):
+        key = (entity, kind)
+        self._last[key] = fields
+        if write and last.get(key) != fields:
+            self.journal.write(kind, self.journal.id(entity), *fields)
+
+    def _members(self, last, owner, code, members, write):
+        key = (owner, EventType.JOIN, code)
+        self._last[key] = members
+        previous = last.get(key, ())
+        if not write or members == previous:
+            return
+        journal = self.journal
+        owner_id = journal.id(owner)
+        removed, added = _changes(previous, members)
+        for member in removed:
+            journal.write(EventType.LEAVE, owner_id, journal.id(member), code)
+        for member, value in added:
+            journal.write(EventType.JOIN, owner_id, journal.id(member), code, 0, value)
+
+    def _knowledge(self, last, owner, code, items, write):
+        key = (owner, EventType.KNOW, code)
+        self._last[key] = items
+        previous = last.get(key, ())
+        if not write or items == previous:
+            return
+        journal = self.journal
+        owner_id = journal.id(owner)
+        forgotten, learned = _changes(previous, items)
+        for x, y in forgotten:
+            journal.write(EventType.FORGET, owner_id, code, x, y)
+        for (x, y), seen in learned:
+            journal.write(EventType.KNOW, owner_id, code, x, y, seen)
+
+
+def _spawn(sim, kind, x, y, detail):
+    config = sim.config
+    cls = KIND_CLASSES[ENTITY_KINDS[kind]]
+    if cls is Hunter:
+        return Hunter("", HunterSkill(int(detail)), x, y, config)
+    if cls is Knight:
+        return Knight("", x, y, sim.grid, config)
+    if cls is Treasure:
+        return Treasure(TreasureType(int(detail)), x, y)
+    if cls is Garrison:
+        return Garrison(x, y, rng=sim.rng, config=config)
+    return Hideout(x, y, config)
+
+
+def replay(sim, entities, records):
+    """
+    Apply journal records to the world restored from the checkpoint they follow.
+    :param entities: the restored entities by checkpoint id, as returned by load_world()
+    :param records: raw journal records, from the first one of the step after the checkpoint
+    """
+    grid = sim.grid
+    cell_types = {cell_type.value: cell_type for cell_type in CellType}
+    by_id = {0: None}   # Journal id -> entity
+    names = {}          # Journal id -> name bytes of spawned entities
+    pool = sim.treasures
+    dues = {treasure: pool.due(treasure) for treasure in pool}
+    pool_step = pool.step
+
+    for step, kind, actor, subject, x, y, value in records:
+        kind = _EVENT_TYPES[kind]
+        if kind == EventType.CELL:
+            grid.get_cell(x, y).set_content(by_id[actor], cell_types[subject])
+        elif kind == EventType.STEP:
+            sim.step_count = step
+            pool_step = subject
+        elif kind == EventType.HUNTER:
+            hunter = by_id[actor]
+            hunter.carrying = by_id[subject]
+            hunter.x, hunter.y, hunter.stamina = x, y, value
+        elif kind == EventType.HUNTER_STATUS:
+            hunter = by_id[actor]
+            hunter.in_hideout = by_id[subject]
+            if hunter.in_hideout is not None:
+                hunter.known_knight_patrols = hunter.in_hideout.knight_patrols
+            hunter.alive = bool(x & HUNTER_ALIVE)
+            hunter.collapsing = bool(x & HUNTER_COLLAPSING)
+            hunter.resting = bool(x & HUNTER_RESTING)
+            hunter.collapse_counter = y
+        elif kind == EventType.KNIGHT:
+            knight = by_id[actor]
+            knight.target = by_id[subject]
+            knight.x, knight.y, knight.energy = x, y, value
+        elif kind == EventType.KNIGHT_STATUS:
+            knight = by_id[actor]
+            knight.garrison = by_id[subject]
+            if knight.garrison is not None:
+                knight.known_knight_patrols = knight.garrison.knight_patrols
+            knight.alive = bool(x & KNIGHT_ALIVE)
+            knight.resting = bool(x & KNIGHT_RESTING)
+            knight.detentions = y
+        elif kind == EventType.TREASURE:
+            treasure = by_id[actor]
+            treasure._epoch, treasure.x, treasure.y, treasure._value = subject, x, y, value
+        elif kind == EventType.HIDEOUT:
+            hideout = by_id[actor]
+            hideout.version, hideout.shared_version = subject, x
+        elif kind == EventType.JOIN:
+            if x == POOL:
+                dues[by_id[subject]] = value
+            else:
+                getattr(by_id[actor] if actor else sim, MEMBER_LISTS[x][1]).append(by_id[subject])
+        elif kind == EventType.LEAVE:
+            if x == POOL:
+                del dues[by_id[subject]]
+            else:
+                getattr(by_id[actor] if actor else sim, MEMBER_LISTS[x][1]).remove(by_id[subject])
+        elif kind == EventType.KNOW:
+            getattr(by_id[actor], KNOWLEDGE_STORES[subject][1]).add((x, y), int(value))
+        elif kind == EventType.FORGET:
+            getattr(by_id[actor], KNOWLEDGE_STORES[subject][1]).discard((x, y))
+        elif kind == EventType.SPAWN:
+            by_id[actor] = _spawn(sim, subject, x, y, value)
+            names[actor] = bytearray()
+        elif kind == EventType.NAME:
+            names[actor] += NAME_CHUNK.pack(x, y)
+        elif kind == EventType.BIND:
+            by_id[actor] = entities[subject]
+
+    for entity_id, name in names.items():
+        if name:
+            by_id[entity_id].name = bytes(name).rstrip(b"\0").decode("utf-8")
+
+    # The pool is rebuilt like a checkpoint's, from each member's exact value and depletion step
+    for treasure in pool:
+        treasure._pool = None
+    sim.treasures = TreasurePool(decay_percent=sim.config.treasure_decay)
+    sim.treasures.step = pool_step
+    for treasure, due in dues.items():
+        sim.treasures.restore(treasure, treasure._value, treasure._epoch, due)
+
+    # Cached paths belong to the checkpoint's step, not the replayed one
+    for agent in list(sim.path_cache.paths):
+        sim.path_cache.invalidate(agent)
+    sim.metrics.recount()
+    return sim
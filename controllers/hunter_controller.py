@@ -1,39 +1,83 @@
 from models.treasure import Treasure
-from utils.enums import CellType
+from utils.enums import CellType, EventType
 from ai.pathfinding.astar import astar
-import random
 
 
 class HunterController:
-    def __init__(self, grid, simulation_controller):
+    def __init__(self, grid, simulation_controller, distance_fields=None, path_cache=None, find_path=astar):
         self.grid = grid
         self.simulation_controller = simulation_controller
+        # Optional DistanceFieldCache shared by all hunters within a step
+        self.distance_fields = distance_fields
+        # Optional PathCache letting hunters follow their A* paths over several steps
+        self.path_cache = path_cache
+        # Path search with the signature of ai.pathfinding.astar.astar, see get_pathfinder()
+        self.find_path = find_path
 
     def process(self, hunter):
-        hunter.log(f"HUNTER CONTROLLER STARTING ({hunter.carrying}, {hunter}),"
-                   f"ALIVE {hunter.alive},"
-                   f"IS_RESTING_IN_HIDEOUT {hunter.is_resting_in_hideout},"
-                   f"STAMINA {hunter.stamina},"
-                   f"COLLAPSING {hunter.collapsing},"
-                   f"COLLAPSE COUNT {hunter.collapse_counter}")
+        metrics = self.grid.metrics
+        journal = self.grid.journal
+        if metrics is None and journal is None:
+            self._process(hunter)
+            return
+        x, y, carrying, alive = hunter.x, hunter.y, hunter.carrying, hunter.alive
+        delivered_to = self._process(hunter)
+        if metrics is not None:
+            metrics.hunter_changed(hunter, carrying, alive)
+            if carrying is not None and hunter.carrying is None:
+                # Hunters only give up a treasure on their own turn by storing it in a hideout
+                metrics.treasure_stored(carrying)
+        if journal is not None:
+            self._record(journal, hunter, x, y, carrying, alive, delivered_to)
+
+    def _record(self, journal, hunter, x, y, carrying, alive, delivered_to):
+        """
+        Journal what processing a hunter changed, given its state beforehand and the hideout
+        that received its treasure, if any.
+        """
+        if (hunter.x, hunter.y) != (x, y):
+            journal.record(EventType.MOVE, hunter, x=hunter.x, y=hunter.y)
+        if hunter.carrying is not carrying:
+            if carrying is not None and hunter.carrying is not None:
+                # Swapped for a more valuable treasure, the old one stays behind
+                journal.record(EventType.DROP, hunter, carrying, x, y, carrying.value)
+            elif delivered_to is not None:
+                journal.record(EventType.DELIVERY, hunter, delivered_to, delivered_to.x, delivered_to.y,
+                               carrying.value)
+            if hunter.carrying is not None:
+                journal.record(EventType.PICKUP, hunter, hunter.carrying, hunter.x, hunter.y, hunter.carrying.value)
+        if alive and not hunter.alive:
+            journal.record(EventType.COLLAPSE, hunter, x=hunter.x, y=hunter.y)
+
+    def _process(self, hunter):
+        """Run one turn of a hunter; returns the hideout it delivered a treasure to, if any."""
+        hunter.log("HUNTER CONTROLLER STARTING (%s, %s),"
+                   "ALIVE %s,"
+                   "IS_RESTING_IN_HIDEOUT %s,"
+                   "STAMINA %s,"
+                   "COLLAPSING %s,"
+                   "COLLAPSE COUNT %s",
+                   hunter.carrying, hunter, hunter.alive, hunter.is_resting_in_hideout(),
+                   hunter.stamina, hunter.collapsing, hunter.collapse_counter)
 
         # If the hunter is not alive, remove them from the simulation
         if not hunter.alive:
             self.simulation_controller.remove_hunter_from_list(hunter)
             self.grid.clear_cell(hunter.x, hunter.y)
-            hunter.log(f"Hunter is dead and removed from grid at ({hunter.x}, {hunter.y})")
+            hunter.log("Hunter is dead and removed from grid at (%s, %s)", hunter.x, hunter.y)
             return
 
         # If the hunter is inside a hideout
         if hunter.is_resting_in_hideout():
-            hunter.log(f"Hunter is at hideout ({hunter.carrying}, {hunter})")
+            hunter.log("Hunter is at hideout (%s, %s)", hunter.carrying, hunter)
+            delivered_to = None
             if hunter.carrying:
-                hunter.log(f"Reached hideout at ({hunter.x}, {hunter.y})")
-                hunter.deliver_treasure(self.simulation_controller)
+                hunter.log("Reached hideout at (%s, %s)", hunter.x, hunter.y)
+                delivered_to = hunter.deliver_treasure(self.simulation_controller)
                 hunter.log("Delivered treasure to hideout.")
 
             hunter.rest(self.grid)
-            return
+            return delivered_to
 
         # If stamina is exactly 0, set collapsing state if not already set
         if hunter.stamina == 0 and not hunter.collapsing:
@@ -48,7 +92,7 @@ class HunterController:
 
         # If the hunter is carrying the treasure
         if hunter.carrying:
-            hunter.log(f"Hunter carrying treasure: {hunter.carrying}")
+            hunter.log("Hunter carrying treasure: %s", hunter.carrying)
             path = self.get_safe_path_to_hideout(hunter)
             if path:
                 next_pos = path[0]
@@ -60,32 +104,31 @@ class HunterController:
                 # If the target cell is a hideout and has space, drop the treasure
                 if new_cell.cell_type == CellType.HIDEOUT:
                     hideout = new_cell.content
-                    hunter.log(f"Hideout hunter count: {len(hideout.hunters)}")
+                    hunter.log("Hideout hunter count: %s", len(hideout.hunters))
                     if hideout and len(hideout.hunters) < hideout.capacity:
                         hideout.stored_treasures.append(hunter.carrying)
-                        hunter.log(f"Stored treasure in hideout at ({new_x}, {new_y})")
+                        hunter.log("Stored treasure in hideout at (%s, %s)", new_x, new_y)
                         hunter.analyze_emotion_and_log("Resting in hideout to recover stamina.")
                         self.simulation_controller.remove_treasure_from_list(hunter.carrying)
                         hunter.carrying = None
                         hideout.add_hunter(hunter, self.grid)
-                        return
+                        return hideout
                     else:
-                        hunter.log(f"Hideout at ({new_x}, {new_y}) is full.")
+                        hunter.log("Hideout at (%s, %s) is full.", new_x, new_y)
                         hunter.move() # still reduce stamina
                         return
 
                 # If there is another hunter in the target cell, do not move
                 if new_cell.cell_type == CellType.HUNTER:
                     hunter.log("Target cell occupied by another hunter.")
-                    hunter.move() # Stamina -0.02
-                    nearby = self.grid.get_cells_in_radius(hunter.x, hunter.y, 1)
-                    hunter.scan_and_remember(nearby)
+                    hunter.move()
+                    self._scan(hunter)
                     return
 
                 if new_cell.cell_type == CellType.TREASURE:
                     new_treasure = new_cell.content
                     if new_treasure.value > hunter.carrying.value:
-                        hunter.log(f"Swapping with more valuable treasure at ({new_x}, {new_y})")
+                        hunter.log("Swapping with more valuable treasure at (%s, %s)", new_x, new_y)
                         old_cell = self.grid.get_cell(hunter.x, hunter.y)
                         if old_cell.cell_type != CellType.HIDEOUT and old_cell.cell_type != CellType.GARRISON:
                             old_cell.clear()
@@ -101,7 +144,7 @@ class HunterController:
                         hunter.x, hunter.y = new_x, new_y
                         self.grid.get_cell(new_x, new_y).set_transit_content(hunter, CellType.HUNTER)
                     else:
-                        hunter.log(f"Found lesser treasure at ({new_x}, {new_y}), ignoring.")
+                        hunter.log("Found lesser treasure at (%s, %s), ignoring.", new_x, new_y)
                         old_cell = self.grid.get_cell(hunter.x, hunter.y)
                         old_cell.clear()
 
@@ -112,27 +155,24 @@ class HunterController:
                         self.grid.get_cell(new_x, new_y).set_transit_content(hunter, CellType.HUNTER)
 
                     hunter.move()
-                    nearby = self.grid.get_cells_in_radius(hunter.x, hunter.y, 1)
-                    hunter.scan_and_remember(nearby)
+                    self._scan(hunter)
                     return
 
-                hunter.log(f"Moving to empty cell at ({new_x}, {new_y})")
+                hunter.log("Moving to empty cell at (%s, %s)", new_x, new_y)
                 old_cell = self.grid.get_cell(hunter.x, hunter.y)
                 old_cell.clear()
                 hunter.x, hunter.y = new_x, new_y
                 self.grid.get_cell(new_x, new_y).set_transit_content(hunter, CellType.HUNTER)
                 hunter.move()
-                nearby = self.grid.get_cells_in_radius(hunter.x, hunter.y, 1)
-                hunter.scan_and_remember(nearby)
+                self._scan(hunter)
                 return
             else:
                 hunter.log("Carrying treasure but no safe path to hideout found.")
                 hunter.move()
-                nearby = self.grid.get_cells_in_radius(hunter.x, hunter.y, 1)
-                hunter.scan_and_remember(nearby)
+                self._scan(hunter)
                 return
 
-        if hunter.stamina <= 0.06:
+        if hunter.stamina <= hunter.config.hunter_critical_stamina:
             hunter.log("Low stamina, trying to reach nearest hideout.")
             path = self.get_safe_path_to_hideout(hunter)
             if path:
@@ -146,11 +186,11 @@ class HunterController:
                 if new_cell.cell_type == CellType.HIDEOUT:
                     hideout = new_cell.content
                     if hideout and len(hideout.hunters) < hideout.capacity:
-                        hunter.log(f"Entering hideout at ({new_x}, {new_y}) to rest.")
+                        hunter.log("Entering hideout at (%s, %s) to rest.", new_x, new_y)
                         hideout.add_hunter(hunter, self.grid)
                         return
                     else:
-                        hunter.log(f"Hideout at ({new_x}, {new_y}) is full.")
+                        hunter.log("Hideout at (%s, %s) is full.", new_x, new_y)
                         hunter.move()
                         return
 
@@ -162,14 +202,13 @@ class HunterController:
                 elif new_cell.cell_type == CellType.TREASURE:
                     treasure = new_cell.content
                     hunter.carrying = treasure
-                    hunter.log(f"Picked up treasure at ({new_x}, {new_y}) worth {treasure.value}")
+                    hunter.log("Picked up treasure at (%s, %s) worth %s", new_x, new_y, treasure.value)
                     self.grid.clear_cell(new_x, new_y)
                     old_cell.clear()
                     hunter.x, hunter.y = new_x, new_y
                     self.grid.get_cell(new_x, new_y).set_transit_content(hunter, CellType.HUNTER)
                     hunter.move()
-                    nearby = self.grid.get_cells_in_radius(hunter.x, hunter.y, 1)
-                    hunter.scan_and_remember(nearby)
+                    self._scan(hunter)
                     return
 
                 else:
@@ -177,17 +216,15 @@ class HunterController:
                     hunter.x, hunter.y = new_x, new_y
                     self.grid.get_cell(new_x, new_y).set_transit_content(hunter, CellType.HUNTER)
                     hunter.move()
-                    nearby = self.grid.get_cells_in_radius(hunter.x, hunter.y, 1)
-                    hunter.scan_and_remember(nearby)
+                    self._scan(hunter)
                     return
             else:
                 hunter.log("No reachable hideout, standing still.")
                 hunter.move()
-                nearby = self.grid.get_cells_in_radius(hunter.x, hunter.y, 1)
-                hunter.scan_and_remember(nearby)
+                self._scan(hunter)
                 return
         else:
-            hunter.log(f"Hunter has enough stamina. Searching for treasure... {hunter}")
+            hunter.log("Hunter has enough stamina. Searching for treasure... %s", hunter)
             path = self.get_safe_path_to_treasure(hunter)
             if path:
                 next_pos = path[0]
@@ -200,7 +237,7 @@ class HunterController:
                 if new_cell.cell_type == CellType.TREASURE:
                     treasure = new_cell.content
                     hunter.carrying = treasure
-                    hunter.log(f"Collected treasure at ({new_x}, {new_y}) worth {treasure.value}")
+                    hunter.log("Collected treasure at (%s, %s) worth %s", new_x, new_y, treasure.value)
                     hunter.analyze_emotion_and_log(f"Found treasure worth {new_cell.content.value}")
                     self.grid.clear_cell(new_x, new_y)
 
@@ -208,16 +245,58 @@ class HunterController:
                 hunter.x, hunter.y = new_x, new_y
                 self.grid.get_cell(new_x, new_y).set_transit_content(hunter, CellType.HUNTER)
                 hunter.move()
-                nearby = self.grid.get_cells_in_radius(hunter.x, hunter.y, 1)
-                hunter.scan_and_remember(nearby)
+                self._scan(hunter)
                 return
             else:
                 hunter.log("No path to treasure — waiting and scanning.")
                 hunter.move()
-                nearby = self.grid.get_cells_in_radius(hunter.x, hunter.y, 1)
-                hunter.scan_and_remember(nearby)
+                self._scan(hunter)
                 return
 
+    def _scan(self, hunter):
+        """Let the hunter remember the treasures, hideouts and knights around it."""
+        nearby = self.grid.cells_in_radius_of_type(hunter.x, hunter.y, 1,
+                                                   CellType.TREASURE, CellType.HIDEOUT, CellType.KNIGHT)
+        now = self.simulation_controller.step_count if self.simulation_controller else 0
+        hunter.scan_and_remember(nearby, now)
+
+    def _field_path(self, kind, hunter, known_positions):
+        """
+        Next move towards the nearest target of the given kind using the shared distance field.
+        Only used when that target is one the hunter knows about; otherwise returns None so
+        the caller falls back to its cached path or A* over its known targets.
+        """
+        if self.distance_fields is None or not known_positions:
+            return None  # A hunter that knows no targets never builds the field
+
+        field = self.distance_fields.get(kind)
+        step = field.next_step(hunter.x, hunter.y)
+        if step is None:
+            return None
+
+        next_pos, target = step
+        if target in known_positions and field.is_live_source(target):
+            hunter.log("Distance field move towards %s at %s: %s", kind, target, next_pos)
+            return [next_pos]
+        return None
+
+    def _cached_path(self, hunter, kind, goal_is_live=None):
+        if self.path_cache is None:
+            return None
+        path = self.path_cache.path(hunter, kind, goal_is_live)
+        if path:
+            hunter.log("Following cached path to %s: %s", kind, path)
+        return path
+
+    def _remember(self, hunter, kind, path):
+        if self.path_cache is not None:
+            self.path_cache.store(hunter, kind, path)
+
+    def _hideout_has_room(self, pos):
+        cell = self.grid.get_cell(*pos)
+        hideout = cell.content if cell.cell_type == CellType.HIDEOUT else None
+        return hideout is not None and len(hideout.hunters) < hideout.capacity
+
     def get_safe_path_to_treasure(self, hunter):
         """
         Returns a safe path to the best known treasure,
@@ -225,11 +304,20 @@ class HunterController:
         """
 
         hunter.log("Searching for safe path to known treasures.")
-        hunter.log(f"Known treasures: {hunter.known_treasures}")
+        hunter.log("Known treasures: %s", hunter.known_treasures)
 
-        for pos in hunter.known_treasures:
-            cell = self.grid.get_cell(*pos)
-            hunter.log(f"Checking cell at {pos} → type: {cell.cell_type.name}, content: {repr(cell.content)}")
+        field_path = self._field_path("treasure", hunter, hunter.known_treasures)
+        if field_path:
+            return field_path
+
+        cached_path = self._cached_path(hunter, "treasure")
+        if cached_path:
+            return cached_path
+
+        if hunter.log_enabled():
+            for pos in hunter.known_treasures:
+                cell = self.grid.get_cell(*pos)
+                hunter.log("Checking cell at %s → type: %s, content: %r", pos, cell.cell_type.name, cell.content)
 
         valid_known_treasures = [
             pos for pos in hunter.known_treasures
@@ -237,7 +325,7 @@ class HunterController:
                isinstance(self.grid.get_cell(*pos).content, Treasure)
         ]
 
-        hunter.log(f"Valid known treasures: {valid_known_treasures}")
+        hunter.log("Valid known treasures: %s", valid_known_treasures)
 
         if valid_known_treasures:
             sorted_treasures = sorted(
@@ -247,27 +335,28 @@ class HunterController:
                     -self.grid.get_cell(*pos).content.value
                 )
             )
-            hunter.log(f"Sorted treasures by distance & value: {sorted_treasures}")
+            hunter.log("Sorted treasures by distance & value: %s", sorted_treasures)
 
             for treasure_pos in sorted_treasures:
-                hunter.log(f"Trying path to treasure at {treasure_pos}")
-                path = astar(self.grid, (hunter.x, hunter.y), treasure_pos)
+                hunter.log("Trying path to treasure at %s", treasure_pos)
+                path = self.find_path(self.grid, (hunter.x, hunter.y), treasure_pos)
                 if path:
-                    hunter.log(f"Path found: {path}")
+                    hunter.log("Path found: %s", path)
                     is_safe = all(
                         self.grid.get_cell(*pos).cell_type not in [
                             CellType.KNIGHT, CellType.GARRISON, CellType.HIDEOUT
                         ]
                         for pos in path
                     )
-                    hunter.log(f"Path safety: {'SAFE' if is_safe else 'UNSAFE'}")
+                    hunter.log("Path safety: %s", 'SAFE' if is_safe else 'UNSAFE')
                     if is_safe:
+                        self._remember(hunter, "treasure", path)
                         return path
                 else:
-                    hunter.log(f"No path found to {treasure_pos}")
+                    hunter.log("No path found to %s", treasure_pos)
 
         neighbors = self.grid.get_neighbors(hunter.x, hunter.y)
-        hunter.log(f"Scanning nearby cells: {neighbors}")
+        hunter.log("Scanning nearby cells: %s", neighbors)
 
         best_treasure = None
         best_value = -1
@@ -275,19 +364,19 @@ class HunterController:
         for nx, ny in neighbors:
             cell = self.grid.get_cell(nx, ny)
             if cell.cell_type == CellType.TREASURE and isinstance(cell.content, Treasure):
-                hunter.log(f"Nearby treasure at ({nx}, {ny}) with value {cell.content.value}")
+                hunter.log("Nearby treasure at (%s, %s) with value %s", nx, ny, cell.content.value)
                 if cell.content.value > best_value:
                     best_value = cell.content.value
                     best_treasure = (nx, ny)
 
         if best_treasure:
-            hunter.log(f"Found nearby treasure at {best_treasure}")
+            hunter.log("Found nearby treasure at %s", best_treasure)
             return [best_treasure]
 
         for nx, ny in neighbors:
             cell = self.grid.get_cell(nx, ny)
             if cell.is_empty():
-                hunter.log(f"No treasure found — fallback to empty cell at ({nx}, {ny})")
+                hunter.log("No treasure found — fallback to empty cell at (%s, %s)", nx, ny)
                 return [(nx, ny)]
 
         hunter.log("No valid path or fallback cell found.")
@@ -303,7 +392,15 @@ class HunterController:
         """
 
         hunter.log("Searching for safe path to hideout.")
-        hunter.log(f"Known hideouts: {hunter.known_hideouts}")
+        hunter.log("Known hideouts: %s", hunter.known_hideouts)
+
+        field_path = self._field_path("hideout", hunter, hunter.known_hideouts)
+        if field_path:
+            return field_path
+
+        cached_path = self._cached_path(hunter, "hideout", self._hideout_has_room)
+        if cached_path:
+            return cached_path
 
         if hunter.known_hideouts:
             sorted_hideouts = sorted(
@@ -312,52 +409,57 @@ class HunterController:
             )
 
             for hideout_pos in sorted_hideouts:
-                hunter.log(f"Trying path to hideout at {hideout_pos}")
-                path = astar(self.grid, (hunter.x, hunter.y), hideout_pos)
-                hunter.log(f"Path to hideout: {path}")
+                if not self._hideout_has_room(hideout_pos):
+                    # A full hideout is rejected below anyway; skip the search
+                    hunter.log("Hideout at %s is full, skipping.", hideout_pos)
+                    continue
+                hunter.log("Trying path to hideout at %s", hideout_pos)
+                path = self.find_path(self.grid, (hunter.x, hunter.y), hideout_pos)
+                hunter.log("Path to hideout: %s", path)
                 if path:
-                    hunter.log(f"A* path found to {hideout_pos}: {path}")
+                    hunter.log("A* path found to %s: %s", hideout_pos, path)
                     dangerous = any(self.grid.get_cell(*pos).cell_type.name in ["GARRISON", "KNIGHT"] for pos in path)
                     if dangerous:
-                        hunter.log(f"Path includes danger (Garrison/Knight), skipping.")
+                        hunter.log("Path includes danger (Garrison/Knight), skipping.")
                         continue
 
                     target_cell = self.grid.get_cell(*path[-1])
                     if target_cell.cell_type == CellType.HIDEOUT:
                         hideout = target_cell.content
                         if hideout:
-                            hunter.log(
-                                f"Hideout at ({target_cell.x}, {target_cell.y}) has {len(hideout.hunters)} / {hideout.capacity}")
+                            hunter.log("Hideout at (%s, %s) has %s / %s", target_cell.x, target_cell.y,
+                                       len(hideout.hunters), hideout.capacity)
                             if len(hideout.hunters) < hideout.capacity:
-                                hunter.log(f"Safe path confirmed to hideout at {hideout_pos}")
+                                hunter.log("Safe path confirmed to hideout at %s", hideout_pos)
+                                self._remember(hunter, "hideout", path)
                                 return path
                         else:
-                            hunter.log(f"Target cell marked as HIDEOUT has no content.")
+                            hunter.log("Target cell marked as HIDEOUT has no content.")
 
                 else:
-                    hunter.log(f"No path found to {hideout_pos}")
+                    hunter.log("No path found to %s", hideout_pos)
 
         hunter.log("Checking adjacent neighbors for direct hideout entry...")
         neighbors = self.grid.get_neighbors(hunter.x, hunter.y)
         for nx, ny in neighbors:
             cell = self.grid.get_cell(nx, ny)
-            hunter.log(f"Neighbor at ({nx}, {ny}) → type: {cell.cell_type}")
+            hunter.log("Neighbor at (%s, %s) → type: %s", nx, ny, cell.cell_type)
             if cell.cell_type == CellType.HIDEOUT:
                 hideout = cell.content
                 if hideout:
-                    hunter.log(f"Adjacent hideout at ({nx}, {ny}) → {len(hideout.hunters)} / {hideout.capacity}")
+                    hunter.log("Adjacent hideout at (%s, %s) → %s / %s", nx, ny, len(hideout.hunters), hideout.capacity)
                     if len(hideout.hunters) < hideout.capacity:
-                        hunter.log(f"Entering adjacent hideout at ({nx}, {ny})")
+                        hunter.log("Entering adjacent hideout at (%s, %s)", nx, ny)
                         return [(nx, ny)]
                 else:
-                    hunter.log(f"Adjacent hideout at ({nx}, {ny}) has no content.")
+                    hunter.log("Adjacent hideout at (%s, %s) has no content.", nx, ny)
 
         hunter.log("Looking for valid fallback cell...")
         for nx, ny in neighbors:
             cell = self.grid.get_cell(nx, ny)
-            hunter.log(f"Checking neighbor ({nx}, {ny}) → type: {cell.cell_type}")
+            hunter.log("Checking neighbor (%s, %s) → type: %s", nx, ny, cell.cell_type)
             if cell.cell_type not in [CellType.GARRISON, CellType.KNIGHT, CellType.HUNTER]:
-                hunter.log(f"Valid fallback move to ({nx}, {ny})")
+                hunter.log("Valid fallback move to (%s, %s)", nx, ny)
                 return [(nx, ny)]
 
         hunter.log("No safe move available — waiting.")
@@ -1,36 +1,54 @@
 from models.hunter import Hunter
-from utils.enums import CellType
+from utils.enums import CellType, EventType
 from ai.pathfinding.astar import astar
-import random
 
 class KnightController:
-    def __init__(self, grid):
+    def __init__(self, grid, distance_fields=None, path_cache=None, find_path=astar):
         self.grid = grid
+        # Optional DistanceFieldCache shared by all knights within a step
+        self.distance_fields = distance_fields
+        # Optional PathCache letting knights follow their A* paths over several steps
+        self.path_cache = path_cache
+        # Path search with the signature of ai.pathfinding.astar.astar, see get_pathfinder()
+        self.find_path = find_path
 
     def process(self, knight):
-        knight.log(f"KnightController started for {knight}, {knight.name}")
+        metrics = self.grid.metrics
+        journal = self.grid.journal
+        if metrics is None and journal is None:
+            self._process(knight)
+            return
+        x, y, resting = knight.x, knight.y, knight.resting
+        self._process(knight)
+        if metrics is not None:
+            metrics.knight_changed(knight, resting)
+        if journal is not None and (knight.x, knight.y) != (x, y):
+            journal.record(EventType.MOVE, knight, x=knight.x, y=knight.y)
+
+    def _process(self, knight):
+        knight.log("KnightController started for %s, %s", knight, knight.name)
 
         # If the knight is already resting, continue resting
         if knight.resting:
-            knight.log(f"{knight.name} is resting.")
+            knight.log("%s is resting.", knight.name)
             knight.rest()
             if not knight.resting:
-                knight.log(f"{knight.name} has recovered and is active again.")
+                knight.log("%s has recovered and is active again.", knight.name)
             return
 
         # If the knight is too tired, initiate resting
         if knight.should_rest():
             knight.resting = True
-            knight.log(f"{knight.name} is too tired and starts resting.")
+            knight.log("%s is too tired and starts resting.", knight.name)
             if knight.garrison:
                 knight.garrison.add_knight(knight)
             else:
                 knight.rest()
             return
 
-        nearby_cells = self.grid.get_cells_in_radius(knight.x, knight.y, 3)
+        nearby_cells = self.grid.cells_in_radius_of_type(knight.x, knight.y, 3, CellType.HUNTER)
         visible_hunters = knight.detect_hunters(nearby_cells)
-        knight.log(f"Detected {len(visible_hunters)} hunter(s).")
+        knight.log("Detected %s hunter(s).", len(visible_hunters))
 
         if visible_hunters:
             path = self.get_safe_path_to_hunter(knight, [(h.x, h.y) for h in visible_hunters])
@@ -44,11 +62,11 @@ class KnightController:
 
                 if new_cell.cell_type == CellType.EMPTY:
                     knight.move_to(new_x, new_y)
-                    knight.energy = max(0, round(knight.energy - 0.2, 2))
+                    knight.energy = max(0, round(knight.energy - knight.config.knight_chase_cost, 2))
                 elif new_cell.cell_type == CellType.HUNTER and isinstance(new_cell.content, Hunter):
                     knight.interact_with_hunter(new_cell.content, method="detain")
-                    knight.log(f"Detained hunter: {new_cell.content}")
-                    knight.energy = max(0, round(knight.energy - 0.2, 2))
+                    knight.log("Detained hunter: %s", new_cell.content)
+                    knight.energy = max(0, round(knight.energy - knight.config.knight_chase_cost, 2))
                 else:
                     knight.log("Target cell not reachable. Switching to patrol.")
                     knight.target = None
@@ -63,24 +81,40 @@ class KnightController:
             self.random_patrol(knight)
 
     def random_patrol(self, knight):
-        dx, dy = random.choice([(-1, 0), (1, 0), (0, -1), (0, 1)])
+        dx, dy = self.grid.rng.choice([(-1, 0), (1, 0), (0, -1), (0, 1)])
         new_x, new_y = self.grid.wrap(knight.x + dx, knight.y + dy)
         cell = self.grid.get_cell(new_x, new_y)
 
         if cell and cell.cell_type == CellType.EMPTY:
             knight.move_to(new_x, new_y)
-            knight.log(f"{knight.name} patrolled to empty cell at ({new_x}, {new_y})")
+            knight.log("%s patrolled to empty cell at (%s, %s)", knight.name, new_x, new_y)
         elif cell and cell.cell_type == CellType.HUNTER and cell.content:
             knight.interact_with_hunter(cell.content, method="detain")
-            knight.log(f"{knight.name} patrolled into hunter cell and detained: {cell.content.name}")
+            knight.log("%s patrolled into hunter cell and detained: %s", knight.name, cell.content.name)
         else:
-            knight.log(f"{knight.name} attempted patrol to non-empty cell. Staying in place.")
+            knight.log("%s attempted patrol to non-empty cell. Staying in place.", knight.name)
 
-        knight.energy = max(0, round(knight.energy - 0.2, 2))
-        knight.log(f"{knight.name} lost 0.2 energy during patrol. Current energy: {knight.energy:.2f}")
+        knight.energy = max(0, round(knight.energy - knight.config.knight_chase_cost, 2))
+        knight.log("%s lost %s energy during patrol. Current energy: %.2f",
+                   knight.name, knight.config.knight_chase_cost, knight.energy)
 
     def get_safe_path_to_hunter(self, knight, visible_hunters):
-        knight.log(f"get_safe_path_to_hunter called. Knight: {knight}")
+        knight.log("get_safe_path_to_hunter called. Knight: %s", knight)
+
+        if self.distance_fields is not None and visible_hunters:
+            field = self.distance_fields.get("hunter")
+            step = field.next_step(knight.x, knight.y)
+            if step:
+                next_pos, target = step
+                if target in visible_hunters and field.is_live_source(target):
+                    return [next_pos]
+
+        if self.path_cache is not None:
+            # The chased hunter must still be in sight; once it moves its cell changes and the path is dropped
+            cached_path = self.path_cache.path(knight, "hunter", lambda pos: pos in visible_hunters)
+            if cached_path:
+                return cached_path
+
         valid_visible_hunters = [
             pos for pos in visible_hunters
             if self.grid.get_cell(*pos).cell_type == CellType.HUNTER and
@@ -94,7 +128,7 @@ class KnightController:
             )
 
             for hunter_pos in sorted_hunters:
-                path = astar(self.grid, (knight.x, knight.y), hunter_pos, role="knight")
+                path = self.find_path(self.grid, (knight.x, knight.y), hunter_pos, role="knight")
                 if path:
                     is_safe = all(
                         self.grid.get_cell(*pos).cell_type not in [
@@ -103,6 +137,9 @@ class KnightController:
                         for pos in path[1:]
                     )
                     if is_safe:
+                        if self.path_cache is not None:
+                            target = self.grid.get_cell(*hunter_pos).content
+                            self.path_cache.store(knight, "hunter", path, role="knight", target=target)
                         return path
         neighbors = self.grid.get_knight_neighbors(knight.x, knight.y)
         for nx, ny in neighbors:
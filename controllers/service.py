@@ -0,0 +1,285 @@
+"""
+Asyncio service hosting many headless simulations in one process, driven over a local socket.
+
+Clients send one JSON object per line and get one JSON object per line back:
+
+    {"cmd": "create", "seed": 1, "grid_size": 30}       -> {"ok": true, "sim": 1, ...}
+    {"cmd": "create", "config": {"hunter_move_cost": 0.01}} (any utils.config.WorldConfig fields)
+    {"cmd": "step", "sim": 1, "steps": 10}               -> {"ok": true, "step": 10, "running": true, ...}
+    {"cmd": "snapshot", "sim": 1}                        -> {"ok": true, "cells": "<base64>", "counts": {...}, ...}
+    {"cmd": "stream", "sim": 1, "steps": 100, "every": 5} -> {"event": "frame", ...} lines, then {"ok": true, ...}
+    {"cmd": "close", "sim": 1}, {"cmd": "list"}
+
+An "id" in a request is echoed in its response. Failures, including malformed requests,
+answer {"ok": false, "error": "..."} and leave the connection open.
+Stepping runs on an executor so the event loop keeps serving other clients, and each
+simulation is stepped by one request at a time. The service only listens on localhost
+(TCP) or on a Unix socket.
+
+    python main.py --serve --port 8765
+"""
+import asyncio
+import base64
+import functools
+import itertools
+import json
+import os
+import stat
+from concurrent.futures import ThreadPoolExecutor
+
+from ai.pathfinding import PATHFINDERS
+from controllers.simulation_controller import GRID_BACKENDS, SimulationController
+from controllers.simulation_worker import make_frame
+from utils.config import DEFAULT_DENSITIES, WorldConfig
+from utils.logger import get_logger
+
+logger = get_logger("service")
+
+DEFAULT_PORT = 8765
+LOCAL_HOSTS = ("127.0.0.1", "localhost", "::1")
+MAX_LINE = 1 << 20  # Longest request line accepted, in bytes
+# SimulationController arguments a create request may set. Sentiment scoring is a process-wide
+# switch, so it is a setting of the whole service (SimulationService(sentiment=...)), not of one create.
+CREATE_OPTIONS = ("seed", "grid_size", "densities", "grid_backend", "pathfinder", "config")
+
+
+class ServiceError(Exception):
+    """A request that cannot be served; its message is sent back to the client."""
+
+
+def _integer(request, name, default):
+    value = request.get(name, default)
+    if type(value) is not int:
+        raise ServiceError(f"{name} must be an integer, got {value!r}")
+    return value
+
+
+def _number(value):
+    return type(value) in (int, float)
+
+
+def _check_create_options(options):
+    """Reject create options of the wrong type before they reach SimulationController."""
+    if "seed" in options and options["seed"] is not None and type(options["seed"]) not in (int, str):
+        raise ServiceError("seed must be an integer, a string or null")
+    if "grid_size" in options and type(options["grid_size"]) is not int:
+        raise ServiceError("grid_size must be an integer")
+    densities = options.get("densities", {})
+    if not isinstance(densities, dict) or not all(
+            name in DEFAULT_DENSITIES and _number(value) for name, value in densities.items()):
+        raise ServiceError(f"densities must map entity names {list(DEFAULT_DENSITIES)} to numbers")
+    if options.get("grid_backend", GRID_BACKENDS[0]) not in GRID_BACKENDS:
+        raise ServiceError(f"grid_backend must be one of {list(GRID_BACKENDS)}")
+    if options.get("pathfinder", PATHFINDERS[0]) not in PATHFINDERS:
+        raise ServiceError(f"pathfinder must be one of {list(PATHFINDERS)}")
+    config = options.get("config", {})
+    if not isinstance(config, dict) or not all(_number(value) for value in config.values()):
+        raise ServiceError("config must map WorldConfig fields to numbers")
+
+
+class HostedSimulation:
+    __slots__ = ("sim", "lock", "running")
+
+    def __init__(self, sim):
+        self.sim = sim
+        self.lock = asyncio.Lock()  # One request steps or reads the simulation at a time
+        self.running = True
+
+
+def _advance(sim, steps):
+    """Step up to `steps` times; returns False once the simulation has ended."""
+    for _ in range(steps):
+        if not sim.step():
+            return False
+    return True
+
+
+def _frame_message(sim_id, hosted):
+    frame = make_frame(hosted.sim, finished=not hosted.running)
+    return {
+        "sim": sim_id,
+        "step": frame.step,
+        "running": hosted.running,
+        "size": hosted.sim.grid.size,
+        "cells": base64.b64encode(frame.cell_types).decode("ascii"),
+        "counts": {cell_type.name: count for cell_type, count in frame.counts},
+        "metrics": hosted.sim.metrics.record(),
+    }
+
+
+class SimulationService:
+    def __init__(self, executor=None, sentiment=False):
+        """:param sentiment: score hunter messages in every hosted simulation, see nlp.sentiment_analyzer"""
+        self.sentiment = sentiment
+        self.simulations = {}
+        self._ids = itertools.count(1)
+        self.executor = executor or ThreadPoolExecutor(thread_name_prefix="simulation")
+        self.commands = {
+            "create": self.create,
+            "step": self.step,
+            "snapshot": self.snapshot,
+            "stream": self.stream,
+            "close": self.close,
+            "list": self.list_simulations,
+        }
+
+    async def _run(self, function, *args, **kwargs):
+        loop = asyncio.get_running_loop()
+        return await loop.run_in_executor(self.executor, functools.partial(function, *args, **kwargs))
+
+    def _hosted(self, request):
+        sim_id = request.get("sim")
+        hosted = self.simulations.get(sim_id) if type(sim_id) is int else None
+        if hosted is None:
+            raise ServiceError(f"Unknown simulation: {sim_id!r}")
+        return sim_id, hosted
+
+    def _check_open(self, sim_id, hosted):
+        """Call with hosted.lock held: the simulation may have been closed while waiting for it."""
+        if self.simulations.get(sim_id) is not hosted:
+            raise ServiceError(f"Simulation {sim_id} was closed")
+
+    # --- Commands: each takes the request and a coroutine sending extra messages ---
+
+    async def create(self, request, send):
+        unknown = set(request) - set(CREATE_OPTIONS) - {"cmd", "id"}
+        if unknown:
+            raise ServiceError(f"Unknown options: {sorted(unknown)}")
+        options = {name: request[name] for name in CREATE_OPTIONS if name in request}
+        _check_create_options(options)
+        try:
+            if "config" in options:
+                options["config"] = WorldConfig(**options["config"])
+            sim = await self._run(SimulationController, headless=True, sentiment=self.sentiment, **options)
+        except (TypeError, ValueError) as error:
+            raise ServiceError(str(error)) from error
+        sim_id = next(self._ids)
+        self.simulations[sim_id] = HostedSimulation(sim)
+        logger.info("Created simulation %s: %s", sim_id, options)
+        return {"sim": sim_id, "size": sim.grid.size, "step": sim.step_count}
+
+    async def step(self, request, send):
+        sim_id, hosted = self._hosted(request)
+        steps = _integer(request, "steps", 1)
+        async with hosted.lock:
+            self._check_open(sim_id, hosted)
+            if hosted.running:
+                hosted.running = await self._run(_advance, hosted.sim, steps)
+            return {"sim": sim_id, "step": hosted.sim.step_count, "running": hosted.running,
+                    "metrics": hosted.sim.metrics.record()}
+
+    async def snapshot(self, request, send):
+        sim_id, hosted = self._hosted(request)
+        async with hosted.lock:
+            self._check_open(sim_id, hosted)
+            return _frame_message(sim_id, hosted)
+
+    async def stream(self, request, send):
+        """Step the simulation and send a frame every `every` steps."""
+        sim_id, hosted = self._hosted(request)
+        steps = _integer(request, "steps", 1)
+        every = max(1, _integer(request, "every", 1))
+        async with hosted.lock:
+            self._check_open(sim_id, hosted)
+            done = 0
+            while hosted.running and done < steps:
+                chunk = min(every, steps - done)
+                hosted.running = await self._run(_advance, hosted.sim, chunk)
+                done += chunk
+                await send({"event": "frame", **_frame_message(sim_id, hosted)})
+            return {"sim": sim_id, "step": hosted.sim.step_count, "running": hosted.running}
+
+    async def close(self, request, send):
+        sim_id, hosted = self._hosted(request)
+        async with hosted.lock:
+            self._check_open(sim_id, hosted)
+            del self.simulations[sim_id]
+        return {"sim": sim_id}
+
+    async def list_simulations(self, request, send):
+        return {"sims": [{"sim": sim_id, "step": hosted.sim.step_count, "running": hosted.running}
+                         for sim_id, hosted in self.simulations.items()]}
+
+    # --- Connections ---
+
+    async def handle_request(self, request, send):
+        """Serve one decoded request and return its response."""
+        if not isinstance(request, dict):
+            raise ServiceError("Requests must be JSON objects")
+        command = self.commands.get(request.get("cmd"))
+        if command is None:
+            raise ServiceError(f"Unknown command: {request.get('cmd')!r}")
+        return await command(request, send)
+
+    async def handle_client(self, reader, writer):
+        async def send(message):
+            writer.write(json.dumps(message).encode("utf-8") + b"\n")
+            await writer.drain()
+
+        try:
+            while True:
+                try:
+                    line = await reader.readline()
+                except ValueError:
+                    await send({"ok": False, "error": "Request line too long"})
+                    break
+                if not line:
+                    break
+                request = None
+                try:
+                    request = json.loads(line)
+                    response = {"ok": True, **await self.handle_request(request, send)}
+                except json.JSONDecodeError as error:
+                    response = {"ok": False, "error": f"Invalid JSON: {error}"}
+                except (ServiceError, ValueError) as error:
+                    response = {"ok": False, "error": str(error)}
+                except Exception as error:  # A bug or unforeseen input must not end the connection
+                    logger.exception("Request failed: %r", request)
+                    response = {"ok": False, "error": f"{type(error).__name__}: {error}"}
+                if isinstance(request, dict) and "id" in request:
+                    response["id"] = request["id"]
+                await send(response)
+        except ConnectionError:
+            logger.debug("Client disconnected")
+        finally:
+            writer.close()
+
+    async def start(self, host="127.0.0.1", port=DEFAULT_PORT, path=None):
+        """Start listening on localhost TCP, or on a Unix socket when path is given."""
+        if path is not None:
+            _remove_stale_socket(path)
+            return await asyncio.start_unix_server(self.handle_client, path=path, limit=MAX_LINE)
+        if host not in LOCAL_HOSTS:
+            raise ValueError(f"The simulation service only listens on localhost, not {host}")
+        return await asyncio.start_server(self.handle_client, host, port, limit=MAX_LINE)
+
+    def shutdown(self):
+        self.executor.shutdown(wait=False, cancel_futures=True)
+
+
+def _remove_stale_socket(path):
+    """Remove a socket file left behind by a service that did not shut down cleanly."""
+    try:
+        if stat.S_ISSOCK(os.stat(path).st_mode):
+            os.unlink(path)
+    except FileNotFoundError:
+        pass
+
+
+def serve(host="127.0.0.1", port=DEFAULT_PORT, path=None, sentiment=False):
+    """Run the service until interrupted."""
+    async def main():
+        service = SimulationService(sentiment=sentiment)
+        server = await service.start(host, port, path)
+        address = path or f"{host}:{port}"
+        logger.info("Simulation service listening on %s", address)
+        try:
+            async with server:
+                await server.serve_forever()
+        finally:
+            service.shutdown()
+
+    try:
+        asyncio.run(main())
+    except KeyboardInterrupt:
+        pass
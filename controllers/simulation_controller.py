@@ -1,54 +1,133 @@
 import random
-import sys
 import time
 
+from ai.pathfinding import get_pathfinder
+from ai.pathfinding.distance_field import DistanceFieldCache
+from ai.pathfinding.path_cache import PathCache
 from models.garrison import Garrison
 from models.grid import Grid
 from models.hunter import Hunter
 from models.knight import Knight
 from models.treasure import Treasure
+from models.treasure_pool import TreasurePool
+from nlp import sentiment_analyzer
 from models.hideout import Hideout
-from utils.enums import HunterSkill, TreasureType
+from utils.config import DEFAULT_DENSITIES, WorldConfig
+from utils.enums import CellType, HunterSkill, TreasureType
 from controllers.hunter_controller import HunterController
 from controllers.knight_controller import KnightController
-from view.gui import Gui
+from utils.logger import get_logger
+from utils.metrics import Metrics
+
+logger = get_logger("simulation")
+
+GRID_BACKENDS = ("object", "array")
 
 
 class SimulationController:
-    def __init__(self):
-        sys.stdout = open("simulation_log.txt", "w", buffering=1)
+    def __init__(self, headless=False, observer=None, step_delay=None, grid_backend="object", seed=None,
+                 grid_size=None, densities=None, sentiment=None, instrumentation=None, pathfinder="astar",
+                 populate=True, journal=None, config=None):
+        """
+        :param headless: when True no GUI is created (and Tk is never imported) and
+                         no delay is applied between steps.
+        :param observer: optional object with render() and is_closed() notified after
+                         every step; replaces the Tk window when given.
+        :param step_delay: seconds to sleep between steps, for pacing. Defaults to 0, except
+                           0.2 for an observer rendered synchronously after every step.
+        :param grid_backend: "object" for the Cell-based Grid or "array" for the NumPy ArrayGrid,
+                             which scales to much larger worlds.
+        :param seed: seed of the simulation's own random.Random; every random decision of the
+                     run draws from it, so equal seeds replay the same run.
+        :param grid_size: side length of the square world, overriding the config's.
+        :param densities: overrides for the config's densities, e.g. {"hunter": 0.3}.
+        :param sentiment: score the hunters' messages with TextBlob; defaults to on with the GUI
+                          and off in headless mode. The switch is process-wide.
+        :param instrumentation: optional utils.instrumentation.Instrumentation recording
+                                per-step phase timers and work counters.
+        :param pathfinder: "astar" or "hpa" (hierarchical, for large worlds), see get_pathfinder().
+        :param journal: optional utils.journal.Journal recording every event of the run.
+        :param populate: fill the grid with random entities; False leaves it empty, e.g. for
+                         controllers.checkpoint to restore a saved world into.
+        :param config: utils.config.WorldConfig with the size, densities and rules of the world;
+                       it is handed to every entity created. Defaults to WorldConfig().
+        """
+        self.config = config = (config or WorldConfig()).replace(grid_size=grid_size, densities=densities)
+        self.densities = config.densities
+        self.seed = seed
+        self.rng = random.Random(seed)
+        grid_size = config.grid_size
 
-        self.grid = Grid(size=20, simulation_controller=self)
+        if grid_backend not in GRID_BACKENDS:
+            raise ValueError(f"Unknown grid backend {grid_backend!r}, expected one of {GRID_BACKENDS}")
+        self.grid_backend = grid_backend
+        if grid_backend == "array":
+            # Imported here so NumPy is only loaded when the array backend is used
+            from models.array_grid import ArrayGrid
+            self.grid = ArrayGrid(size=grid_size, simulation_controller=self, rng=self.rng)
+        else:
+            self.grid = Grid(size=grid_size, simulation_controller=self, rng=self.rng)
+        self.instrumentation = instrumentation
+        self.grid.instrumentation = instrumentation
         self.hunters = []
         self.knights = []
         self.hideouts = []
-        self.treasures = []
+        self.treasures = TreasurePool(decay_percent=config.treasure_decay)
         self.garrisons = []
 
-        self.hunter_controller = HunterController(self.grid, self)
-        self.knight_controller = KnightController(self.grid)
+        # Distance fields are rebuilt once per step and shared by every agent of a role
+        self.distance_fields = DistanceFieldCache(self.grid)
+        # A* paths are kept across steps until a cell on them changes
+        self.path_cache = PathCache(self.grid)
+        self.pathfinder = pathfinder
+        self.find_path = find_path = get_pathfinder(pathfinder)
+        self.hunter_controller = HunterController(self.grid, self, self.distance_fields, self.path_cache, find_path)
+        self.knight_controller = KnightController(self.grid, self.distance_fields, self.path_cache, find_path)
+
+        logger.debug("SIMULATION CONTROLLER IS STARTING: %s", self)
 
-        print(f"SIMULATION CONTROLLER IS STARTING: {self}", flush=True)
+        self.headless = headless
+        sentiment_analyzer.set_enabled(not headless if sentiment is None else sentiment)
+        self.step_count = 0
 
-        self._populate_random_grid()
-        self.gui = Gui(self.grid, self)
+        if populate:
+            self._populate_random_grid()
+        # Outcome counters kept up to date as agents change state, see utils.metrics
+        self.metrics = Metrics(self)
+        self.journal = journal
+        if journal is not None and populate:
+            journal.attach(self.grid)
+
+        if observer is None and not headless:
+            # Imported here so headless runs never load tkinter
+            from view.gui import Gui
+            observer = Gui(self.grid, self)
+        self.observer = observer
+        if step_delay is None:
+            # The Tk Gui follows frames from a background worker and never waits for a step,
+            # so only observers rendered on this thread are paced by default
+            synchronous = observer is not None and not hasattr(observer, "follow")
+            step_delay = 0.2 if synchronous and not headless else 0
+        self.step_delay = step_delay
 
     def remove_treasure_from_list(self, treasure):
         """Remove the treasure from the simulation."""
-        print(f"TREASURE REMOVED: {treasure}")
+        logger.debug("TREASURE REMOVED: %s", treasure)
         if treasure in self.treasures:
             self.treasures.remove(treasure)
-        print(f"CURRENT TREASURES: {len(self.treasures)}, {self.treasures}")
+        logger.debug("CURRENT TREASURES: %s, %s", len(self.treasures), self.treasures)
 
     def add_treasure_to_list(self, treasure):
         """Add the treasure back to the simulation list if it's not already present."""
         if treasure not in self.treasures:
             self.treasures.append(treasure)
-            print(f"TREASURE ADDED BACK: {treasure}")
+            logger.debug("TREASURE ADDED BACK: %s", treasure)
 
     def remove_hunter_from_list(self, hunter):
         if hunter in self.hunters:
             self.hunters.remove(hunter)
+            self.metrics.hunter_removed(hunter)
+            self.path_cache.invalidate(hunter)
             cell = self.grid.get_cell(hunter.x, hunter.y)
             cell.clear()
 
@@ -56,97 +135,183 @@ class SimulationController:
         size = self.grid.size
         total_cells = size * size
         all_positions = [(x, y) for x in range(size) for y in range(size)]
-        random.shuffle(all_positions)
+        self.rng.shuffle(all_positions)
 
-        num_empty = int(total_cells * 0.60)
-        num_treasure = int(total_cells * 0.04)
-        num_knight = int(total_cells * 0.04)
-        num_hunter = int(total_cells * 0.20)
-        num_hideout = int(total_cells * 0.10)
-        num_garrison = int(total_cells * 0.02)
+        num_treasure = int(total_cells * self.densities["treasure"])
+        num_knight = int(total_cells * self.densities["knight"])
+        num_hunter = int(total_cells * self.densities["hunter"])
+        num_hideout = int(total_cells * self.densities["hideout"])
+        num_garrison = int(total_cells * self.densities["garrison"])
+        num_empty = total_cells - num_treasure - num_knight - num_hunter - num_hideout - num_garrison
 
-        print(f"Grid Initialization: empty={num_empty}, treasure={num_treasure}, knight={num_knight}, "
-              f"hunter={num_hunter}, hideout={num_hideout}, garrison={num_garrison}")
+        logger.info("Grid Initialization: empty=%s, treasure=%s, knight=%s, hunter=%s, hideout=%s, garrison=%s",
+                    num_empty, num_treasure, num_knight, num_hunter, num_hideout, num_garrison)
 
         # Place garrisons on the grid
         for _ in range(num_garrison):
             x, y = all_positions.pop()
-            garrison = Garrison(x, y)
+            garrison = Garrison(x, y, rng=self.rng, config=self.config)
             self.grid.place_garrison(garrison)
             self.garrisons.append(garrison)
         # Place treasures on the grid
         for _ in range(num_treasure):
             x, y = all_positions.pop()
-            t_type = random.choice(list(TreasureType))
+            t_type = self.rng.choice(list(TreasureType))
             treasure = Treasure(t_type, x, y)
             self.grid.place_treasure(treasure)
             self.treasures.append(treasure)
         # Place knights on the grid
         for _ in range(num_knight):
             x, y = all_positions.pop()
-            knight = Knight(f"Knight-{x}-{y}", x, y, self.grid)
+            knight = Knight(f"Knight-{x}-{y}", x, y, self.grid, self.config)
             self.grid.place_knight(knight)
             self.knights.append(knight)
 
         # Place hunters on the grid
         for _ in range(num_hunter):
             x, y = all_positions.pop()
-            skill = random.choice(list(HunterSkill))
-            hunter = Hunter(f"Hunter-{x}-{y}", skill, x, y)
+            skill = self.rng.choice(list(HunterSkill))
+            hunter = Hunter(f"Hunter-{x}-{y}", skill, x, y, self.config)
             self.grid.place_hunter(hunter)
             self.hunters.append(hunter)
 
         # Place hideouts on the grid
         for _ in range(num_hideout):
             x, y = all_positions.pop()
-            hideout = Hideout(x, y)
+            hideout = Hideout(x, y, self.config)
             self.grid.place_hideout(hideout)
             self.hideouts.append(hideout)
 
-        # Ensure remaining cells are empty
-        for _ in range(num_empty):
-            x, y = all_positions.pop()
-            self.grid.get_cell(x, y).clear()
+        # The remaining positions stay empty
+
+    def _process_hunters(self):
+        hunters = self.hunters
+        processed = len(hunters)
+        for hunter in hunters:
+            self.hunter_controller.process(hunter)
+        return processed
+
+    def _process_knights(self):
+        for knight in self.knights:
+            self.knight_controller.process(knight)
+        return len(self.knights)
+
+    def _advance_treasures(self):
+        # Treasure values decay lazily inside the pool; only depleted ones need work here
+        depleted = self.treasures.advance()
+        for treasure in depleted:
+            logger.debug("Treasure depleted: %s", treasure)
+            self.grid.clear_cell(treasure.x, treasure.y)
+        return len(depleted)
+
+    def _process_hideouts(self):
+        # Let hideouts share knowledge and attempt to recruit
+        for hideout in self.hideouts:
+            hideout.share_knowledge(self.step_count)
+            hideout.try_recruit(self.grid)
+        return len(self.hideouts)
+
+    def step(self):
+        """
+        Advance the simulation by one step.
+        Returns False when the simulation has ended (no more treasures or all hunters are inactive).
+        """
+        self.distance_fields.invalidate()
+
+        instrumentation = self.instrumentation
+        if instrumentation is None:
+            self._process_hunters()
+            self._process_knights()
+            self._advance_treasures()
+            self._process_hideouts()
+        else:
+            instrumentation.start_step()
+            for phase, counter, run_phase in (
+                    ("hunters", "hunters_processed", self._process_hunters),
+                    ("knights", "knights_processed", self._process_knights),
+                    ("treasures", "treasures_depleted", self._advance_treasures),
+                    ("hideouts", "hideouts_processed", self._process_hideouts)):
+                started = time.perf_counter()
+                processed = run_phase()
+                instrumentation.add_time(phase, time.perf_counter() - started)
+                instrumentation.count(counter, processed)
+
+        self.step_count += 1
+        if self.journal is not None:
+            self.journal.end_step()
+        self.metrics.end_step()
+        if instrumentation is not None:
+            instrumentation.end_step(self.step_count)
+        metrics = self.metrics
+        logger.info("Step %s Summary: treasures=%s, all_carrying_none=%s, stored_empty=%s, hunters_alive=%s",
+                    self.step_count, len(self.treasures), metrics.carriers == 0,
+                    metrics.stored_treasures == 0, metrics.alive_hunters > 0)
+
+        if metrics.finished():
+            logger.info("Simulation ended: No more treasures or all hunters are inactive.")
+            return False
+        return True
+
+    def entity_counts(self):
+        """Number of entities of each kind, keyed by CellType, based on the simulation lists."""
+        hunters = len(self.hunters)
+        knights = len(self.knights)
+        hideouts = len(self.hideouts)
+        garrisons = len(self.garrisons)
+        treasures = len(self.treasures)
+
+        # Calculate empty cells
+        total_cells = self.grid.size * self.grid.size
+        empty = total_cells - (hunters + knights + hideouts + garrisons + treasures)
+
+        return {
+            CellType.EMPTY: empty,
+            CellType.HUNTER: hunters,
+            CellType.KNIGHT: knights,
+            CellType.HIDEOUT: hideouts,
+            CellType.GARRISON: garrisons,
+            CellType.TREASURE: treasures,
+        }
 
     def run(self, steps=300):
-        for step in range(steps):
-            if self.gui.is_closed():
+        """
+        Run up to the given number of steps.
+        An observer that can follow frames (the Tk Gui) keeps the main thread for its event
+        loop while a SimulationWorker steps the world in the background; any other observer
+        is rendered synchronously after every step.
+        """
+        if self.observer is not None and hasattr(self.observer, "follow"):
+            self._run_in_background(steps)
+            return
+
+        for _ in range(steps):
+            if self.observer is not None and self.observer.is_closed():
                 break
 
-            for hunter in self.hunters:
-                self.hunter_controller.process(hunter)
-
-            for knight in self.knights:
-                self.knight_controller.process(knight)
-
-            for treasure in list(self.treasures):
-                treasure.decay()
-                if treasure.is_depleted():
-                    print("Treasure depleted:", treasure)
-                    self.grid.clear_cell(treasure.x, treasure.y)
-                    self.treasures.remove(treasure)
-            # Let hideouts share knowledge and attempt to recruit
-            for hideout in self.hideouts:
-                hideout.share_knowledge()
-                hideout.try_recruit(self.grid)
-
-            print(f"Step {step + 1} Summary: treasures={len(self.treasures)}, "
-                  f"all_carrying_none={all(hunter.carrying is None for hunter in self.hunters)}, "
-                  f"stored_empty={all(len(h.stored_treasures) == 0 for h in self.hideouts)}, "
-                  f"hunters_alive={any(h.alive for h in self.hunters)}")
-
-            no_active_treasure = (
-                len(self.treasures) == 0 and
-                all(hunter.carrying is None for hunter in self.hunters)
-            )
-            all_hunters_dead = all(not h.alive for h in self.hunters)
-
-            if no_active_treasure or all_hunters_dead:
-                print("Simulation ended: No more treasures or all hunters are inactive.")
+            if not self.step():
                 break
 
-            self.gui.render()
-            time.sleep(0.2)
+            if self.observer is not None:
+                if self.instrumentation is None:
+                    self.observer.render()
+                else:
+                    started = time.perf_counter()
+                    self.observer.render()
+                    self.instrumentation.add_time("render", time.perf_counter() - started)
+            if self.step_delay:
+                time.sleep(self.step_delay)
+
+    def _run_in_background(self, steps):
+        # Imported here so plain headless runs never start a thread
+        from controllers.simulation_worker import SimulationWorker
+        worker = SimulationWorker(self, steps=steps, step_delay=self.step_delay)
+        self.observer.follow(worker.frames)
+        worker.start()
+        try:
+            self.observer.mainloop()
+        finally:
+            worker.stop()
+            worker.join()
 
     def __str__(self):
         return (
@@ -0,0 +1,73 @@
+import queue
+import threading
+from collections import namedtuple
+
+from utils.logger import get_logger
+
+logger = get_logger("simulation")
+
+# Immutable snapshot of the world after one step:
+# cell_types holds every cell's CellType value in row-major order (bytes),
+# counts is a tuple of (CellType, count) pairs for the legend,
+# finished is True for the last frame the worker publishes.
+Frame = namedtuple("Frame", "step cell_types counts finished")
+
+
+def make_frame(sim_controller, finished=False):
+    """Snapshot the simulation's current state as a Frame."""
+    return Frame(sim_controller.step_count, sim_controller.grid.type_bytes(),
+                 tuple(sim_controller.entity_counts().items()), finished)
+
+
+class SimulationWorker(threading.Thread):
+    """
+    Steps a simulation on a background thread and publishes a Frame after every step.
+    The frame queue is bounded: when the consumer falls behind the oldest frame is dropped,
+    so a slow renderer never throttles the simulation and always sees the latest state.
+    """
+
+    def __init__(self, sim_controller, steps=300, frames=None, step_delay=0):
+        super().__init__(name="simulation-worker", daemon=True)
+        self.sim_controller = sim_controller
+        self.steps = steps
+        self.frames = frames if frames is not None else queue.Queue(maxsize=2)
+        self.step_delay = step_delay
+        self.dropped_frames = 0
+        self._stop_event = threading.Event()
+
+    def stop(self):
+        """Ask the worker to stop after the step in progress."""
+        self._stop_event.set()
+
+    def stopped(self):
+        return self._stop_event.is_set()
+
+    def publish(self, frame):
+        """Put a frame on the queue, discarding the oldest queued frame when it is full."""
+        while True:
+            try:
+                self.frames.put_nowait(frame)
+                return
+            except queue.Full:
+                try:
+                    self.frames.get_nowait()
+                    self.dropped_frames += 1
+                except queue.Empty:
+                    pass
+
+    def run(self):
+        try:
+            for _ in range(self.steps):
+                if self._stop_event.is_set():
+                    break
+                running = self.sim_controller.step()
+                if not running:
+                    break
+                self.publish(make_frame(self.sim_controller))
+                if self.step_delay:
+                    # Sleep on the event so stop() interrupts the delay
+                    self._stop_event.wait(self.step_delay)
+        finally:
+            self.publish(make_frame(self.sim_controller, finished=True))
+            logger.debug("Simulation worker finished after %s steps, %s frames dropped",
+                         self.sim_controller.step_count, self.dropped_frames)
@@ -1,8 +1,64 @@
+import argparse
+
+from ai.pathfinding import PATHFINDERS
 from controllers.simulation_controller import SimulationController
+from utils import logger
+from utils.instrumentation import Instrumentation
+from utils.journal import Journal
+from utils.metrics import CsvSink
 
 def main():
-    controller = SimulationController()
-    controller.run()
+    parser = argparse.ArgumentParser(description="Knights of Eldoria simulation")
+    parser.add_argument("--headless", action="store_true", help="run without the GUI and without step delay")
+    parser.add_argument("--steps", type=int, default=300, help="maximum number of simulation steps")
+    parser.add_argument("--seed", type=int, default=None, help="seed for a reproducible run")
+    parser.add_argument("--pathfinder", choices=PATHFINDERS, default="astar",
+                        help="path search engine; hpa is hierarchical and suits large worlds")
+    parser.add_argument("--step-delay", type=float, default=None,
+                        help="seconds between steps, to slow the run down (default: 0)")
+    parser.add_argument("--log-level", choices=sorted(logger.LEVELS), default=None,
+                        help="log level (default: info with the GUI, off in headless mode)")
+    parser.add_argument("--log-file", default="simulation_log.txt", help="file the log is written to")
+    parser.add_argument("--profile", metavar="PATH",
+                        help="record per-step phase timers and counters to a .csv or .jsonl file")
+    parser.add_argument("--journal", metavar="PATH",
+                        help="record every event of the run to a binary journal for replay")
+    parser.add_argument("--journal-checkpoints", type=int, metavar="STEPS",
+                        help="also save a checkpoint next to the journal every STEPS steps")
+    parser.add_argument("--metrics", metavar="PATH",
+                        help="write the per-step outcome metrics to a CSV file")
+    parser.add_argument("--serve", action="store_true",
+                        help="host simulations for other tools through a local JSON-lines socket API")
+    parser.add_argument("--port", type=int, default=8765, help="localhost TCP port of --serve")
+    parser.add_argument("--socket", metavar="PATH", help="serve on a Unix socket instead of TCP")
+    args = parser.parse_args()
+
+    log_level = args.log_level or ("off" if args.headless or args.serve else "info")
+    logger.configure(level=log_level, path=args.log_file, background=True)
+
+    if args.serve:
+        # Imported here so plain runs never load asyncio
+        from controllers.service import serve
+        serve(port=args.port, path=args.socket)
+        return
+
+    instrumentation = Instrumentation(args.profile, keep_records=False) if args.profile else None
+    journal = Journal(args.journal, args.journal_checkpoints) if args.journal else None
+    controller = SimulationController(headless=args.headless, seed=args.seed, step_delay=args.step_delay,
+                                      pathfinder=args.pathfinder,
+                                      instrumentation=instrumentation, journal=journal)
+    metrics_sink = CsvSink(args.metrics) if args.metrics else None
+    if metrics_sink is not None:
+        controller.metrics.add_sink(metrics_sink)
+    try:
+        controller.run(steps=args.steps)
+    finally:
+        if instrumentation is not None:
+            instrumentation.close()
+        if journal is not None:
+            journal.close()
+        if metrics_sink is not None:
+            metrics_sink.close()
 
 if __name__ == "__main__":
     main()
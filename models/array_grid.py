@@ -0,0 +1,315 @@
+import random
+
+import numpy as np
+
+from models.cell import Cell
+from utils.enums import CellType
+from utils.logger import get_logger
+
+logger = get_logger("grid")
+
+NO_OCCUPANT = 0  # Occupant id stored in cells that hold no entity
+
+# Cell types each role may step into, mirroring Grid.get_neighbors / get_knight_neighbors
+PASSABLE_TYPES = {
+    "default": (CellType.EMPTY.value, CellType.TREASURE.value, CellType.HIDEOUT.value),
+    "knight": (CellType.EMPTY.value, CellType.HUNTER.value),
+}
+# Radius queries over windows up to this side length read the cells one by one; bigger
+# windows are matched with array operations, whose fixed cost only pays off there
+SMALL_WINDOW = 9
+
+_CELL_TYPES = tuple(sorted(CellType, key=lambda cell_type: cell_type.value))  # Indexed by value
+_PASSABLE_CODES = {
+    role: tuple(cell_type.value in codes for cell_type in _CELL_TYPES) for role, codes in PASSABLE_TYPES.items()
+}
+
+
+class ArrayCell(Cell):
+    """
+    View of a single ArrayGrid cell.
+    Reads and writes go straight to the grid arrays (through their flat memoryviews, which
+    index much faster than NumPy scalars), so all Cell methods work unchanged.
+    """
+    __slots__ = ()
+
+    def __init__(self, grid, x: int, y: int):
+        self.grid = grid
+        self.x = x
+        self.y = y
+
+    @property
+    def cell_type(self):
+        grid = self.grid
+        return _CELL_TYPES[grid.type_codes[self.y * grid.size + self.x]]
+
+    @cell_type.setter
+    def cell_type(self, cell_type):
+        grid = self.grid
+        grid.type_codes[self.y * grid.size + self.x] = cell_type.value
+
+    @property
+    def content(self):
+        grid = self.grid
+        return grid.entity(grid.occupant_ids[self.y * grid.size + self.x])
+
+    @content.setter
+    def content(self, content):
+        self.grid.set_occupant(self.x, self.y, content)
+
+
+class ArrayGrid:
+    """
+    Grid backend storing cell types in an int8 array and occupant ids in an int32 array.
+    It exposes the same public methods as models.grid.Grid (get_cell returns ArrayCell views)
+    and adds bulk queries computed on whole array slices.
+    """
+
+    def __init__(self, size, simulation_controller=None, rng=None):
+        self.size = size
+        self.simulation_controller = simulation_controller
+        # Random source shared by everything acting on this grid; the global module by default
+        self.rng = rng if rng is not None else random
+        self.types = np.full((size, size), CellType.EMPTY.value, dtype=np.int8)
+        self.occupants = np.full((size, size), NO_OCCUPANT, dtype=np.int32)
+        # Flat row-major views of both arrays; the types view is indexable like Grid.type_codes
+        self.type_codes = memoryview(self.types.reshape(-1))
+        self.occupant_ids = memoryview(self.occupants.reshape(-1))
+        self._entities = [None]  # Occupant id -> entity, id 0 is reserved for "no occupant"
+        self._entity_ids = {}    # Entity -> occupant id
+        self._cell_counts = [0]  # Occupant id -> number of cells holding it; ids at 0 are reused
+        self._free_ids = []
+        # Positions whose type changed since the last pop_dirty(); None until a renderer asks for it
+        self.dirty = None
+        # Optional utils.instrumentation.Instrumentation counting query work; set by the controller
+        self.instrumentation = None
+        # Optional utils.journal.Journal recording the run's events; set by the controller
+        self.journal = None
+        # utils.metrics.Metrics of the simulation on this grid, told about agent state changes
+        self.metrics = None
+        # Callbacks (cell, old_type) run after every cell type change, see add_listener()
+        self.listeners = []
+        logger.info("ArrayGrid initialized with size %s", self.size)
+
+    # --- Occupant registry ---
+
+    def entity_id(self, entity):
+        """Occupant id of an entity, NO_OCCUPANT if it is in no cell."""
+        return self._entity_ids.get(entity, NO_OCCUPANT)
+
+    def entity(self, entity_id):
+        return self._entities[entity_id]
+
+    def set_occupant(self, x, y, entity):
+        """Store entity in a cell, registering it on first use and releasing the previous occupant."""
+        index = y * self.size + x
+        old_id = self.occupant_ids[index]
+        new_id = self._acquire(entity)
+        self.occupant_ids[index] = new_id
+        self._release(old_id)
+
+    def _acquire(self, entity):
+        if entity is None:
+            return NO_OCCUPANT
+        entity_id = self._entity_ids.get(entity)
+        if entity_id is None:
+            if self._free_ids:
+                entity_id = self._free_ids.pop()
+                self._entities[entity_id] = entity
+            else:
+                entity_id = len(self._entities)
+                self._entities.append(entity)
+                self._cell_counts.append(0)
+            self._entity_ids[entity] = entity_id
+        self._cell_counts[entity_id] += 1
+        return entity_id
+
+    def _release(self, entity_id):
+        if entity_id == NO_OCCUPANT:
+            return
+        self._cell_counts[entity_id] -= 1
+        if self._cell_counts[entity_id] == 0:
+            del self._entity_ids[self._entities[entity_id]]
+            self._entities[entity_id] = None
+            self._free_ids.append(entity_id)
+
+    def load(self, types, occupants, entities):
+        """
+        Replace every cell at once, e.g. when restoring a checkpoint. types and occupants are
+        row-major buffers; occupants index into entities, whose entry 0 must be None.
+        Listeners are not notified.
+        """
+        self.types.reshape(-1)[:] = np.frombuffer(types, dtype=np.int8)
+        self.occupants.reshape(-1)[:] = np.frombuffer(occupants, dtype=np.int32)
+        self._cell_counts = np.bincount(self.occupants.ravel(), minlength=len(entities)).tolist()
+        self._cell_counts[NO_OCCUPANT] = 0
+        self._entities = [entity if count else None for entity, count in zip(entities, self._cell_counts)]
+        self._entity_ids = {entity: entity_id for entity_id, entity in enumerate(self._entities) if entity is not None}
+        self._free_ids = [entity_id for entity_id in range(1, len(entities)) if self._entities[entity_id] is None]
+
+    # --- Grid API ---
+
+    def get_cell(self, x, y):
+        if 0 <= x < self.size and 0 <= y < self.size:
+            return ArrayCell(self, x, y)
+        return None
+
+    def clear_cell(self, x, y):
+        cell = self.get_cell(x, y)
+        if cell and cell.cell_type not in [CellType.HIDEOUT, CellType.GARRISON]:
+            cell.clear()
+
+    def wrap(self, x, y):
+        return x % self.size, y % self.size
+
+    def type_bytes(self):
+        """Immutable snapshot of every cell's CellType value, row-major."""
+        return self.types.tobytes()
+
+    def cell_types(self):
+        """All cell types as a flat row-major list."""
+        return [_CELL_TYPES[value] for value in self.type_codes]
+
+    def cell_changed(self, cell, old_type):
+        """
+        Called by a cell view whenever its type changes. Occupancy queries read the arrays
+        directly, so only the dirty set for renderers and the listeners need updating.
+        """
+        if self.dirty is not None:
+            self.dirty.add((cell.x, cell.y))
+        for listener in self.listeners:
+            listener(cell, old_type)
+
+    def add_listener(self, listener):
+        """Call listener(cell, old_type) whenever a cell's type changes."""
+        self.listeners.append(listener)
+
+    def track_changes(self):
+        """Start recording changed positions for pop_dirty()."""
+        if self.dirty is None:
+            self.dirty = set()
+
+    def pop_dirty(self):
+        """Return the positions whose cell type changed since the last call, and reset the set."""
+        dirty, self.dirty = self.dirty, set()
+        return dirty
+
+    def get_cells_in_radius(self, x, y, radius):
+        if self.instrumentation is not None:
+            self.instrumentation.count("radius_queries")
+            self.instrumentation.count("radius_cells_scanned", (2 * radius + 1) ** 2)
+        cells = []
+        for dy in range(-radius, radius + 1):
+            for dx in range(-radius, radius + 1):
+                nx, ny = self.wrap(x + dx, y + dy)
+                cells.append(ArrayCell(self, nx, ny))
+        return cells
+
+    def _place(self, entity, cell_type):
+        # Through the cell view, so listeners hear about placements as they do on Grid
+        cell = self.get_cell(entity.x, entity.y)
+        if cell and cell.is_empty():
+            cell.set_content(entity, cell_type)
+
+    def place_treasure(self, treasure):
+        self._place(treasure, CellType.TREASURE)
+
+    def place_hunter(self, hunter):
+        self._place(hunter, CellType.HUNTER)
+
+    def place_knight(self, knight):
+        self._place(knight, CellType.KNIGHT)
+
+    def remove_knight(self, x, y):
+        cell = self.get_cell(x, y)
+        if cell and cell.cell_type not in {CellType.HIDEOUT, CellType.GARRISON}:
+            cell.clear()
+
+    def place_hideout(self, hideout):
+        self._place(hideout, CellType.HIDEOUT)
+
+    def place_garrison(self, garrison):
+        self._place(garrison, CellType.GARRISON)
+
+    def _neighbors(self, x, y, passable):
+        size = self.size
+        codes = self.type_codes
+        neighbors = []
+        for dx, dy in [(-1, 0), (1, 0), (0, -1), (0, 1)]:
+            nx, ny = (x + dx) % size, (y + dy) % size
+            if passable[codes[ny * size + nx]]:
+                neighbors.append((nx, ny))
+        return neighbors
+
+    def get_neighbors(self, x: int, y: int) -> list[tuple[int, int]]:
+        return self._neighbors(x, y, _PASSABLE_CODES["default"])
+
+    def get_knight_neighbors(self, x: int, y: int) -> list[tuple[int, int]]:
+        return self._neighbors(x, y, _PASSABLE_CODES["knight"])
+
+    # --- Bulk queries ---
+
+    def _window(self, x, y, radius):
+        """Wrapped row and column index arrays of the square window around (x, y)."""
+        offsets = np.arange(-radius, radius + 1)
+        return (y + offsets) % self.size, (x + offsets) % self.size
+
+    def radius_types(self, x, y, radius):
+        """Cell type values of the (2r+1)x(2r+1) window around (x, y), indexed [dy + r, dx + r]."""
+        rows, cols = self._window(x, y, radius)
+        return self.types[np.ix_(rows, cols)]
+
+    def positions_in_radius(self, x, y, radius, *cell_types):
+        """
+        Positions of cells of the given types within the square radius, in row-major order.
+        A window wider than the grid wraps onto itself; each cell is then reported once.
+        """
+        size = self.size
+        span = min(2 * radius + 1, size)
+        if self.instrumentation is not None:
+            self.instrumentation.count("radius_queries")
+            self.instrumentation.count("radius_cells_scanned", span * span)
+        wanted = [cell_type.value for cell_type in cell_types]
+        if span <= SMALL_WINDOW:
+            codes = self.type_codes
+            rows = [(y + offset) % size for offset in range(-radius, -radius + span)]
+            cols = [(x + offset) % size for offset in range(-radius, -radius + span)]
+            return [(nx, ny) for ny in rows for nx in cols if codes[ny * size + nx] in wanted]
+        rows, cols = self._window(x, y, radius)
+        rows, cols = rows[:span], cols[:span]  # Offsets past the grid size repeat earlier ones
+        window = self.types[np.ix_(rows, cols)]
+        match_rows, match_cols = np.nonzero(np.isin(window, wanted))
+        return list(zip(cols[match_cols].tolist(), rows[match_rows].tolist()))
+
+    def cells_in_radius_of_type(self, x, y, radius, *cell_types):
+        """Like get_cells_in_radius, but only returns the cells holding one of the given types."""
+        return [ArrayCell(self, nx, ny) for nx, ny in self.positions_in_radius(x, y, radius, *cell_types)]
+
+    def positions_of(self, cell_type):
+        """Set of all (x, y) positions of the given cell type."""
+        ys, xs = np.nonzero(self.types == cell_type.value)
+        return set(zip(xs.tolist(), ys.tolist()))
+
+    def count_types(self):
+        """Number of cells of each CellType."""
+        counts = np.bincount(self.types.ravel(), minlength=len(CellType))
+        return {cell_type: int(counts[cell_type.value]) for cell_type in CellType}
+
+    def passable_mask(self, role="default"):
+        """Boolean array of the cells the given role may step into."""
+        return np.isin(self.types, PASSABLE_TYPES[role])
+
+    def neighborhood_counts(self, cell_type, radius):
+        """
+        For every cell, the number of cells of the given type within the square radius,
+        computed with toroidal np.roll shifts over the whole grid.
+        """
+        matches = (self.types == cell_type.value).astype(np.int32)
+        # Separable box sum: first along rows, then along columns
+        rows = matches.copy()
+        for offset in range(1, radius + 1):
+            rows += np.roll(matches, offset, axis=1) + np.roll(matches, -offset, axis=1)
+        counts = rows.copy()
+        for offset in range(1, radius + 1):
+            counts += np.roll(rows, offset, axis=0) + np.roll(rows, -offset, axis=0)
+        return counts
@@ -1,37 +1,50 @@
 from utils.enums import CellType
+from utils.logger import get_logger
+
+logger = get_logger("grid")
 
 
 class Cell:
-    def __init__(self, x: int, y: int):
+    __slots__ = ("x", "y", "content", "cell_type", "grid")
+
+    def __init__(self, x: int, y: int, grid=None):
         self.x = x
         self.y = y
         self.content = None          # The entity currently in this cell (e.g., Treasure, Hunter, etc.)
         self.cell_type = CellType.EMPTY  # The type of the content occupying this cell
+        self.grid = grid             # Grid notified through cell_changed() when the type changes
 
     def is_empty(self) -> bool:
         return self.cell_type == CellType.EMPTY
 
-    def set_content(self, content, cell_type: CellType):
+    def _replace(self, content, cell_type: CellType):
+        old_type = self.cell_type
         self.content = content
         self.cell_type = cell_type
+        if self.grid is None:
+            return
+        if old_type != cell_type:
+            self.grid.cell_changed(self, old_type)
+        elif self.grid.journal is not None:
+            self.grid.journal.content_changed(self)
+
+    def set_content(self, content, cell_type: CellType):
+        self._replace(content, cell_type)
 
     def set_transit_content(self, content, cell_type: CellType):
         if self.cell_type in [CellType.HIDEOUT, CellType.GARRISON]:
-            print(
-                f"Cannot overwrite static cell at ({self.x}, {self.y}) - current type={self.cell_type}. Ignoring set_transit_content.")
+            logger.debug("Cannot overwrite static cell at (%s, %s) - current type=%s. Ignoring set_transit_content.",
+                         self.x, self.y, self.cell_type)
             return
-        self.content = content
-        self.cell_type = cell_type
+        self._replace(content, cell_type)
 
     def clear(self):
         """Clear the cell content unless it is a permanent structure like a Hideout or Garrison."""
-        print(f"Clearing cell ({self.x}, {self.y}) - type: {self.cell_type.name}")
         if self.cell_type not in [CellType.HIDEOUT, CellType.GARRISON]:
-            self.cell_type = CellType.EMPTY
-            self.content = None
-            print(f"Cell cleared ({self.x}, {self.y})")
+            logger.debug("Clearing cell (%s, %s) - type: %s", self.x, self.y, self.cell_type.name)
+            self._replace(None, CellType.EMPTY)
         else:
-            print(f"Cell not cleared (protected type): ({self.x}, {self.y}) → {self.cell_type.name}")
+            logger.debug("Cell not cleared (protected type): (%s, %s) → %s", self.x, self.y, self.cell_type.name)
 
     def __repr__(self):
         return f"Cell({self.x}, {self.y}): {self.cell_type.name}"
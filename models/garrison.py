@@ -1,13 +1,18 @@
 import random
 
 from models.knight import Knight
-from utils.constants import RECRUIT_PROBABILITY
+from models.knowledge_store import KnowledgeStore
+from utils.config import DEFAULT_CONFIG
 
 class Garrison:
-    def __init__(self, x, y):
+    __slots__ = ("x", "y", "capacity", "knights", "knight_patrols", "rng", "config")
+
+    def __init__(self, x, y, rng=None, config=DEFAULT_CONFIG):
+        self.config = config
         self.x = x
         self.y = y
-        self.capacity = 5
+        self.rng = rng if rng is not None else random
+        self.capacity = config.garrison_capacity
         self.knights = []  # Knights currently in the garrison
         self.knight_patrols = []  # Patrols recently performed by knights
 
@@ -18,7 +23,7 @@ class Garrison:
         knight.resting = True
         knight.garrison = self  # Assign this garrison to the knight
         knight.rest()  # Start resting process
-        print(f"{knight.name} is resting at the garrison. Function: add_knight")
+        knight.log("is resting at the garrison. Function: add_knight")
 
     def remove_knight(self, knight):
         """Remove knight from the garrison when fully rested."""
@@ -26,18 +31,18 @@ class Garrison:
             self.knights.remove(knight)
             knight.resting = False
             knight.garrison = None
-            print(f"{knight.name} has left the garrison.")
+            knight.log("has left the garrison.")
 
     def share_knowledge(self):
         """
         Share all known patrol and garrison-related information among all knights.
         """
-        all_knight_patrols = set()
+        all_knight_patrols = KnowledgeStore()
         for knight in self.knights:
-            all_knight_patrols.update(knight.memory)
+            all_knight_patrols |= knight.memory
 
         for knight in self.knights:
-            knight.memory = list(set(knight.memory) | all_knight_patrols)
+            knight.memory |= all_knight_patrols
             # Shared patrol information for other knights
             knight.known_knight_patrols = self.knight_patrols
 
@@ -45,10 +50,10 @@ class Garrison:
         """
         Attempt to recruit a new knight to the garrison.
         """
-        new_name = f"Recruit-{self.x}-{self.y}-{random.randint(100, 999)}"
-        new_knight = Knight(new_name, self.x, self.y)
+        new_name = f"Recruit-{self.x}-{self.y}-{self.rng.randint(100, 999)}"
+        new_knight = Knight(new_name, self.x, self.y, None, self.config)
         self.add_knight(new_knight)
-        new_knight.log(f"has been recruited with skill: {new_knight.name}")
+        new_knight.log("has been recruited with skill: %s", new_knight.name)
 
     def rest_knights(self):
         """
@@ -57,4 +62,4 @@ class Garrison:
         for knight in self.knights:
             if knight.is_exhausted():
                 knight.rest()
-                print(f"{knight.name} is resting at the garrison.")
+                knight.log("is resting at the garrison.")
@@ -1,13 +1,40 @@
+import random
+
 from models.cell import Cell
 from utils.enums import CellType
+from utils.logger import get_logger
+
+logger = get_logger("grid")
+
+BUCKET_SIZE = 8  # Side of the square buckets of the spatial hash
 
 
 class Grid:
-    def __init__(self, size, simulation_controller=None):
+    def __init__(self, size, simulation_controller=None, rng=None):
         self.size = size
         self.simulation_controller = simulation_controller
-        self.cells = [[Cell(x, y) for x in range(size)] for y in range(size)]
-        print(f"Grid initialized with size {self.size}")
+        # Random source shared by everything acting on this grid; the global module by default
+        self.rng = rng if rng is not None else random
+        self.cells = [[Cell(x, y, self) for x in range(size)] for y in range(size)]
+
+        # Occupancy index kept up to date by cell_changed(): for every non-empty cell type
+        # the set of occupied positions, and the same positions hashed into square buckets
+        # so radius queries only visit the buckets overlapping the search window.
+        self.positions = {cell_type: set() for cell_type in CellType if cell_type != CellType.EMPTY}
+        self.buckets = {cell_type: {} for cell_type in self.positions}
+        # Positions whose type changed since the last pop_dirty(); None until a renderer asks for it
+        self.dirty = None
+        # Optional utils.instrumentation.Instrumentation counting query work; set by the controller
+        self.instrumentation = None
+        # Optional utils.journal.Journal recording the run's events; set by the controller
+        self.journal = None
+        # utils.metrics.Metrics of the simulation on this grid, told about agent state changes
+        self.metrics = None
+        # Callbacks (cell, old_type) run after every cell type change, see add_listener()
+        self.listeners = []
+        # CellType value of every cell in row-major order, for cheap frame snapshots
+        self.type_codes = bytearray(size * size)
+        logger.info("Grid initialized with size %s", self.size)
 
     def get_cell(self, x, y):
         if 0 <= x < self.size and 0 <= y < self.size:
@@ -22,7 +49,100 @@ class Grid:
     def wrap(self, x, y):
         return x % self.size, y % self.size
 
+    def type_bytes(self):
+        """Immutable snapshot of every cell's CellType value, row-major."""
+        return bytes(self.type_codes)
+
+    def cell_types(self):
+        """All cell types as a flat row-major list."""
+        return [cell.cell_type for row in self.cells for cell in row]
+
+    def cell_changed(self, cell, old_type):
+        """Called by a Cell whenever its type changes; updates the occupancy index."""
+        pos = (cell.x, cell.y)
+        bucket = (cell.x // BUCKET_SIZE, cell.y // BUCKET_SIZE)
+        if old_type != CellType.EMPTY:
+            self.positions[old_type].discard(pos)
+            members = self.buckets[old_type].get(bucket)
+            if members is not None:
+                members.discard(pos)
+                if not members:
+                    del self.buckets[old_type][bucket]
+        if cell.cell_type != CellType.EMPTY:
+            self.positions[cell.cell_type].add(pos)
+            self.buckets[cell.cell_type].setdefault(bucket, set()).add(pos)
+        self.type_codes[cell.y * self.size + cell.x] = cell.cell_type.value
+        if self.dirty is not None:
+            self.dirty.add(pos)
+        for listener in self.listeners:
+            listener(cell, old_type)
+
+    def add_listener(self, listener):
+        """Call listener(cell, old_type) whenever a cell's type changes."""
+        self.listeners.append(listener)
+
+    def track_changes(self):
+        """Start recording changed positions for pop_dirty()."""
+        if self.dirty is None:
+            self.dirty = set()
+
+    def pop_dirty(self):
+        """Return the positions whose cell type changed since the last call, and reset the set."""
+        dirty, self.dirty = self.dirty, set()
+        return dirty
+
+    def positions_of(self, cell_type):
+        """Set of positions holding the given (non-empty) cell type. Owned by the grid: do not modify."""
+        return self.positions[cell_type]
+
+    def count_types(self):
+        """Number of cells of each CellType."""
+        counts = {cell_type: len(positions) for cell_type, positions in self.positions.items()}
+        counts[CellType.EMPTY] = self.size * self.size - sum(counts.values())
+        return counts
+
+    def positions_in_radius(self, x, y, radius, *cell_types):
+        """
+        Positions of the given (non-empty) cell types within the square radius around (x, y),
+        in the same row-major order as get_cells_in_radius. Only the spatial-hash buckets
+        overlapping the window are visited.
+        """
+        size = self.size
+        span = 2 * radius + 1
+        if span > size:
+            # The window wraps onto itself; fall back to the plain scan, reporting each cell once
+            return list(dict.fromkeys((cell.x, cell.y) for cell in self.get_cells_in_radius(x, y, radius)
+                                      if cell.cell_type in cell_types))
+
+        bucket_rows = {((y + offset) % size) // BUCKET_SIZE for offset in range(-radius, radius + 1)}
+        bucket_cols = {((x + offset) % size) // BUCKET_SIZE for offset in range(-radius, radius + 1)}
+        matches = []
+        scanned = 0
+        for cell_type in cell_types:
+            buckets = self.buckets[cell_type]
+            for by in bucket_rows:
+                for bx in bucket_cols:
+                    members = buckets.get((bx, by), ())
+                    scanned += len(members)
+                    for px, py in members:
+                        offset_x = (px - x + radius) % size
+                        offset_y = (py - y + radius) % size
+                        if offset_x < span and offset_y < span:
+                            matches.append((offset_y, offset_x, px, py))
+        matches.sort()
+        if self.instrumentation is not None:
+            self.instrumentation.count("radius_queries")
+            self.instrumentation.count("radius_cells_scanned", scanned)
+        return [(px, py) for _, _, px, py in matches]
+
+    def cells_in_radius_of_type(self, x, y, radius, *cell_types):
+        """Like get_cells_in_radius, but only returns the cells holding one of the given types."""
+        return [self.cells[py][px] for px, py in self.positions_in_radius(x, y, radius, *cell_types)]
+
     def get_cells_in_radius(self, x, y, radius):
+        if self.instrumentation is not None:
+            self.instrumentation.count("radius_queries")
+            self.instrumentation.count("radius_cells_scanned", (2 * radius + 1) ** 2)
         cells = []
         for dy in range(-radius, radius + 1):
             for dx in range(-radius, radius + 1):
@@ -1,56 +1,94 @@
-import random
-
 from models.hunter import Hunter
-from utils.constants import RECRUIT_PROBABILITY
-from utils.enums import CellType
+from models.knowledge_store import KnowledgeStore
+from utils.config import DEFAULT_CONFIG
+from utils.enums import CellType, EventType
+
+
+def _now(grid):
+    """Current step of the simulation a grid belongs to."""
+    simulation_controller = grid.simulation_controller
+    return simulation_controller.step_count if simulation_controller is not None else 0
 
 
 class Hideout:
-    def __init__(self, x, y):
+    __slots__ = (
+        "x", "y", "capacity", "hunters", "knight_patrols", "stored_treasures",
+        "known_treasures", "known_hideouts", "version", "shared_version", "config",
+    )
+
+    def __init__(self, x, y, config=DEFAULT_CONFIG):
+        self.config = config
         self.x = x
         self.y = y
-        self.capacity = 5
+        self.capacity = config.hideout_capacity
         self.hunters = []
         self.knight_patrols = []  # Track recent knight patrols
         self.stored_treasures = []  # Store delivered treasures
+        # Blackboard of everything hunters have brought here, bumped to a new version whenever it grows.
+        # Treasure sightings expire like the hunters' own, so the blackboard never hands out stale ones.
+        self.known_treasures = KnowledgeStore(ttl=config.treasure_sighting_ttl)
+        self.known_hideouts = KnowledgeStore()
+        self.version = 0
+        self.shared_version = 0  # Version every resident hunter has already read
 
     def add_hunter(self, hunter, grid):
-        hunter.log(f"Entered hideout at ({self.x}, {self.y})")
+        hunter.log("Entered hideout at (%s, %s)", self.x, self.y)
         if len(self.hunters) < self.capacity:
             self.hunters.append(hunter)
             hunter.in_hideout = self
+            now = _now(grid)
+            self.post(hunter, now)
+            self.read(hunter, now)
+            hunter.known_knight_patrols = self.knight_patrols
             grid.clear_cell(hunter.x, hunter.y)
-            hunter.log(f"Hideout has capacity ({len(self.hunters)}/{self.capacity})")
+            hunter.log("Hideout has capacity (%s/%s)", len(self.hunters), self.capacity)
 
     def remove_hunter(self, hunter, grid):
         hunter.in_hideout = None
         if hunter in self.hunters:
+            if self.shared_version != self.version:
+                self.read(hunter, _now(grid))
             self.hunters.remove(hunter)
 
             neighbors = grid.get_neighbors(self.x, self.y)
-            random.shuffle(neighbors)
+            grid.rng.shuffle(neighbors)
             for nx, ny in neighbors:
                 if grid.get_cell(nx, ny).is_empty():
                     hunter.x, hunter.y = nx, ny
                     grid.get_cell(nx, ny).set_transit_content(hunter, CellType.HUNTER)
-                    hunter.log(f"Left hideout and moved to ({nx}, {ny})")
+                    hunter.log("Left hideout and moved to (%s, %s)", nx, ny)
                     break
 
-    def share_knowledge(self):
+    def post(self, hunter, now=0):
+        """Add a hunter's discoveries to the blackboard at step `now`; returns True if it learned anything."""
+        self.known_treasures.expire(now)
+        before = len(self.known_treasures) + len(self.known_hideouts)
+        self.known_treasures |= hunter.known_treasures
+        self.known_treasures.expire(now)
+        self.known_hideouts |= hunter.known_hideouts
+        if len(self.known_treasures) + len(self.known_hideouts) == before:
+            return False
+        self.version += 1
+        return True
+
+    def read(self, hunter, now=0):
+        """Bring a hunter's knowledge up to date with the blackboard at step `now`."""
+        self.known_treasures.expire(now)
+        hunter.known_treasures |= self.known_treasures
+        hunter.known_treasures.expire(now)
+        hunter.known_hideouts |= self.known_hideouts
+
+    def share_knowledge(self, now=0):
         """
         Share all known treasures and hideouts among hunters in this hideout.
+        Hunters post to the blackboard as they enter, so this only has work to do
+        in steps where a newcomer brought something the residents have not read yet.
         """
-        all_treasures = set()
-        all_hideouts = set()
-
-        for h in self.hunters:
-            all_treasures.update(h.known_treasures)
-            all_hideouts.update(h.known_hideouts)
-
+        if self.shared_version == self.version:
+            return
         for h in self.hunters:
-            h.known_treasures = list(set(h.known_treasures) | all_treasures)
-            h.known_hideouts = list(set(h.known_hideouts) | all_hideouts)
-            h.known_knight_patrols = self.knight_patrols
+            self.read(h, now)
+        self.shared_version = self.version
 
     def try_recruit(self, grid):
         """
@@ -61,18 +99,20 @@ class Hideout:
         if len(self.hunters) >= self.capacity:
             return
 
-        # Check for diversity in hunter skills
-        existing_skills = list({h.skill for h in self.hunters})
+        # Check for diversity in hunter skills (sorted so the draw below is reproducible)
+        existing_skills = sorted({h.skill for h in self.hunters}, key=lambda skill: skill.value)
         if len(existing_skills) < 2:
             return  # Not enough diversity
 
         # 20% chance to recruit a new hunter
-        if random.random() <= RECRUIT_PROBABILITY:
-            new_skill = random.choice(existing_skills)
-            new_name = f"Recruit-{self.x}-{self.y}-{random.randint(100, 999)}"
-            new_hunter = Hunter(new_name, new_skill, self.x, self.y)
+        if grid.rng.random() <= self.config.recruit_probability:
+            new_skill = grid.rng.choice(existing_skills)
+            new_name = f"Recruit-{self.x}-{self.y}-{grid.rng.randint(100, 999)}"
+            new_hunter = Hunter(new_name, new_skill, self.x, self.y, self.config)
             self.add_hunter(new_hunter, grid)
-            new_hunter.log(f"Recruited with skill: {new_skill.name}")
+            new_hunter.log("Recruited with skill: %s", new_skill.name)
+            if grid.journal is not None:
+                grid.journal.record(EventType.RECRUIT, new_hunter, self, self.x, self.y)
 
     def __str__(self):
         return f"Hideout(capacity={self.capacity}, x={self.x}, y={self.y}, hunters={self.hunters}, knıghts_patrols={self.knight_patrols}, stored_treasure={self.stored_treasures})"
@@ -1,20 +1,33 @@
-import random
+import logging
 
+from models.knowledge_store import KnowledgeStore
+from utils.config import DEFAULT_CONFIG
 from utils.enums import CellType
-from utils.logger import log
+from utils.logger import get_logger
 from nlp.sentiment_analyzer import analyze_sentiment
 
+logger = get_logger("hunter")
+
 class Hunter:
-    def __init__(self, name, skill, x, y):
+    __slots__ = (
+        "name", "skill", "x", "y", "stamina", "carrying",
+        "known_treasures", "known_hideouts", "known_knights", "known_knight_patrols",
+        "alive", "collapsing", "collapse_counter", "resting", "assigned_hideout", "in_hideout", "config",
+    )
+
+    def __init__(self, name, skill, x, y, config=DEFAULT_CONFIG):
+        self.config = config  # utils.config.WorldConfig with the rules the hunter follows
         self.name = name
         self.skill = skill
         self.x = x
         self.y = y
         self.stamina = 1.0
         self.carrying = None
-        self.known_treasures = []
-        self.known_hideouts = []
-        self.known_knights = []
+        # Treasures get collected or deplete and knights move, so both kinds of sighting go stale
+        self.known_treasures = KnowledgeStore(ttl=config.treasure_sighting_ttl)
+        self.known_hideouts = KnowledgeStore()
+        self.known_knights = KnowledgeStore(ttl=config.knight_sighting_ttl)
+        self.known_knight_patrols = None  # Shared by the hideout the hunter rests in
         self.alive = True
         self.collapsing = False
         self.collapse_counter = 0
@@ -23,22 +36,22 @@ class Hunter:
         self.in_hideout = None
 
     def move(self):
-        self.log(f"Stamina before move: {self.stamina:.2f}")
-        self.stamina = round(self.stamina - 0.02, 2)
-        self.log(f"Stamina after move: {self.stamina:.2f}")
+        self.log("Stamina before move: %.2f", self.stamina)
+        self.stamina = round(self.stamina - self.config.hunter_move_cost, 2)
+        self.log("Stamina after move: %.2f", self.stamina)
         if self.stamina <= 0:
             self.stamina = 0
             self.collapsing = True
 
     def rest(self, grid):
-        self.stamina = round(min(1.0, self.stamina + 0.01), 2)
+        self.stamina = round(min(1.0, self.stamina + self.config.hunter_rest_gain), 2)
         if self.stamina >= 1.0:
             self.stamina = 1.0
             self.collapsing = False
             self.collapse_counter = 0
             if self.in_hideout is not None:
                 self.in_hideout.remove_hunter(self, grid)
-                self.log(f"Fully rested and left the hideout at ({self.x}, {self.y})")
+                self.log("Fully rested and left the hideout at (%s, %s)", self.x, self.y)
 
     def is_resting_in_hideout(self):
         return self.in_hideout is not None
@@ -47,46 +60,50 @@ class Hunter:
         return self.carrying is not None
 
     def deliver_treasure(self, simulation_controller):
-        # Deliver the carried treasure to the hideout
+        """Deliver the carried treasure to the hideout; returns that hideout, or None."""
         if self.carrying:
             if self.in_hideout is not None:
                 self.in_hideout.stored_treasures.append(self.carrying)
-                self.log(
-                    f"Delivered treasure: {self.carrying.treasure_type.name} → Hideout @ ({self.in_hideout.x}, {self.in_hideout.y})"
-                )
+                self.log("Delivered treasure: %s → Hideout @ (%s, %s)",
+                         self.carrying.treasure_type.name, self.in_hideout.x, self.in_hideout.y, level=logging.INFO)
                 simulation_controller.remove_treasure_from_list(self.carrying)
                 self.carrying = None
+                return self.in_hideout
+        return None
 
     def collect_treasure(self, treasure):
         self.carrying = treasure
 
-    def scan_and_remember(self, nearby_cells):
+    def scan_and_remember(self, nearby_cells, now=0):
+        """Remember the treasures, hideouts and knights in the given cells, seen at step `now`."""
         for cell in nearby_cells:
-            if cell.cell_type.name == "TREASURE" and cell.content:
-                pos = (cell.x, cell.y)
-                if pos not in self.known_treasures:
-                    self.known_treasures.append(pos)
-                    self.log(f"New treasure remembered at {pos}")
-            elif cell.cell_type.name == "HIDEOUT" and cell.content:
-                pos = (cell.x, cell.y)
-                if pos not in self.known_hideouts:
-                    self.known_hideouts.append(pos)
-                    self.log(f"New hideout remembered at {pos}")
-            elif cell.cell_type.name == "KNIGHT" and cell.content:
-                pos = (cell.x, cell.y)
-                if pos not in self.known_knights:
-                    self.known_knights.append(pos)
-                    self.log(f"New knight remembered at {pos}")
+            if cell.cell_type == CellType.TREASURE and cell.content:
+                if self.known_treasures.add((cell.x, cell.y), now):
+                    self.log("New treasure remembered at (%s, %s)", cell.x, cell.y)
+            elif cell.cell_type == CellType.HIDEOUT and cell.content:
+                if self.known_hideouts.add((cell.x, cell.y), now):
+                    self.log("New hideout remembered at (%s, %s)", cell.x, cell.y)
+            elif cell.cell_type == CellType.KNIGHT and cell.content:
+                if self.known_knights.add((cell.x, cell.y), now):
+                    self.log("New knight remembered at (%s, %s)", cell.x, cell.y)
+        self.known_treasures.expire(now)
+        self.known_knights.expire(now)
 
     def collapse_check(self):
         self.collapse_counter += 1
-        self.log(f"Collapse check: ({self.collapse_counter}/3)")
-        if self.collapse_counter >= 3:
+        self.log("Collapse check: (%s/%s)", self.collapse_counter, self.config.hunter_collapse_steps)
+        if self.collapse_counter >= self.config.hunter_collapse_steps:
             self.alive = False
-            self.log("Hunter has collapsed and is eliminated.")
+            self.log("Hunter has collapsed and is eliminated.", level=logging.INFO)
+
+    def log(self, message, *args, level=logging.DEBUG):
+        """Log a %-style message; it is only formatted when the level is enabled."""
+        if logger.isEnabledFor(level):
+            logger.log(level, "[Hunter] %s: " + message, self.name, *args)
 
-    def log(self, message):
-        log(f"[Hunter] {self.name}: {message}")
+    def log_enabled(self, level=logging.DEBUG):
+        """True when messages at this level are written, to guard costly log arguments."""
+        return logger.isEnabledFor(level)
 
     def drop_treasure(self, grid, simulation_controller=None):
         if not self.carrying:
@@ -96,7 +113,7 @@ class Hunter:
         treasure = self.carrying
 
         neighbors = grid.get_neighbors(self.x, self.y)
-        random.shuffle(neighbors)
+        grid.rng.shuffle(neighbors)
         for new_x, new_y in neighbors:
             cell = grid.get_cell(new_x, new_y)
             if cell.is_empty():
@@ -113,19 +130,19 @@ class Hunter:
                 if simulation_controller:
                     simulation_controller.add_treasure_to_list(treasure)
 
-                # Add drop location to known treasures
-                if (old_x, old_y) not in self.known_treasures:
-                    self.known_treasures.append((old_x, old_y))
+                # Add drop location to known treasures, seen now
+                now = simulation_controller.step_count if simulation_controller else 0
+                self.known_treasures.add((old_x, old_y), now)
 
                 # Clear carried treasure
                 self.carrying = None
-                self.log(f"Dropped treasure at ({old_x}, {old_y}) and fled to ({new_x}, {new_y})")
+                self.log("Dropped treasure at (%s, %s) and fled to (%s, %s)", old_x, old_y, new_x, new_y)
                 self.analyze_emotion_and_log("Dropped treasure due to knight interaction.")
                 return
 
     def analyze_emotion_and_log(self, message: str):
         sentiment_score = analyze_sentiment(message)
-        self.log(f"Sentiment analysis of '{message}' → polarity: {sentiment_score:.2f}")
+        self.log("Sentiment analysis of '%s' → polarity: %.2f", message, sentiment_score)
         return sentiment_score
 
     def __str__(self):
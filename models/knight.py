@@ -1,12 +1,23 @@
-import random
+import logging
 
 from ai.pathfinding.astar import astar
-from utils.enums import CellType
+from models.knowledge_store import KnowledgeStore
+from utils.config import DEFAULT_CONFIG
+from utils.enums import CellType, EventType
+from utils.logger import get_logger
+
+logger = get_logger("knight")
 
 
 # Knight class with interaction methods and movement
 class Knight:
-    def __init__(self, name: str, x: int, y: int, grid):
+    __slots__ = (
+        "name", "x", "y", "grid", "energy", "resting", "target",
+        "memory", "known_knight_patrols", "alive", "garrison", "detentions", "config",
+    )
+
+    def __init__(self, name: str, x: int, y: int, grid, config=DEFAULT_CONFIG):
+        self.config = config  # utils.config.WorldConfig with the rules the knight follows
         self.name = name
         self.x = x
         self.y = y
@@ -14,13 +25,20 @@ class Knight:
         self.energy = 1.0
         self.resting = False
         self.target = None
-        self.memory = []
+        self.memory = KnowledgeStore()
+        self.known_knight_patrols = None  # Shared by the garrison the knight rests in
         self.alive = True
         self.garrison = None
+        self.detentions = 0  # Number of hunters this knight has detained
 
-    def log(self, message: str):
-        from utils.logger import log
-        log(f"[Knight] {self.name}: {message}")
+    def log(self, message: str, *args, level=logging.DEBUG):
+        """Log a %-style message; it is only formatted when the level is enabled."""
+        if logger.isEnabledFor(level):
+            logger.log(level, "[Knight] %s: " + message, self.name, *args)
+
+    def log_enabled(self, level=logging.DEBUG):
+        """True when messages at this level are written, to guard costly log arguments."""
+        return logger.isEnabledFor(level)
 
     def rest_at_garrison(self):
         """
@@ -31,16 +49,16 @@ class Knight:
             self.resting = True
             self.garrison.add_knight(self)
             self.rest()
-            print(f"{self.name} is resting at the garrison.")
+            self.log("is resting at the garrison.")
 
     def move(self):
 
         # If energy is low do not allow movement
         if self.is_exhausted():
-            self.log(f"{self.name} cannot move because they should rest.")
+            self.log("%s cannot move because they should rest.", self.name)
             return
 
-        self.energy -= 0.02
+        self.energy -= self.config.knight_move_cost
         if self.is_exhausted():
             if self.energy <= 0:
                 self.energy = 0
@@ -48,33 +66,34 @@ class Knight:
             return
 
     def is_exhausted(self):
-        return round(self.energy, 2) <= 0.2
+        return round(self.energy, 2) <= self.config.knight_rest_threshold
 
     def rest(self):
         """Resting at the garrison."""
-        print(f"{self} - KNIGHT REST.")
-        self.energy = round(self.energy + 0.1, 2)
+        self.log("%s - KNIGHT REST.", self)
+        self.energy = round(self.energy + self.config.knight_rest_gain, 2)
         if self.energy >= 1.0:
             self.energy = 1.0
             self.resting = False
-            print(f"{self} - KNIGHT ENERGY IS READY.")
+            self.log("%s - KNIGHT ENERGY IS READY.", self)
             # When rest is complete, remove the knight from the garrison
             if self.garrison:
-                print(f"{self.name} THERE IS GARRISON. {self.garrison}")
+                self.log("THERE IS GARRISON. %s", self.garrison)
                 self.garrison.remove_knight(self)
-            print(f"{self.name} REMOVE FROM GARRISON. {self.garrison}")
+            self.log("REMOVE FROM GARRISON. %s", self.garrison)
 
     def remember(self, location):
-        self.memory.append(location)
+        self.memory.add(location)
 
     def detect_hunters(self, nearby_cells):
         """Return a list of hunters within nearby cells (used for knight detection)."""
         hunters = []
+        verbose = self.log_enabled()
         for cell in nearby_cells:
-            if cell:
-                self.log(f"Scanning cell ({cell.x}, {cell.y}) → {cell.cell_type.name} | content: {cell.content}")
+            if cell and verbose:
+                self.log("Scanning cell (%s, %s) → %s | content: %s", cell.x, cell.y, cell.cell_type.name, cell.content)
             if cell and cell.cell_type == CellType.HUNTER and cell.content:
-                self.log(f"Found hunter at ({cell.x}, {cell.y})")
+                self.log("Found hunter at (%s, %s)", cell.x, cell.y)
                 hunters.append(cell.content)
         return hunters
 
@@ -83,7 +102,7 @@ class Knight:
         Determine if the knight should rest based on energy level.
         Returns True if energy is 20% or below.
         """
-        return self.energy <= 0.2
+        return self.energy <= self.config.knight_rest_threshold
 
     def check_stamina(self):
         if self.is_exhausted():
@@ -101,18 +120,21 @@ class Knight:
 
         best_target = None
         best_cost = float('inf')
+        # The simulation's pathfinder (see SimulationController(pathfinder=...)), A* otherwise
+        simulation_controller = self.grid.simulation_controller
+        find_path = simulation_controller.find_path if simulation_controller is not None else astar
 
         for h in hunters:
-            path = astar(self.grid, (self.x, self.y), (h.x, h.y), role="knight")
-            self.log(f"Checking path to hunter: {path}")
+            path = find_path(self.grid, (self.x, self.y), (h.x, h.y), role="knight")
+            self.log("Checking path to hunter: %s", path)
             if path and len(path) < best_cost:
-                self.log(f"New best target with path length {len(path)}")
+                self.log("New best target with path length %s", len(path))
                 best_target = h
                 best_cost = len(path)
 
         self.target = best_target
         if best_target:
-            self.log(f"Target selected: {best_target.name} at ({best_target.x}, {best_target.y})")
+            self.log("Target selected: %s at (%s, %s)", best_target.name, best_target.x, best_target.y)
         else:
             self.log("No reachable target found.")
 
@@ -131,7 +153,7 @@ class Knight:
         if new_cell:
             new_cell.set_transit_content(self, CellType.KNIGHT)
 
-        self.log(f"{self.name} moved to ({self.x}, {self.y})")
+        self.log("%s moved to (%s, %s)", self.name, self.x, self.y)
 
     def interact_with_hunter(self, hunter, method: str):
         """
@@ -139,20 +161,33 @@ class Knight:
         :param hunter: The hunter the knight is interacting with.
         :param method: The action method (either 'detain' or 'challenge').
         """
+        journal = self.grid.journal if self.grid is not None else None
+        metrics = self.grid.metrics if self.grid is not None else None
+        x, y, carrying, alive = hunter.x, hunter.y, hunter.carrying, hunter.alive
         if method == "detain":
-            hunter.stamina = round(hunter.stamina - 0.05, 2)
+            self.detentions += 1
+            hunter.stamina = round(hunter.stamina - self.config.detain_stamina_loss, 2)
             if hunter.stamina < 0:
                 hunter.stamina = 0
             hunter.drop_treasure(self.grid, self.grid.simulation_controller)
-            self.log(f"Detained {hunter.name}, reduced stamina and forced to drop treasure.")
+            self.log("Detained %s, reduced stamina and forced to drop treasure.", hunter.name, level=logging.INFO)
         elif method == "challenge":
-            hunter.stamina = round(hunter.stamina - 0.20, 2)
+            hunter.stamina = round(hunter.stamina - self.config.challenge_stamina_loss, 2)
             if hunter.stamina < 0:
                 hunter.stamina = 0
             hunter.drop_treasure(self.grid, self.grid.simulation_controller)
-            self.log(f"Challenged {hunter.name}, reduced stamina significantly and forced to drop treasure.")
+            self.log("Challenged %s, reduced stamina significantly and forced to drop treasure.", hunter.name)
         else:
-            self.log(f"Unknown interaction method: {method}")
+            self.log("Unknown interaction method: %s", method)
+            return
+        if metrics is not None:
+            metrics.hunter_changed(hunter, carrying, alive)
+        if journal is not None:
+            journal.record(EventType.DETENTION, self, hunter, x, y)
+            if carrying is not None and hunter.carrying is None:
+                journal.record(EventType.DROP, hunter, carrying, carrying.x, carrying.y, carrying.value)
+            if (hunter.x, hunter.y) != (x, y):
+                journal.record(EventType.MOVE, hunter, x=hunter.x, y=hunter.y)
 
     def __str__(self):
         return f"Knight(type={self.name}, x={self.x}, y={self.y}, energy={self.energy}, alive={self.alive}, resting={self.resting}, memory={self.memory}, garrison={self.garrison})"
@@ -0,0 +1,99 @@
+import heapq
+
+
+class KnowledgeStore:
+    """
+    Set of grid positions an agent knows about, in the order they were learned.
+    Backed by a dict (position -> step it was last seen), so adding, lookups and removal
+    are O(1), and merging another store is an in-place union.
+    With a ttl, positions not seen again within ttl steps are dropped by expire(). Sightings
+    are also kept in a heap ordered by step, so expire() only looks at the stale ones.
+    """
+    __slots__ = ("_seen", "_sightings", "ttl")
+
+    def __init__(self, positions=(), ttl=None):
+        self._seen = {}
+        self._sightings = []  # (step, position) heap; entries superseded by a later sighting are skipped
+        self.ttl = ttl
+        for pos in positions:
+            self.add(pos)
+
+    def add(self, pos, now=0):
+        """Remember a position seen at step `now`; returns True if it was not known yet."""
+        is_new = pos not in self._seen
+        self._seen[pos] = now
+        if self.ttl is not None:
+            heapq.heappush(self._sightings, (now, pos))
+        return is_new
+
+    def discard(self, pos):
+        self._seen.pop(pos, None)
+
+    def remove(self, pos):
+        del self._seen[pos]
+
+    def update(self, other):
+        """In-place union with another store (or any iterable of positions)."""
+        seen = self._seen
+        if isinstance(other, KnowledgeStore):
+            for pos, when in other._seen.items():
+                if when >= seen.get(pos, when):
+                    self.add(pos, when)
+        else:
+            for pos in other:
+                if pos not in seen:
+                    self.add(pos)
+        return self
+
+    def __ior__(self, other):
+        return self.update(other)
+
+    def expire(self, now):
+        """Forget positions last seen more than ttl steps before `now`; returns how many."""
+        if self.ttl is None:
+            return 0
+        seen = self._seen
+        sightings = self._sightings
+        expired = 0
+        while sightings and now - sightings[0][0] > self.ttl:
+            when, pos = heapq.heappop(sightings)
+            if seen.get(pos) == when:
+                del seen[pos]
+                expired += 1
+        return expired
+
+    def last_seen(self, pos):
+        return self._seen.get(pos)
+
+    def items(self):
+        """(position, step it was last seen) pairs, in the order the positions were learned."""
+        return self._seen.items()
+
+    def clear(self):
+        self._seen.clear()
+        self._sightings.clear()
+
+    def copy(self):
+        store = KnowledgeStore(ttl=self.ttl)
+        store._seen = dict(self._seen)
+        store._sightings = list(self._sightings)
+        return store
+
+    def __contains__(self, pos):
+        return pos in self._seen
+
+    def __iter__(self):
+        return iter(self._seen)
+
+    def __len__(self):
+        return len(self._seen)
+
+    def __eq__(self, other):
+        if isinstance(other, KnowledgeStore):
+            return self._seen.keys() == other._seen.keys()
+        return NotImplemented
+
+    __hash__ = None  # Mutable, like set
+
+    def __repr__(self):
+        return f"KnowledgeStore({list(self._seen)})"
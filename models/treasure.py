@@ -1,10 +1,36 @@
+from utils.constants import TREASURE_DECAY_PERCENT
+from utils.logger import get_logger
+
+logger = get_logger("treasure")
+
+DEPLETED_VALUE = 0.01  # A treasure at or below this value is considered depleted
+
+
 class Treasure:
+    __slots__ = ("treasure_type", "x", "y", "_value", "_epoch", "_pool")
+
     def __init__(self, treasure_type, x, y):
         self.treasure_type = treasure_type
         self.x = x
         self.y = y
+        self._pool = None   # TreasurePool the treasure is decaying in, if any
+        self._epoch = 0     # Pool step at which _value was last exact
         self.value = self._get_initial_value()  # Set initial value based on treasure type
 
+    @property
+    def value(self):
+        """Current value. Inside a TreasurePool it is derived from the pool's step count."""
+        if self._pool is None:
+            return self._value
+        return self._value * self._pool.decay_factor(self._epoch)
+
+    @value.setter
+    def value(self, value):
+        self._value = value
+        if self._pool is not None:
+            self._epoch = self._pool.step
+            self._pool.reschedule(self)
+
     def _get_initial_value(self):
         """Assign initial value based on the treasure type."""
         if self.treasure_type.name == "BRONZE":
@@ -15,15 +41,15 @@ class Treasure:
             return 13.0
         return 1.0  # Default value if treasure type is unknown
 
-    def decay(self):
-        """Reduce the value of the treasure over time (0.1% per step)."""
-        print("Treasure value before decay:", self.value)
-        self.value -= self.value * 0.001
-        print("Treasure value after decay:", self.value)
+    def decay(self, percent=TREASURE_DECAY_PERCENT):
+        """Reduce the value of the treasure by one step of decay (0.1% by default)."""
+        logger.debug("Treasure value before decay: %s", self.value)
+        self.value -= self.value * percent
+        logger.debug("Treasure value after decay: %s", self.value)
 
     def is_depleted(self):
         """Check if the treasure has no remaining value (or effectively none)."""
-        return self.value <= 0.01
+        return self.value <= DEPLETED_VALUE
 
     def __str__(self):
         """String representation of the treasure."""
@@ -0,0 +1,117 @@
+import heapq
+import itertools
+import math
+
+from models.treasure import DEPLETED_VALUE
+from utils.constants import TREASURE_DECAY_PERCENT
+
+
+class TreasurePool:
+    """
+    The treasures currently in play (on the grid or being carried).
+
+    Decay is a fixed percentage per step, so instead of touching every treasure each step
+    the pool only counts steps: a treasure's value is computed on read from the value it
+    had when it joined the pool. The step at which each treasure depletes is known up front
+    and kept in a heap, so advance() only does work for treasures that actually deplete.
+
+    Supports the list operations the simulation uses (append, remove, clear, in, len, iteration)
+    with O(1) membership and removal.
+    """
+
+    def __init__(self, decay_percent=TREASURE_DECAY_PERCENT):
+        self.step = 0
+        self._factor = 1 - decay_percent
+        self._treasures = {}  # Treasure -> step at which it depletes (insertion ordered)
+        self._due = []        # Heap of (depletion step, sequence, treasure); may hold stale entries
+        self._sequence = itertools.count()
+
+    def decay_factor(self, since_step):
+        """Multiplier applied to a value that was exact at since_step."""
+        return self._factor ** (self.step - since_step)
+
+    def _steps_until_depleted(self, value):
+        if value <= DEPLETED_VALUE:
+            return 0
+        if self._factor >= 1:
+            return math.inf
+        return max(1, math.ceil(math.log(DEPLETED_VALUE / value) / math.log(self._factor)))
+
+    def reschedule(self, treasure):
+        """Recompute when a treasure depletes, e.g. after its value was set directly."""
+        if treasure not in self._treasures:
+            return
+        due = self.step + self._steps_until_depleted(treasure.value)
+        self._treasures[treasure] = due
+        if due != math.inf:
+            heapq.heappush(self._due, (due, next(self._sequence), treasure))
+
+    def append(self, treasure):
+        if treasure in self._treasures:
+            return
+        value = treasure.value
+        self._treasures[treasure] = None
+        treasure._pool = self
+        treasure.value = value  # Starts decaying from the current step
+
+    def due(self, treasure):
+        """Step at which a treasure in the pool depletes (math.inf if never)."""
+        return self._treasures[treasure]
+
+    def restore(self, treasure, value, epoch, due):
+        """Put a treasure back exactly as it was saved: value exact at step epoch, depleting at due."""
+        self._treasures[treasure] = due
+        treasure._pool = self
+        treasure._value = value
+        treasure._epoch = epoch
+        if due != math.inf:
+            heapq.heappush(self._due, (due, next(self._sequence), treasure))
+
+    def remove(self, treasure):
+        """Take a treasure out of play; its value stops decaying."""
+        if treasure not in self._treasures:
+            raise ValueError(f"{treasure} is not in the treasure pool")
+        del self._treasures[treasure]
+        self._detach(treasure)
+
+    def clear(self):
+        for treasure in self._treasures:
+            self._detach(treasure)
+        self._treasures.clear()
+        self._due.clear()
+
+    def _detach(self, treasure):
+        value = treasure.value
+        treasure._pool = None
+        treasure.value = value
+
+    def advance(self):
+        """
+        Move the pool one step forward.
+        Returns the treasures that depleted on this step; they are removed from the pool.
+        """
+        self.step += 1
+        depleted = []
+        while self._due and self._due[0][0] <= self.step:
+            due, _, treasure = heapq.heappop(self._due)
+            if self._treasures.get(treasure) != due:
+                continue  # Stale entry: removed or rescheduled since
+            if treasure.is_depleted():
+                depleted.append(treasure)
+                self.remove(treasure)
+            else:
+                # Floating point rounding left it just above the threshold
+                self.reschedule(treasure)
+        return depleted
+
+    def __contains__(self, treasure):
+        return treasure in self._treasures
+
+    def __iter__(self):
+        return iter(list(self._treasures))
+
+    def __len__(self):
+        return len(self._treasures)
+
+    def __repr__(self):
+        return repr(list(self._treasures))
@@ -1,10 +1,64 @@
 # nlp/sentiment_analyzer.py
-from textblob import TextBlob
+import re
+from functools import lru_cache
+
+# Number of distinct message templates whose polarity is kept
+CACHE_SIZE = 256
+NEUTRAL = 0.0
+
+# Numbers carry no sentiment, so "Found treasure worth 3.2" and "Found treasure worth 7"
+# share one cache entry
+_NUMBER = re.compile(r"[-+]?\d+(?:\.\d+)?")
+
+_enabled = True
+
+
+def set_enabled(enabled: bool):
+    """Switch sentiment scoring on or off; while off every message scores NEUTRAL."""
+    global _enabled
+    _enabled = bool(enabled)
+
+
+def is_enabled() -> bool:
+    return _enabled
+
+
+def normalize(text: str) -> str:
+    """Reduce a message to its template by replacing numbers with a placeholder."""
+    return _NUMBER.sub("#", text.strip())
+
+
+@lru_cache(maxsize=CACHE_SIZE)
+def _template_polarity(template: str) -> float:
+    # Imported on first use so loading the models does not pull in TextBlob and NLTK
+    from textblob import TextBlob
+    return TextBlob(template).sentiment.polarity
+
 
 def analyze_sentiment(text: str) -> float:
     """
     Analyze the sentiment polarity of a text using TextBlob.
     Returns a float between -1.0 (very negative) to 1.0 (very positive).
     """
-    blob = TextBlob(text)
-    return blob.sentiment.polarity
+    if not _enabled:
+        return NEUTRAL
+    return _template_polarity(normalize(text))
+
+
+def analyze_many(texts) -> list[float]:
+    """Score many messages at once; each distinct template is analyzed only once."""
+    texts = list(texts)
+    if not _enabled:
+        return [NEUTRAL] * len(texts)
+    templates = [normalize(text) for text in texts]
+    scores = {template: _template_polarity(template) for template in set(templates)}
+    return [scores[template] for template in templates]
+
+
+def cache_info():
+    """Hit and miss statistics of the template cache."""
+    return _template_polarity.cache_info()
+
+
+def clear_cache():
+    _template_polarity.cache_clear()
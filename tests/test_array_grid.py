@@ -0,0 +1,129 @@
+import pytest
+
+np = pytest.importorskip("numpy")
+
+from ai.pathfinding.astar import astar
+from controllers.simulation_controller import SimulationController
+from models.array_grid import ArrayGrid
+from models.grid import Grid
+from models.hideout import Hideout
+from models.hunter import Hunter
+from models.knight import Knight
+from models.treasure import Treasure
+from utils.enums import CellType, HunterSkill, TreasureType
+
+
+def _populate(grid):
+    grid.place_treasure(Treasure(TreasureType.GOLD, 1, 1))
+    grid.place_hunter(Hunter("Hunter-1", HunterSkill.STEALTH, 2, 1))
+    grid.place_knight(Knight("Knight-1", 3, 3, grid))
+    grid.place_hideout(Hideout(0, 4))
+    return grid
+
+
+def test_cell_view_matches_object_grid():
+    array_grid = _populate(ArrayGrid(size=6))
+    object_grid = _populate(Grid(size=6))
+    for y in range(6):
+        for x in range(6):
+            assert array_grid.get_cell(x, y).cell_type == object_grid.get_cell(x, y).cell_type
+    assert array_grid.get_neighbors(2, 2) == object_grid.get_neighbors(2, 2)
+    assert array_grid.get_knight_neighbors(3, 2) == object_grid.get_knight_neighbors(3, 2)
+    assert array_grid.get_cell(6, 0) is None
+
+def test_cell_view_writes_through_to_arrays():
+    grid = ArrayGrid(size=5)
+    treasure = Treasure(TreasureType.SILVER, 2, 2)
+    grid.get_cell(2, 2).set_content(treasure, CellType.TREASURE)
+    assert grid.types[2, 2] == CellType.TREASURE.value
+    assert grid.get_cell(2, 2).content is treasure
+    grid.clear_cell(2, 2)
+    assert grid.get_cell(2, 2).is_empty()
+    assert grid.get_cell(2, 2).content is None
+
+def test_static_cells_are_not_cleared():
+    grid = _populate(ArrayGrid(size=6))
+    grid.clear_cell(0, 4)
+    assert grid.get_cell(0, 4).cell_type == CellType.HIDEOUT
+
+def test_radius_queries_wrap():
+    grid = _populate(ArrayGrid(size=6))
+    assert grid.radius_types(0, 0, 1).shape == (3, 3)
+    assert grid.positions_in_radius(5, 5, 2, CellType.TREASURE) == [(1, 1)]
+    assert [(c.x, c.y) for c in grid.cells_in_radius_of_type(0, 0, 2, CellType.HUNTER)] == [(2, 1)]
+    assert len(grid.get_cells_in_radius(0, 0, 3)) == 49
+
+def test_bulk_counts_and_masks():
+    grid = _populate(ArrayGrid(size=6))
+    counts = grid.count_types()
+    assert counts[CellType.EMPTY] == 32
+    assert counts[CellType.KNIGHT] == 1
+    assert not grid.passable_mask()[3, 3]
+    assert grid.passable_mask("knight")[1, 2]
+    assert sorted(grid.positions_of(CellType.TREASURE)) == [(1, 1)]
+    neighborhood = grid.neighborhood_counts(CellType.KNIGHT, 1)
+    assert neighborhood[2, 2] == 1 and neighborhood[0, 0] == 0
+    assert neighborhood.sum() == 9
+
+def test_astar_on_array_grid():
+    grid = _populate(ArrayGrid(size=6))
+    path = astar(grid, (2, 1), (1, 1))
+    assert path == [(1, 1)]
+
+def test_simulation_runs_on_array_backend():
+    sim = SimulationController(headless=True, grid_backend="array")
+    assert isinstance(sim.grid, ArrayGrid)
+    sim.run(steps=5)
+    assert sim.step_count >= 1
+
+@pytest.mark.parametrize("grid_class", [Grid, ArrayGrid])
+def test_placements_notify_listeners(grid_class):
+    grid = grid_class(size=6)
+    changes = []
+    grid.add_listener(lambda cell, old_type: changes.append((cell.x, cell.y, old_type, cell.cell_type)))
+    _populate(grid)
+    assert changes == [
+        (1, 1, CellType.EMPTY, CellType.TREASURE),
+        (2, 1, CellType.EMPTY, CellType.HUNTER),
+        (3, 3, CellType.EMPTY, CellType.KNIGHT),
+        (0, 4, CellType.EMPTY, CellType.HIDEOUT),
+    ]
+
+def test_occupant_ids_are_released_when_cells_empty():
+    grid = ArrayGrid(size=5)
+    hunter = Hunter("Hunter-1", HunterSkill.STEALTH, 1, 1)
+    grid.place_hunter(hunter)
+    hunter_id = grid.entity_id(hunter)
+    grid.get_cell(2, 1).set_content(hunter, CellType.HUNTER)  # Moving: briefly in two cells
+    grid.clear_cell(1, 1)
+    assert grid.entity_id(hunter) == hunter_id
+    grid.clear_cell(2, 1)
+    assert grid.entity_id(hunter) == 0 and grid.entity(hunter_id) is None
+    treasure = Treasure(TreasureType.GOLD, 3, 3)
+    grid.place_treasure(treasure)
+    assert grid.entity_id(treasure) == hunter_id
+
+@pytest.mark.parametrize("radius", [1, 3, 4, 7])
+def test_radius_wider_than_grid_reports_each_cell_once(radius):
+    array_grid = _populate(ArrayGrid(size=6))
+    object_grid = _populate(Grid(size=6))
+    for x, y in [(0, 0), (2, 3), (5, 5)]:
+        types = (CellType.TREASURE, CellType.HUNTER, CellType.KNIGHT, CellType.HIDEOUT)
+        positions = array_grid.positions_in_radius(x, y, radius, *types)
+        assert len(positions) == len(set(positions))
+        assert positions == object_grid.positions_in_radius(x, y, radius, *types)
+    assert len(array_grid.positions_in_radius(0, 0, 20, CellType.EMPTY)) == 32
+    # Windows this wide are matched with array operations
+    big_array, big_object = _populate(ArrayGrid(size=12)), _populate(Grid(size=12))
+    positions = big_array.positions_in_radius(3, 2, 8, CellType.EMPTY, CellType.TREASURE)
+    assert len(positions) == len(set(positions)) == 12 * 12 - 3
+    assert positions == big_object.positions_in_radius(3, 2, 8, CellType.EMPTY, CellType.TREASURE)
+
+def test_distance_fields_match_between_backends():
+    from ai.pathfinding.distance_field import DistanceField
+    array_grid = _populate(ArrayGrid(size=6))
+    object_grid = _populate(Grid(size=6))
+    for kind in ("treasure", "hideout", "hunter"):
+        array_field, object_field = DistanceField(array_grid, kind), DistanceField(object_grid, kind)
+        assert array_field.distance == object_field.distance
+        assert array_field.origin == object_field.origin
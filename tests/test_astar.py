@@ -0,0 +1,86 @@
+import random
+from collections import deque
+
+from ai.pathfinding.astar import astar, heuristic
+from models.grid import Grid
+from models.hunter import Hunter
+from models.knight import Knight
+from models.treasure import Treasure
+from utils.enums import HunterSkill, TreasureType
+
+
+def _bfs_length(grid, start, goal):
+    """Reference shortest path length using the grid's own neighbor rules."""
+    distance = {start: 0}
+    queue = deque([start])
+    while queue:
+        current = queue.popleft()
+        if current == goal:
+            return distance[current]
+        for neighbor in grid.get_neighbors(*current):
+            if neighbor not in distance:
+                distance[neighbor] = distance[current] + 1
+                queue.append(neighbor)
+    return None
+
+
+def _cluttered_grid(seed, size=15):
+    rng = random.Random(seed)
+    grid = Grid(size)
+    for y in range(size):
+        for x in range(size):
+            roll = rng.random()
+            if roll < 0.2:
+                grid.place_knight(Knight(f"K{x}{y}", x, y, grid))
+            elif roll < 0.3:
+                grid.place_treasure(Treasure(TreasureType.GOLD, x, y))
+    return grid, rng
+
+
+def test_wrap_heuristic_takes_short_way_round():
+    assert heuristic((0, 0), (9, 9)) == 18
+    assert heuristic((0, 0), (9, 9), size=10) == 2
+
+
+def test_path_across_seam():
+    grid = Grid(10)
+    assert astar(grid, (0, 5), (9, 5)) == [(9, 5)]
+    assert astar(grid, (1, 0), (1, 8)) == [(1, 9), (1, 8)]
+
+
+def test_paths_are_shortest_on_cluttered_grids():
+    for seed in range(10):
+        grid, rng = _cluttered_grid(seed)
+        open_cells = [(x, y) for y in range(grid.size) for x in range(grid.size) if grid.get_cell(x, y).is_empty()]
+        for _ in range(20):
+            start, goal = rng.choice(open_cells), rng.choice(open_cells)
+            path = astar(grid, start, goal)
+            expected = _bfs_length(grid, start, goal)
+            if start == goal or expected is None:
+                assert path == []
+                continue
+            assert len(path) == expected
+            assert path[-1] == goal
+            previous = start
+            for step in path:
+                assert step in grid.get_neighbors(*previous)
+                previous = step
+
+
+def test_goal_on_blocked_cell_has_no_path():
+    grid = Grid(10)
+    grid.place_knight(Knight("Knight-1", 4, 4, grid))
+    assert astar(grid, (1, 1), (4, 4)) == []
+
+
+def test_knight_role_walks_onto_hunters():
+    grid = Grid(10)
+    grid.place_hunter(Hunter("Hunter-1", HunterSkill.STEALTH, 3, 1))
+    assert astar(grid, (1, 1), (3, 1), role="knight") == [(2, 1), (3, 1)]
+    assert astar(grid, (1, 1), (3, 1)) == []
+
+
+def test_node_budget_gives_up():
+    grid = Grid(30)
+    assert astar(grid, (0, 0), (15, 15), max_nodes=5) == []
+    assert len(astar(grid, (0, 0), (15, 15))) == 30
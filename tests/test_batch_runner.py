@@ -0,0 +1,32 @@
+import pytest
+
+from controllers.batch_runner import METRICS, expand_grid, format_table, make_config, run_batch, run_one
+
+
+def test_expand_grid_builds_every_combination():
+    combinations = expand_grid({"grid_size": [10, 12], "hunter": [0.1, 0.2, 0.3]})
+    assert len(combinations) == 6
+    assert {"grid_size": 12, "hunter": 0.3} in combinations
+
+def test_expand_grid_rejects_unknown_parameters():
+    with pytest.raises(ValueError):
+        expand_grid({"dragons": [1]})
+
+def test_run_one_is_reproducible():
+    assert run_one({"grid_size": 10}, seed=5, steps=20) == run_one({"grid_size": 10}, seed=5, steps=20)
+
+def test_run_batch_in_process_and_in_pool_agree():
+    param_grid = {"grid_size": [10], "hunter": [0.1, 0.2]}
+    serial = run_batch(param_grid, seeds=range(3), steps=20, workers=1)
+    parallel = run_batch(param_grid, seeds=range(3), steps=20, workers=2, chunksize=2)
+    assert serial == parallel
+    assert [row["runs"] for row in serial] == [3, 3]
+    assert all(f"{name}_mean" in serial[0] for name in METRICS)
+    assert "hunter" in format_table(serial).splitlines()[0]
+
+def test_config_fields_can_be_swept():
+    combinations = expand_grid({"hunter": [0.1], "hideout_capacity": [2, 5]})
+    configs = [make_config(params) for params in combinations]
+    assert [config.hideout_capacity for config in configs] == [2, 5]
+    assert all(config.hunter_density == 0.1 for config in configs)
+    assert run_one(combinations[0], seed=3, steps=20) == run_one(configs[0], seed=3, steps=20)
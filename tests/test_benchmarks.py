@@ -0,0 +1,20 @@
+import json
+
+from benchmarks.run_benchmarks import BENCHMARKS, main, run_benchmarks
+
+
+def test_every_benchmark_reports_throughput():
+    results = run_benchmarks(sizes=[12], density_scales=[1.0], min_time=0)
+    assert [result["benchmark"] for result in results] == list(BENCHMARKS)
+    assert all(result["runs"] >= 1 and result["per_second"] > 0 for result in results)
+    step = results[-1]
+    assert step["agent_updates_per_second"] > 0
+
+
+def test_main_writes_json_report(tmp_path):
+    output = tmp_path / "bench.json"
+    main(["--sizes", "12", "--density-scales", "1", "2", "--benchmarks", "step", "radius",
+          "--min-time", "0", "--output", str(output)])
+    report = json.loads(output.read_text())
+    assert {(result["benchmark"], result["density_scale"]) for result in report["results"]} == {
+        ("radius", 1.0), ("step", 1.0), ("radius", 2.0), ("step", 2.0)}
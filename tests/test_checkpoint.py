@@ -0,0 +1,88 @@
+import pytest
+
+from controllers.checkpoint import CheckpointError, load_checkpoint, save_checkpoint
+from controllers.simulation_controller import SimulationController
+from utils.config import WorldConfig
+
+
+def _state(sim):
+    return (
+        sim.step_count,
+        sim.grid.type_bytes(),
+        [(h.name, h.x, h.y, h.stamina, h.alive, h.carrying is not None) for h in sim.hunters],
+        [(k.name, k.x, k.y, k.energy, k.detentions) for k in sim.knights],
+        [len(h.stored_treasures) for h in sim.hideouts],
+        sorted(t.value for t in sim.treasures),
+    )
+
+
+@pytest.mark.parametrize("grid_backend", ["object", "array"])
+def test_restored_run_continues_like_the_original(tmp_path, grid_backend):
+    sim = SimulationController(headless=True, seed=3, grid_size=30, grid_backend=grid_backend)
+    sim.run(steps=40)
+    path = str(tmp_path / "world.ckpt")
+    save_checkpoint(sim, path)
+
+    fork = load_checkpoint(path, headless=True)
+    assert _state(fork) == _state(sim)
+    assert fork.rng.getstate() == sim.rng.getstate()
+
+    sim.run(steps=60)
+    fork.run(steps=60)
+    assert _state(fork) == _state(sim)
+
+
+def test_references_are_restored(tmp_path):
+    sim = SimulationController(headless=True, seed=5, grid_size=20)
+    sim.run(steps=60)
+    path = str(tmp_path / "world.ckpt")
+    save_checkpoint(sim, path)
+    fork = load_checkpoint(path, headless=True)
+
+    for hunter in fork.hunters:
+        if hunter.in_hideout is not None:
+            assert hunter in hunter.in_hideout.hunters
+        else:
+            assert fork.grid.get_cell(hunter.x, hunter.y).content is hunter
+    for original, restored in zip(sim.hunters, fork.hunters):
+        assert list(restored.known_treasures) == list(original.known_treasures)
+    assert fork.grid.simulation_controller is fork
+
+
+def test_chase_targets_of_cached_paths_are_restored(tmp_path):
+    sim = SimulationController(headless=True, seed=5, grid_size=20)
+    knight, hunter = sim.knights[0], sim.hunters[0]
+    sim.path_cache.store(knight, "hunter", [(hunter.x, hunter.y)], role="knight", target=hunter)
+    path = str(tmp_path / "world.ckpt")
+    save_checkpoint(sim, path)
+    fork = load_checkpoint(path)
+
+    (agent, entry), = fork.path_cache.paths.items()
+    assert agent.name == knight.name
+    assert entry.target is fork.hunters[0]
+
+
+def test_rejects_other_files(tmp_path):
+    path = tmp_path / "not_a_checkpoint"
+    path.write_bytes(b"\0" * 64)
+    with pytest.raises(CheckpointError):
+        load_checkpoint(str(path), headless=True)
+
+
+def test_config_is_restored(tmp_path):
+    config = WorldConfig(grid_size=15, hunter_move_cost=0.01, hideout_capacity=3)
+    sim = SimulationController(headless=True, seed=2, config=config)
+    sim.run(steps=20)
+    path = str(tmp_path / "world.ckpt")
+    save_checkpoint(sim, path)
+    fork = load_checkpoint(path, headless=True)
+    assert fork.config == config
+    assert all(hunter.config == config for hunter in fork.hunters)
+
+
+def test_restored_simulations_are_headless_by_default(tmp_path):
+    sim = SimulationController(headless=True, seed=1, grid_size=10)
+    path = str(tmp_path / "world.ckpt")
+    save_checkpoint(sim, path)
+    fork = load_checkpoint(path)
+    assert fork.headless and fork.observer is None
@@ -0,0 +1,48 @@
+import pickle
+
+import pytest
+
+from controllers.simulation_controller import SimulationController
+from models.hideout import Hideout
+from models.hunter import Hunter
+from utils.config import DEFAULT_CONFIG, DEFAULT_DENSITIES, WorldConfig
+from utils.enums import HunterSkill
+
+
+def test_config_is_immutable_and_hashable():
+    config = WorldConfig()
+    with pytest.raises(AttributeError):
+        config.grid_size = 30
+    assert config == DEFAULT_CONFIG
+    assert {config: "cached"}[WorldConfig()] == "cached"
+
+def test_config_survives_pickling():
+    config = WorldConfig(grid_size=40, hunter_move_cost=0.05)
+    assert pickle.loads(pickle.dumps(config)) == config
+
+def test_replace_accepts_partial_densities():
+    config = DEFAULT_CONFIG.replace(grid_size=30, densities={"hunter": 0.3})
+    assert config.grid_size == 30
+    assert config.densities == {**DEFAULT_DENSITIES, "hunter": 0.3}
+    assert DEFAULT_CONFIG.replace() is DEFAULT_CONFIG
+
+def test_invalid_configs_are_rejected():
+    with pytest.raises(ValueError):
+        WorldConfig(hunter_density=0.9)
+    with pytest.raises(ValueError):
+        DEFAULT_CONFIG.replace(densities={"dragon": 0.1})
+
+def test_entities_follow_their_config():
+    config = WorldConfig(hunter_move_cost=0.1, hideout_capacity=2)
+    hunter = Hunter("Hunter", HunterSkill.NAVIGATION, 0, 0, config)
+    hunter.move()
+    assert hunter.stamina == pytest.approx(0.9)
+    assert Hideout(0, 0, config).capacity == 2
+
+def test_controller_hands_its_config_to_every_entity():
+    config = WorldConfig(grid_size=12, knight_move_cost=0.05)
+    sim = SimulationController(headless=True, seed=1, config=config, densities={"hunter": 0.1})
+    assert sim.grid.size == 12
+    assert sim.config == config.replace(densities={"hunter": 0.1})
+    entities = sim.hunters + sim.knights + sim.hideouts + sim.garrisons
+    assert entities and all(entity.config is sim.config for entity in entities)
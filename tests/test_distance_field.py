@@ -0,0 +1,75 @@
+from ai.pathfinding.distance_field import DistanceField, DistanceFieldCache, UNREACHABLE
+from controllers.hunter_controller import HunterController
+from models.grid import Grid
+from models.hideout import Hideout
+from models.hunter import Hunter
+from models.knight import Knight
+from models.treasure import Treasure
+from utils.enums import HunterSkill, TreasureType
+
+
+def test_distances_to_nearest_treasure():
+    grid = Grid(size=10)
+    grid.place_treasure(Treasure(TreasureType.GOLD, 2, 2))
+    grid.place_treasure(Treasure(TreasureType.BRONZE, 7, 2))
+    field = DistanceField(grid, "treasure")
+    assert field.distance_at(2, 2) == 0
+    assert field.distance_at(4, 2) == 2
+    assert field.source_at(4, 2) == (2, 2)
+    assert field.source_at(6, 2) == (7, 2)
+
+def test_distances_wrap_around_the_edges():
+    grid = Grid(size=10)
+    grid.place_treasure(Treasure(TreasureType.GOLD, 0, 0))
+    field = DistanceField(grid, "treasure")
+    assert field.distance_at(9, 9) == 2
+
+def test_knights_block_the_field():
+    grid = Grid(size=5)
+    grid.place_treasure(Treasure(TreasureType.GOLD, 2, 2))
+    for x, y in [(1, 2), (3, 2), (2, 1), (2, 3)]:
+        grid.place_knight(Knight(f"Knight-{x}-{y}", x, y, grid))
+    field = DistanceField(grid, "treasure")
+    assert field.distance_at(0, 0) == UNREACHABLE
+    assert field.next_step(0, 0) is None
+
+def test_full_hideouts_are_not_sources():
+    grid = Grid(size=5)
+    hideout = Hideout(2, 2)
+    hideout.capacity = 0
+    grid.place_hideout(hideout)
+    field = DistanceField(grid, "hideout")
+    assert field.distance_at(0, 0) == UNREACHABLE
+
+def test_next_step_goes_downhill():
+    grid = Grid(size=10)
+    grid.place_treasure(Treasure(TreasureType.GOLD, 5, 8))
+    hunter = Hunter("Hunter-1", HunterSkill.NAVIGATION, 5, 5)
+    grid.place_hunter(hunter)
+    field = DistanceField(grid, "treasure")
+    assert field.distance_at(5, 5) == 3
+    assert field.next_step(5, 5) == ((5, 6), (5, 8))
+
+def test_hunter_controller_follows_field_to_known_treasure():
+    grid = Grid(size=10)
+    treasure = Treasure(TreasureType.GOLD, 5, 8)
+    grid.place_treasure(treasure)
+    hunter = Hunter("Hunter-1", HunterSkill.NAVIGATION, 5, 5)
+    grid.place_hunter(hunter)
+    hunter.known_treasures.add((5, 8))
+    fields = DistanceFieldCache(grid)
+    controller = HunterController(grid, simulation_controller=None, distance_fields=fields)
+
+    for _ in range(3):
+        fields.invalidate()
+        controller.process(hunter)
+
+    assert hunter.carrying is treasure
+
+def test_cache_builds_each_field_once():
+    grid = Grid(size=5)
+    fields = DistanceFieldCache(grid)
+    assert fields.get("treasure") is fields.get("treasure")
+    first = fields.get("hunter")
+    fields.invalidate()
+    assert fields.get("hunter") is not first
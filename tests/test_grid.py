@@ -1,6 +1,11 @@
+import random
+
 from models.grid import Grid
 from models.cell import Cell
+from models.hunter import Hunter
+from models.treasure import Treasure
 from utils.constants import GRID_MIN_SIZE
+from utils.enums import CellType, HunterSkill, TreasureType
 
 def test_wrap_coordinates():
     grid = Grid(size=GRID_MIN_SIZE)
@@ -12,3 +17,34 @@ def test_get_cell():
     cell = grid.get_cell(1, 1)
     assert isinstance(cell, Cell)
     assert cell.x == 1 and cell.y == 1
+
+def test_occupancy_index_follows_cell_changes():
+    grid = Grid(size=10)
+    hunter = Hunter("Hunter-1", HunterSkill.STEALTH, 2, 3)
+    grid.place_hunter(hunter)
+    assert grid.positions_of(CellType.HUNTER) == {(2, 3)}
+    grid.clear_cell(2, 3)
+    grid.get_cell(4, 4).set_transit_content(hunter, CellType.HUNTER)
+    assert grid.positions_of(CellType.HUNTER) == {(4, 4)}
+    assert grid.count_types()[CellType.EMPTY] == 99
+
+def test_positions_in_radius_matches_full_scan():
+    grid = Grid(size=GRID_MIN_SIZE)
+    rng = random.Random(7)
+    for _ in range(60):
+        x, y = rng.randrange(GRID_MIN_SIZE), rng.randrange(GRID_MIN_SIZE)
+        grid.place_treasure(Treasure(TreasureType.GOLD, x, y))
+    for x, y in [(0, 0), (19, 19), (10, 5), (3, 17)]:
+        expected = [(cell.x, cell.y) for cell in grid.get_cells_in_radius(x, y, 3)
+                    if cell.cell_type == CellType.TREASURE]
+        assert grid.positions_in_radius(x, y, 3, CellType.TREASURE) == expected
+
+def test_dirty_positions_are_tracked_once_enabled():
+    grid = Grid(size=5)
+    grid.place_treasure(Treasure(TreasureType.GOLD, 1, 1))
+    assert grid.dirty is None
+    grid.track_changes()
+    grid.clear_cell(1, 1)
+    grid.place_treasure(Treasure(TreasureType.GOLD, 2, 3))
+    assert grid.pop_dirty() == {(1, 1), (2, 3)}
+    assert grid.pop_dirty() == set()
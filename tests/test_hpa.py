@@ -0,0 +1,64 @@
+import random
+
+from ai.pathfinding import astar as grid_astar
+from ai.pathfinding import get_pathfinder, hpa
+from controllers.simulation_controller import SimulationController
+from models.grid import Grid
+from models.knight import Knight
+
+
+def _assert_walkable(grid, start, goal, path):
+    previous = start
+    for step in path:
+        assert step in grid.get_neighbors(*previous)
+        previous = step
+    assert path[-1] == goal
+
+
+def test_paths_match_astar_reachability_and_stay_near_optimal():
+    sim = SimulationController(headless=True, seed=2, grid_size=60)
+    grid = sim.grid
+    rng = random.Random(0)
+    open_cells = [(x, y) for y in range(grid.size) for x in range(grid.size) if grid.get_cell(x, y).is_empty()]
+    for _ in range(40):
+        start, goal = rng.choice(open_cells), rng.choice(open_cells)
+        exact = grid_astar.astar(grid, start, goal)
+        path = hpa.astar(grid, start, goal)
+        assert bool(path) == bool(exact)
+        if path:
+            _assert_walkable(grid, start, goal, path)
+            assert len(path) <= 1.5 * len(exact)
+
+
+def test_hierarchy_follows_grid_changes():
+    grid = Grid(size=100)
+    # Walls of knights at x == 0 and x == 50 split the torus in two; the second has a gap at y == 5
+    for y in range(100):
+        grid.place_knight(Knight(f"Knight-0-{y}", 0, y, grid))
+        if y != 5:
+            grid.place_knight(Knight(f"Knight-50-{y}", 50, y, grid))
+    hierarchy = hpa.hierarchy(grid)
+    path = hpa.astar(grid, (25, 80), (75, 80))
+    _assert_walkable(grid, (25, 80), (75, 80), path)
+    assert (50, 5) in path
+    assert not hierarchy.dirty
+
+    grid.place_knight(Knight("Knight-gap", 50, 5, grid))
+    assert hierarchy.dirty == {hierarchy.cluster_of(5 * 100 + 50)}
+    assert hpa.astar(grid, (25, 80), (75, 80)) == []
+
+
+def test_simulation_runs_with_hpa():
+    sim = SimulationController(headless=True, seed=3, grid_size=50, pathfinder="hpa")
+    assert sim.hunter_controller.find_path is get_pathfinder("hpa")
+    sim.run(steps=10)
+    assert sim.step_count >= 1
+
+def test_knights_choose_targets_with_the_selected_pathfinder():
+    sim = SimulationController(headless=True, seed=3, grid_size=30, pathfinder="hpa")
+    searches = []
+    find_path = sim.find_path
+    sim.find_path = lambda *args, **kwargs: searches.append(args[1:]) or find_path(*args, **kwargs)
+    knight, hunter = sim.knights[0], sim.hunters[0]
+    knight.choose_target([hunter])
+    assert searches == [((knight.x, knight.y), (hunter.x, hunter.y))]
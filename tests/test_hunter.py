@@ -37,7 +37,7 @@ class TestHunterMovement(unittest.TestCase):
         """Test if the hunter moves towards the treasure correctly."""
         treasure_pos = (8, 8)
         self.grid.place_treasure(Treasure(TreasureType.GOLD, treasure_pos[0], treasure_pos[1]))
-        self.hunter.known_treasures.append(treasure_pos)
+        self.hunter.known_treasures.add(treasure_pos)
 
         for _ in range(10):  # Simulate multiple steps
             self.hunter_controller.process(self.hunter)
@@ -54,7 +54,7 @@ class TestHunterMovement(unittest.TestCase):
         """Test if hunter collects treasure when reaching its cell."""
         treasure = Treasure(TreasureType.GOLD, 5, 6)
         self.grid.place_treasure(treasure)
-        self.hunter.known_treasures.append((5, 6))
+        self.hunter.known_treasures.add((5, 6))
 
         # Move hunter manually next to the treasure
         self.hunter.x = 5
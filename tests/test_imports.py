@@ -0,0 +1,5 @@
+from benchmarks.import_time import probe
+
+
+def test_core_imports_skip_heavy_subsystems():
+    assert probe()["loaded"] == []
@@ -0,0 +1,67 @@
+import csv
+import json
+
+from ai.pathfinding.astar import astar
+from controllers.simulation_controller import SimulationController
+from models.grid import Grid
+from utils.instrumentation import FIELDS, Instrumentation
+
+
+def test_records_one_entry_per_step():
+    instrumentation = Instrumentation()
+    sim = SimulationController(headless=True, seed=5, instrumentation=instrumentation)
+    sim.run(steps=5)
+
+    records = instrumentation.records
+    assert [record["step"] for record in records] == list(range(1, sim.step_count + 1))
+    assert set(records[0]) == set(FIELDS)
+    assert records[0]["hunters_processed"] > 0
+    assert records[0]["knights_processed"] == len(sim.knights)
+    assert records[0]["radius_queries"] > 0
+    assert records[0]["total_time"] >= records[0]["hunters_time"]
+    assert instrumentation.totals()["steps"] == len(records)
+
+
+def test_astar_counts_calls_and_nodes():
+    grid = Grid(size=10)
+    grid.instrumentation = Instrumentation()
+    path = astar(grid, (0, 0), (3, 0))
+    assert len(path) == 3
+    assert grid.instrumentation.counters["astar_calls"] == 1
+    assert grid.instrumentation.counters["astar_nodes"] >= 4
+
+
+def test_render_time_lands_in_the_step_record():
+    class Observer:
+        def render(self):
+            pass
+
+        def is_closed(self):
+            return False
+
+    instrumentation = Instrumentation()
+    sim = SimulationController(headless=True, seed=5, observer=Observer(), instrumentation=instrumentation)
+    sim.run(steps=2)
+    assert all(record["render_time"] > 0 for record in instrumentation.records)
+
+
+def test_streams_csv_and_jsonl(tmp_path):
+    for name in ("steps.csv", "steps.jsonl"):
+        path = str(tmp_path / name)
+        instrumentation = Instrumentation(path)
+        sim = SimulationController(headless=True, seed=5, instrumentation=instrumentation)
+        sim.run(steps=3)
+        instrumentation.close()
+
+        with open(path) as handle:
+            if name.endswith(".csv"):
+                rows = list(csv.DictReader(handle))
+            else:
+                rows = [json.loads(line) for line in handle]
+        assert [int(row["step"]) for row in rows] == list(range(1, sim.step_count + 1))
+
+
+def test_disabled_by_default():
+    sim = SimulationController(headless=True, seed=5)
+    sim.run(steps=2)
+    assert sim.instrumentation is None and sim.grid.instrumentation is None
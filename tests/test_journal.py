@@ -0,0 +1,120 @@
+import pytest
+
+from controllers.checkpoint import load_checkpoint, save_checkpoint
+from controllers.simulation_controller import SimulationController
+from utils.enums import EventType
+from utils.journal import Journal, Replayer
+
+
+@pytest.fixture
+def recorded(tmp_path):
+    path = str(tmp_path / "run.journal")
+    journal = Journal(path)
+    sim = SimulationController(headless=True, seed=2, grid_size=25, journal=journal)
+    snapshots = {0: sim.grid.type_bytes()}
+    for _ in range(80):
+        if not sim.step():
+            break
+        snapshots[sim.step_count] = sim.grid.type_bytes()
+    journal.close()
+    with Replayer(path) as replayer:
+        yield sim, snapshots, replayer
+
+
+def test_replay_rebuilds_every_step(recorded):
+    sim, snapshots, replayer = recorded
+    assert replayer.steps == sim.step_count
+    for step in (replayer.steps, 0, 17, 3):
+        assert replayer.cell_types(step) == snapshots[step]
+    for frame in replayer.frames():
+        assert frame.cell_types == snapshots[frame.step]
+    assert frame.finished
+
+
+def test_typed_events_match_the_run(recorded):
+    sim, _, replayer = recorded
+    assert replayer.count(EventType.DETENTION) == sum(knight.detentions for knight in sim.knights)
+    assert replayer.count(EventType.STEP) == sim.step_count
+    moves = list(replayer.events(5, 5, EventType.MOVE))
+    assert moves and all(event.step == 5 and event.actor for event in moves)
+
+
+def test_deliveries_are_recorded_at_hideouts(recorded):
+    sim, _, replayer = recorded
+    hideouts = {(hideout.x, hideout.y) for hideout in sim.hideouts}
+    deliveries = list(replayer.events(event_type=EventType.DELIVERY))
+    assert deliveries and all((event.x, event.y) in hideouts for event in deliveries)
+
+
+def _world(sim):
+    """Everything journal deltas rebuild, with entities referred to by name or position."""
+    def name(entity):
+        return None if entity is None else getattr(entity, "name", (entity.x, entity.y))
+
+    hunters = {hunter for hideout in sim.hideouts for hunter in hideout.hunters}.union(sim.hunters)
+    return (
+        sim.step_count,
+        sim.grid.type_bytes(),
+        [name(sim.grid.get_cell(x, y).content) for y in range(sim.grid.size) for x in range(sim.grid.size)],
+        sorted((h.name, h.skill, h.x, h.y, h.stamina, h.alive, h.collapsing, h.resting, h.collapse_counter,
+                name(h.carrying), name(h.in_hideout), list(h.known_treasures.items()),
+                list(h.known_hideouts.items()), list(h.known_knights.items())) for h in hunters),
+        [h.name for h in sim.hunters],
+        [(k.name, k.x, k.y, k.energy, k.alive, k.resting, k.detentions, name(k.target), name(k.garrison),
+          list(k.memory.items())) for k in sim.knights],
+        [([h.name for h in hideout.hunters], [(t.x, t.y, t.value) for t in hideout.stored_treasures],
+          hideout.version, hideout.shared_version, list(hideout.known_treasures.items()),
+          list(hideout.known_hideouts.items())) for hideout in sim.hideouts],
+        [[k.name for k in garrison.knights] for garrison in sim.garrisons],
+        [(t.treasure_type, t.x, t.y, t.value, sim.treasures.due(t)) for t in sim.treasures],
+    )
+
+
+@pytest.mark.parametrize("grid_backend", ["object", "array"])
+def test_state_applies_deltas_without_simulating(tmp_path, monkeypatch, grid_backend):
+    path = str(tmp_path / "run.journal")
+    journal = Journal(path, checkpoint_interval=10)
+    sim = SimulationController(headless=True, seed=1, grid_size=25, grid_backend=grid_backend, journal=journal)
+    states = {0: _world(sim)}
+    for _ in range(45):
+        if not sim.step():
+            break
+        states[sim.step_count] = _world(sim)
+    journal.close()
+    assert sim.step_count == 45
+
+    def step(self):
+        raise AssertionError("state() must not simulate")
+
+    monkeypatch.setattr(SimulationController, "step", step)
+    with Replayer(path) as replayer:
+        assert replayer.checkpoints == [0, 10, 20, 30, 40]
+        assert replayer.count(EventType.RECRUIT) > 0
+        for step_count in (0, 5, 10, 23, 39, 45):
+            restored = replayer.state(step_count)
+            assert _world(restored) == states[step_count]
+            assert restored.metrics.alive_hunters == sum(h.alive for h in restored.hunters)
+
+
+def test_journal_continues_the_step_numbers_of_a_restored_world(tmp_path):
+    sim = SimulationController(headless=True, seed=3, grid_size=20)
+    sim.run(steps=30)
+    save_checkpoint(sim, str(tmp_path / "world.ckpt"))
+    path = str(tmp_path / "run.journal")
+    journal = Journal(path)
+    fork = load_checkpoint(str(tmp_path / "world.ckpt"), headless=True, journal=journal)
+    fork.run(steps=5)
+    journal.close()
+    with Replayer(path) as replayer:
+        assert (replayer.first_step, replayer.steps) == (30, fork.step_count)
+        assert {event.step for event in replayer.events()} == set(range(31, fork.step_count + 1))
+        assert replayer.cell_types(fork.step_count) == fork.grid.type_bytes()
+        with pytest.raises(ValueError):
+            replayer.state(fork.step_count)
+
+
+def test_rejects_other_files(tmp_path):
+    path = tmp_path / "not_a_journal"
+    path.write_bytes(b"\0" * 64)
+    with pytest.raises(ValueError):
+        Replayer(str(path))
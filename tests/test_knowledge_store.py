@@ -0,0 +1,133 @@
+import pytest
+
+from controllers.simulation_controller import SimulationController
+from models.garrison import Garrison
+from models.grid import Grid
+from models.hideout import Hideout
+from models.hunter import Hunter
+from models.knight import Knight
+from models.knowledge_store import KnowledgeStore
+from models.treasure import Treasure
+from utils.enums import HunterSkill, TreasureType
+
+
+def test_add_reports_new_positions_only():
+    store = KnowledgeStore()
+    assert store.add((1, 2))
+    assert not store.add((1, 2))
+    assert (1, 2) in store
+    assert len(store) == 1
+
+
+def test_union_keeps_newest_sighting():
+    a = KnowledgeStore()
+    a.add((1, 1), now=5)
+    b = KnowledgeStore()
+    b.add((1, 1), now=2)
+    b.add((3, 3), now=4)
+    a |= b
+    assert list(a) == [(1, 1), (3, 3)]
+    assert a.last_seen((1, 1)) == 5
+
+
+def test_expire_drops_stale_positions():
+    store = KnowledgeStore(ttl=3)
+    store.add((0, 0), now=1)
+    store.add((5, 5), now=4)
+    assert store.expire(5) == 1
+    assert list(store) == [(5, 5)]
+    assert KnowledgeStore([(1, 1)]).expire(100) == 0
+
+
+def test_hideout_shares_in_place():
+    grid = Grid(size=5)
+    hideout = Hideout(0, 0)
+    first = Hunter("Hunter-1", HunterSkill.STEALTH, 0, 0)
+    second = Hunter("Hunter-2", HunterSkill.NAVIGATION, 0, 0)
+    first.known_treasures.add((2, 2))
+    second.known_hideouts.add((4, 4))
+    store = first.known_treasures
+    hideout.add_hunter(first, grid)
+    hideout.add_hunter(second, grid)
+    hideout.share_knowledge()
+    assert first.known_treasures is store
+    assert (2, 2) in second.known_treasures
+    assert (4, 4) in first.known_hideouts
+
+
+def test_hideout_blackboard_version():
+    grid = Grid(size=5)
+    hideout = Hideout(0, 0)
+    scout = Hunter("Hunter-1", HunterSkill.STEALTH, 0, 0)
+    scout.known_treasures.add((2, 2))
+    hideout.add_hunter(scout, grid)
+    assert hideout.version == 1
+    hideout.share_knowledge()
+
+    # Nothing new: no version bump, and the newcomer still reads the blackboard on entry
+    newcomer = Hunter("Hunter-2", HunterSkill.NAVIGATION, 0, 0)
+    hideout.add_hunter(newcomer, grid)
+    assert hideout.version == hideout.shared_version == 1
+    assert (2, 2) in newcomer.known_treasures
+
+    # Knowledge outlives the hunters that brought it
+    hideout.remove_hunter(scout, grid)
+    hideout.remove_hunter(newcomer, grid)
+    late = Hunter("Hunter-3", HunterSkill.ENDURANCE, 0, 0)
+    hideout.add_hunter(late, grid)
+    assert (2, 2) in late.known_treasures
+
+
+def test_garrison_shares_knight_memory():
+    garrison = Garrison(0, 0)
+    first = Knight("Knight-1", 0, 0, None)
+    second = Knight("Knight-2", 0, 0, None)
+    first.remember((1, 1))
+    second.remember((2, 2))
+    garrison.knights.extend([first, second])
+    garrison.share_knowledge()
+    assert set(first.memory) == set(second.memory) == {(1, 1), (2, 2)}
+
+
+def test_expire_skips_positions_seen_again():
+    store = KnowledgeStore(ttl=2)
+    store.add((0, 0), now=1)
+    store.add((0, 0), now=4)
+    store.add((1, 1), now=2)
+    assert store.expire(5) == 1
+    assert list(store) == [(0, 0)]
+    assert store.expire(7) == 1 and len(store) == 0
+
+
+def test_store_is_unhashable():
+    with pytest.raises(TypeError):
+        hash(KnowledgeStore())
+
+
+def test_dropped_treasure_is_remembered_at_the_current_step():
+    sim = SimulationController(headless=True, seed=1, grid_size=6, populate=False)
+    sim.step_count = 42
+    hunter = Hunter("Hunter-1", HunterSkill.STEALTH, 2, 2)
+    hunter.carrying = Treasure(TreasureType.GOLD, 2, 2)
+    sim.grid.place_hunter(hunter)
+    hunter.drop_treasure(sim.grid, sim)
+    assert hunter.known_treasures.last_seen((2, 2)) == 42
+
+
+def test_hideout_does_not_hand_out_expired_sightings():
+    grid = Grid(size=5)
+    hideout = Hideout(0, 0)
+    ttl = hideout.config.treasure_sighting_ttl
+    scout = Hunter("Hunter-1", HunterSkill.STEALTH, 0, 0)
+    scout.known_treasures.add((2, 2), now=1)
+    hideout.post(scout, now=1)
+    assert (2, 2) in hideout.known_treasures
+
+    # The scout's stale copy is neither re-posted nor re-learned once the ttl has passed
+    late = Hunter("Hunter-2", HunterSkill.NAVIGATION, 0, 0)
+    assert not hideout.post(scout, now=ttl + 2)
+    hideout.read(late, now=ttl + 2)
+    hideout.read(scout, now=ttl + 2)
+    assert (2, 2) not in hideout.known_treasures
+    assert (2, 2) not in late.known_treasures
+    assert (2, 2) not in scout.known_treasures
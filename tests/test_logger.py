@@ -0,0 +1,66 @@
+import logging
+
+import pytest
+
+from models.hunter import Hunter
+from utils import logger
+from utils.enums import HunterSkill
+
+
+class CountingArgument:
+    def __init__(self):
+        self.formatted = 0
+
+    def __str__(self):
+        self.formatted += 1
+        return "argument"
+
+
+@pytest.fixture(autouse=True)
+def reset_logging():
+    yield
+    logger.shutdown()
+
+def test_disabled_messages_are_never_formatted():
+    argument = CountingArgument()
+    hunter = Hunter("Hunter-1", HunterSkill.STEALTH, 0, 0)
+    hunter.log("value %s", argument)
+    assert argument.formatted == 0
+    assert not hunter.log_enabled()
+
+def test_enabled_messages_reach_the_file(tmp_path):
+    path = tmp_path / "run.log"
+    logger.configure(level="debug", path=str(path))
+    Hunter("Hunter-1", HunterSkill.STEALTH, 0, 0).log("moved to (%s, %s)", 1, 2)
+    logger.shutdown()
+    assert "[Hunter] Hunter-1: moved to (1, 2)" in path.read_text()
+
+def test_category_levels_override_global_level(tmp_path):
+    path = tmp_path / "run.log"
+    logger.configure(level="info", path=str(path), categories={"knight": "off", "hunter": "debug"})
+    logger.get_logger("knight").info("knight message")
+    logger.get_logger("hunter").debug("hunter message")
+    logger.get_logger("grid").debug("grid message")
+    logger.shutdown()
+    text = path.read_text()
+    assert "hunter message" in text
+    assert "knight message" not in text
+    assert "grid message" not in text
+
+def test_batch_handler_writes_in_batches(tmp_path):
+    path = tmp_path / "batch.log"
+    handler = logger.BatchFileHandler(str(path), batch_size=3)
+    handler.setFormatter(logging.Formatter("%(message)s"))
+    for number in range(2):
+        handler.emit(logging.makeLogRecord({"msg": f"line {number}"}))
+    assert path.read_text() == ""
+    handler.emit(logging.makeLogRecord({"msg": "line 2"}))
+    assert path.read_text() == "line 0\nline 1\nline 2\n"
+    handler.close()
+
+def test_background_sink_flushes_on_shutdown(tmp_path):
+    path = tmp_path / "background.log"
+    logger.configure(level="info", path=str(path), background=True)
+    logger.log("Step %s done", 7)
+    logger.shutdown()
+    assert "Step 7 done" in path.read_text()
@@ -0,0 +1,50 @@
+from controllers.simulation_controller import SimulationController
+from utils.enums import CellType
+from utils.metrics import FIELDS, ColumnSink, CsvSink
+
+
+def _recomputed(sim):
+    stored = [treasure for hideout in sim.hideouts for treasure in hideout.stored_treasures]
+    return {
+        "alive_hunters": sum(1 for hunter in sim.hunters if hunter.alive),
+        "carriers": sum(1 for hunter in sim.hunters if hunter.carrying is not None),
+        "stored_treasures": len(stored),
+        "stored_value": round(sum(treasure.value for treasure in stored), 9),
+        "treasures_on_grid": len(sim.grid.positions_of(CellType.TREASURE)),
+        "resting_knights": sum(1 for knight in sim.knights if knight.resting),
+    }
+
+
+def test_counters_follow_the_world():
+    sim = SimulationController(headless=True, seed=3, grid_size=20)
+    running = True
+    while running and sim.step_count < 150:
+        running = sim.step()
+        record = sim.metrics.record()
+        record["stored_value"] = round(record["stored_value"], 9)
+        del record["step"]
+        assert record == _recomputed(sim)
+    assert sim.metrics.stored_treasures > 0
+
+
+def test_sinks_receive_one_record_per_step(tmp_path):
+    sim = SimulationController(headless=True, seed=1, grid_size=15)
+    received = []
+    columns = ColumnSink(chunk_size=4)
+    csv_sink = CsvSink(str(tmp_path / "metrics.csv"))
+
+    def consumer():
+        while True:
+            received.append((yield))
+
+    sim.metrics.add_sink(consumer())
+    sim.metrics.add_sink(columns)
+    sim.metrics.add_sink(csv_sink)
+    sim.run(steps=10)
+    csv_sink.close()
+
+    assert [record["step"] for record in received] == list(range(1, sim.step_count + 1))
+    assert list(columns.column("step")) == list(range(1, sim.step_count + 1))
+    lines = (tmp_path / "metrics.csv").read_text().splitlines()
+    assert lines[0].split(",") == list(FIELDS)
+    assert len(lines) == sim.step_count + 1
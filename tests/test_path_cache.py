@@ -0,0 +1,121 @@
+import pytest
+
+from ai.pathfinding.astar import astar
+from ai.pathfinding.path_cache import PathCache
+from models.grid import Grid
+from models.hideout import Hideout
+from models.hunter import Hunter
+from models.knight import Knight
+from models.treasure import Treasure
+from utils.enums import CellType, HunterSkill, TreasureType
+
+
+@pytest.fixture
+def world():
+    grid = Grid(size=10)
+    cache = PathCache(grid)
+    hunter = Hunter("Hunter-1", HunterSkill.STEALTH, 1, 1)
+    grid.place_hunter(hunter)
+    hideout = Hideout(6, 1)
+    grid.place_hideout(hideout)
+    path = astar(grid, (1, 1), (6, 1))
+    cache.store(hunter, "hideout", path)
+    return grid, cache, hunter, hideout, path
+
+
+def _step(grid, hunter, pos):
+    grid.get_cell(hunter.x, hunter.y).clear()
+    hunter.x, hunter.y = pos
+    grid.get_cell(*pos).set_transit_content(hunter, CellType.HUNTER)
+
+
+def test_followed_path_is_consumed(world):
+    grid, cache, hunter, _, path = world
+    assert list(cache.path(hunter, "hideout")) == path
+    _step(grid, hunter, path[0])
+    assert list(cache.path(hunter, "hideout")) == path[1:]
+
+
+def test_knight_on_path_invalidates(world):
+    grid, cache, hunter, _, path = world
+    grid.place_knight(Knight("Knight-1", *path[2], grid))
+    assert cache.path(hunter, "hideout") is None
+    assert not cache.watchers
+
+
+def test_hunter_passing_ahead_keeps_path(world):
+    grid, cache, hunter, _, path = world
+    other = Hunter("Hunter-2", HunterSkill.STEALTH, *path[2])
+    grid.place_hunter(other)
+    grid.get_cell(*path[2]).clear()
+    assert list(cache.path(hunter, "hideout")) == path
+
+
+def test_blocked_next_step_invalidates(world):
+    grid, cache, hunter, _, path = world
+    grid.place_hunter(Hunter("Hunter-2", HunterSkill.STEALTH, *path[0]))
+    assert cache.path(hunter, "hideout") is None
+
+
+def test_goal_check_and_kind(world):
+    grid, cache, hunter, hideout, path = world
+    hideout.capacity = 0
+    has_room = lambda pos: len(grid.get_cell(*pos).content.hunters) < grid.get_cell(*pos).content.capacity
+    assert cache.path(hunter, "hideout", has_room) is None
+
+    cache.store(hunter, "hideout", path)
+    assert cache.path(hunter, "treasure") is None
+    assert len(cache) == 0
+
+
+def test_goal_cell_change_invalidates():
+    grid = Grid(size=10)
+    cache = PathCache(grid)
+    hunter = Hunter("Hunter-1", HunterSkill.STEALTH, 1, 1)
+    grid.place_hunter(hunter)
+    grid.place_treasure(Treasure(TreasureType.GOLD, 4, 1))
+    cache.store(hunter, "treasure", astar(grid, (1, 1), (4, 1)))
+    grid.get_cell(4, 1).clear()
+    assert cache.path(hunter, "treasure") is None
+
+
+def test_chase_follows_moving_target():
+    grid = Grid(size=10)
+    cache = PathCache(grid)
+    knight = Knight("Knight-1", 1, 1, grid)
+    grid.place_knight(knight)
+    hunter = Hunter("Hunter-1", HunterSkill.STEALTH, 5, 1)
+    grid.place_hunter(hunter)
+    path = astar(grid, (1, 1), (5, 1), role="knight")
+    cache.store(knight, "hunter", path, role="knight", target=hunter)
+
+    # One step away: the path is extended onto the hunter's new cell
+    _step(grid, hunter, (6, 1))
+    assert list(cache.path(knight, "hunter")) == path + [(6, 1)]
+    # Back along the path: it is cut short instead
+    _step(grid, hunter, (5, 1))
+    assert list(cache.path(knight, "hunter")) == path
+
+    # Out of reach of the cached goal: dropped
+    _step(grid, hunter, (5, 4))
+    assert cache.path(knight, "hunter") is None
+
+
+def test_simulation_reuses_paths():
+    from controllers.simulation_controller import SimulationController
+    from utils.instrumentation import Instrumentation
+
+    instrumentation = Instrumentation()
+    sim = SimulationController(headless=True, seed=1, grid_size=40, densities={"hideout": 0.01},
+                               instrumentation=instrumentation)
+    sim.run(steps=60)
+    assert instrumentation.totals()["path_cache_hits"] > 0
+
+
+def test_default_simulation_hits_cache():
+    from controllers.simulation_controller import SimulationController
+    from utils.instrumentation import Instrumentation
+
+    instrumentation = Instrumentation()
+    SimulationController(headless=True, seed=3, instrumentation=instrumentation).run(steps=60)
+    assert instrumentation.totals()["path_cache_hits"] > 0
@@ -0,0 +1,37 @@
+import pytest
+
+from nlp import sentiment_analyzer
+
+
+@pytest.fixture(autouse=True)
+def scoring_on():
+    sentiment_analyzer.set_enabled(True)
+    sentiment_analyzer.clear_cache()
+    yield
+    sentiment_analyzer.set_enabled(True)
+
+
+def test_normalize_replaces_numbers():
+    assert sentiment_analyzer.normalize("Found treasure worth 12.5") == "Found treasure worth #"
+    assert sentiment_analyzer.normalize(" Found treasure worth 3 ") == "Found treasure worth #"
+
+
+def test_messages_differing_by_number_share_cache_entry():
+    first = sentiment_analyzer.analyze_sentiment("Found treasure worth 12.5")
+    second = sentiment_analyzer.analyze_sentiment("Found treasure worth 0.7")
+    assert first == second
+    info = sentiment_analyzer.cache_info()
+    assert info.misses == 1 and info.hits == 1
+
+
+def test_analyze_many_matches_single_calls():
+    messages = ["I'm collapsing from exhaustion.", "Found treasure worth 4", "Found treasure worth 9"]
+    expected = [sentiment_analyzer.analyze_sentiment(message) for message in messages]
+    assert sentiment_analyzer.analyze_many(messages) == expected
+
+
+def test_disabled_scoring_is_neutral():
+    sentiment_analyzer.set_enabled(False)
+    assert sentiment_analyzer.analyze_sentiment("Terrible awful day") == sentiment_analyzer.NEUTRAL
+    assert sentiment_analyzer.analyze_many(["bad", "good"]) == [0.0, 0.0]
+    assert sentiment_analyzer.cache_info().currsize == 0
@@ -0,0 +1,161 @@
+import asyncio
+import base64
+import json
+import os
+import tempfile
+
+import pytest
+
+from controllers.service import ServiceError, SimulationService
+from nlp import sentiment_analyzer
+
+
+async def _request(reader, writer, message):
+    writer.write(json.dumps(message).encode() + b"\n")
+    await writer.drain()
+    return json.loads(await reader.readline())
+
+
+def _run_with_client(scenario, path=None):
+    async def main():
+        service = SimulationService()
+        server = await service.start(port=0, path=path)
+        try:
+            if path is None:
+                port = server.sockets[0].getsockname()[1]
+                reader, writer = await asyncio.open_connection("127.0.0.1", port)
+            else:
+                reader, writer = await asyncio.open_unix_connection(path)
+            result = await scenario(reader, writer)
+            writer.close()
+            return result
+        finally:
+            server.close()
+            await server.wait_closed()
+            service.shutdown()
+
+    return asyncio.run(main())
+
+
+def test_create_step_snapshot_stream():
+    async def scenario(reader, writer):
+        created = await _request(reader, writer, {"cmd": "create", "seed": 1, "grid_size": 12, "id": "a"})
+        assert created["ok"] and created["id"] == "a"
+        sim = created["sim"]
+
+        stepped = await _request(reader, writer, {"cmd": "step", "sim": sim, "steps": 3})
+        assert stepped["step"] == 3 and stepped["metrics"]["step"] == 3
+
+        snapshot = await _request(reader, writer, {"cmd": "snapshot", "sim": sim})
+        assert len(base64.b64decode(snapshot["cells"])) == 12 * 12
+        assert sum(snapshot["counts"].values()) == 12 * 12
+
+        writer.write(json.dumps({"cmd": "stream", "sim": sim, "steps": 4, "every": 2}).encode() + b"\n")
+        messages = [json.loads(await reader.readline()) for _ in range(3)]
+        assert [message.get("event") for message in messages] == ["frame", "frame", None]
+        assert messages[-1]["step"] == 7
+
+        listed = await _request(reader, writer, {"cmd": "list"})
+        return listed["sims"]
+
+    assert _run_with_client(scenario) == [{"sim": 1, "step": 7, "running": True}]
+
+
+def test_errors_are_reported():
+    async def scenario(reader, writer):
+        writer.write(b"not json\n")
+        await writer.drain()
+        bad_json = json.loads(await reader.readline())
+        unknown = await _request(reader, writer, {"cmd": "step", "sim": 99})
+        bad_option = await _request(reader, writer, {"cmd": "create", "grid_size": 5, "hunter": 0.9})
+        return bad_json, unknown, bad_option
+
+    for response in _run_with_client(scenario):
+        assert response["ok"] is False and response["error"]
+
+
+def test_malformed_requests_keep_the_connection_open():
+    async def scenario(reader, writer):
+        created = await _request(reader, writer, {"cmd": "create", "seed": 1, "grid_size": 10})
+        sim = created["sim"]
+        responses = [await _request(reader, writer, request) for request in (
+            {"cmd": "step", "sim": sim, "steps": [2]},
+            {"cmd": "step", "sim": [sim]},
+            {"cmd": "stream", "sim": sim, "every": "x"},
+            {"cmd": "create", "densities": [1]},
+            {"cmd": "create", "grid_backend": "bogus"},
+            {"cmd": "create", "config": {"dragons": 1}},
+            ["not", "an", "object"],
+        )]
+        stepped = await _request(reader, writer, {"cmd": "step", "sim": sim, "steps": 2})
+        return responses, stepped
+
+    responses, stepped = _run_with_client(scenario)
+    for response in responses:
+        assert response["ok"] is False and response["error"]
+    assert stepped["ok"] and stepped["step"] == 2
+
+
+def test_sentiment_is_a_service_setting():
+    async def scenario():
+        service = SimulationService(sentiment=False)
+        try:
+            with pytest.raises(ServiceError):
+                await service.create({"cmd": "create", "grid_size": 10, "sentiment": True}, None)
+            await service.create({"cmd": "create", "grid_size": 10}, None)
+            return sentiment_analyzer.is_enabled()
+        finally:
+            service.shutdown()
+
+    assert asyncio.run(scenario()) is False
+
+
+def test_closed_simulation_is_not_stepped():
+    async def scenario():
+        service = SimulationService()
+        try:
+            created = await service.create({"cmd": "create", "seed": 1, "grid_size": 10}, None)
+            sim = created["sim"]
+            hosted = service.simulations[sim]
+            async with hosted.lock:
+                # A step waiting for the lock while the simulation is closed
+                step = asyncio.ensure_future(service.step({"cmd": "step", "sim": sim}, None))
+                await asyncio.sleep(0)
+                del service.simulations[sim]
+            with pytest.raises(ServiceError):
+                await step
+            return hosted.sim.step_count
+        finally:
+            service.shutdown()
+
+    assert asyncio.run(scenario()) == 0
+
+
+@pytest.mark.skipif(not hasattr(asyncio, "open_unix_connection"), reason="Unix sockets are not available")
+def test_stale_unix_socket_is_replaced():
+    import socket
+    with tempfile.TemporaryDirectory() as directory:
+        path = os.path.join(directory, "service.sock")
+        stale = socket.socket(socket.AF_UNIX)
+        stale.bind(path)
+        stale.close()  # Leaves the socket file behind, as a crashed service would
+
+        async def scenario(reader, writer):
+            return await _request(reader, writer, {"cmd": "list"})
+
+        assert _run_with_client(scenario, path=path)["ok"]
+
+
+@pytest.mark.skipif(not hasattr(asyncio, "open_unix_connection"), reason="Unix sockets are not available")
+def test_unix_socket():
+    async def scenario(reader, writer):
+        created = await _request(reader, writer, {"cmd": "create", "seed": 2, "grid_size": 10})
+        return await _request(reader, writer, {"cmd": "close", "sim": created["sim"]})
+
+    with tempfile.TemporaryDirectory() as directory:
+        assert _run_with_client(scenario, path=os.path.join(directory, "service.sock"))["ok"]
+
+
+def test_only_listens_on_localhost():
+    with pytest.raises(ValueError):
+        asyncio.run(SimulationService().start(host="0.0.0.0", port=0))
@@ -11,7 +11,7 @@ from models.hideout import Hideout
 # Fixture for a clean controller
 @pytest.fixture
 def sim():
-    controller = SimulationController()
+    controller = SimulationController(headless=True, seed=3)
     controller.hunters.clear()
     controller.knights.clear()
     controller.hideouts.clear()
@@ -40,15 +40,82 @@ def test_remove_hunter_from_list(sim):
     assert sim.grid.get_cell(0, 0).is_empty()
 
 def test_grid_initialization_size():
-    sim = SimulationController()
+    sim = SimulationController(headless=True)
     assert sim.grid.size == 20
     assert len(sim.grid.cells) == 20
     assert len(sim.grid.cells[0]) == 20
 
 def test_populate_random_grid_sets_some_entities():
-    sim = SimulationController()
+    sim = SimulationController(headless=True)
     assert len(sim.treasures) > 0
     assert len(sim.hunters) > 0
     assert len(sim.knights) > 0
     assert len(sim.hideouts) > 0
     assert len(sim.garrisons) > 0
+
+class RecordingObserver:
+    def __init__(self):
+        self.renders = 0
+
+    def render(self):
+        self.renders += 1
+
+    def is_closed(self):
+        return False
+
+def test_headless_controller_has_no_gui():
+    sim = SimulationController(headless=True)
+    assert sim.observer is None
+    assert sim.step_delay == 0
+
+def test_only_synchronous_observers_are_paced_by_default():
+    class FollowingObserver(RecordingObserver):
+        def follow(self, frames):
+            pass
+
+    assert SimulationController(observer=FollowingObserver()).step_delay == 0
+    assert SimulationController(observer=RecordingObserver()).step_delay == 0.2
+
+def test_run_notifies_observer_each_step():
+    observer = RecordingObserver()
+    sim = SimulationController(observer=observer, step_delay=0)
+    sim.run(steps=5)
+    assert sim.step_count >= 1
+    assert observer.renders in (sim.step_count, sim.step_count - 1)
+
+def test_step_returns_false_when_all_hunters_dead(sim):
+    assert sim.step() is False
+    assert sim.step_count == 1
+
+def _world_state(sim):
+    return (
+        sim.grid.cell_types(),
+        [(h.name, h.x, h.y, h.stamina, h.alive) for h in sim.hunters],
+        [(k.name, k.x, k.y, k.energy) for k in sim.knights],
+        [len(h.stored_treasures) for h in sim.hideouts],
+    )
+
+def test_same_seed_replays_the_same_run():
+    first = SimulationController(headless=True, seed=42)
+    second = SimulationController(headless=True, seed=42)
+    assert _world_state(first) == _world_state(second)
+    first.run(steps=40)
+    second.run(steps=40)
+    assert first.step_count == second.step_count
+    assert _world_state(first) == _world_state(second)
+
+def test_interleaved_simulations_do_not_disturb_each_other():
+    alone = SimulationController(headless=True, seed=3)
+    for _ in range(20):
+        alone.step()
+
+    first = SimulationController(headless=True, seed=3)
+    other = SimulationController(headless=True, seed=4)
+    for _ in range(20):
+        first.step()
+        other.step()
+    assert _world_state(first) == _world_state(alone)
+
+def test_unknown_grid_backend_is_rejected():
+    with pytest.raises(ValueError):
+        SimulationController(headless=True, grid_backend="arary")
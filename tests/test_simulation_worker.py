@@ -0,0 +1,70 @@
+import queue
+
+from controllers.simulation_controller import SimulationController
+from controllers.simulation_worker import Frame, SimulationWorker, make_frame
+from utils.enums import CellType
+
+
+def _drain(frames):
+    received = []
+    while True:
+        try:
+            received.append(frames.get_nowait())
+        except queue.Empty:
+            return received
+
+
+def test_frame_matches_grid():
+    sim = SimulationController(headless=True, seed=4)
+    frame = make_frame(sim)
+    assert frame.step == 0 and not frame.finished
+    assert isinstance(frame.cell_types, bytes)
+    assert list(frame.cell_types) == [cell_type.value for cell_type in sim.grid.cell_types()]
+    assert dict(frame.counts)[CellType.HUNTER] == len(sim.hunters)
+
+
+def test_worker_steps_in_background_and_finishes():
+    sim = SimulationController(headless=True, seed=4)
+    frames = queue.Queue()
+    worker = SimulationWorker(sim, steps=20, frames=frames)
+    worker.start()
+    worker.join(timeout=30)
+    assert not worker.is_alive()
+
+    received = _drain(frames)
+    assert received[-1].finished
+    assert received[-1].step == sim.step_count
+    assert received[-1].cell_types == sim.grid.type_bytes()
+    assert [frame.step for frame in received] == sorted(frame.step for frame in received)
+
+
+def test_worker_same_result_as_synchronous_run():
+    threaded = SimulationController(headless=True, seed=6)
+    worker = SimulationWorker(threaded, steps=30)
+    worker.start()
+    worker.join(timeout=30)
+
+    plain = SimulationController(headless=True, seed=6)
+    plain.run(steps=30)
+    assert threaded.step_count == plain.step_count
+    assert threaded.grid.type_bytes() == plain.grid.type_bytes()
+
+
+def test_full_queue_drops_oldest_frame():
+    sim = SimulationController(headless=True, seed=4)
+    worker = SimulationWorker(sim, frames=queue.Queue(maxsize=2))
+    for step in range(5):
+        worker.publish(Frame(step, b"", (), False))
+    assert [frame.step for frame in _drain(worker.frames)] == [3, 4]
+    assert worker.dropped_frames == 3
+
+
+def test_stop_ends_worker_early():
+    sim = SimulationController(headless=True, seed=4)
+    worker = SimulationWorker(sim, steps=1000, step_delay=10)
+    worker.start()
+    worker.stop()
+    worker.join(timeout=5)
+    assert not worker.is_alive()
+    assert sim.step_count <= 1
+    assert _drain(worker.frames)[-1].finished
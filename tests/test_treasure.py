@@ -19,3 +19,7 @@ def test_treasure_depletion():
     treasure.value = 0.00001
     treasure.decay()
     assert math.isclose(treasure.value, 0.0, abs_tol=1e-5)
+
+def test_entities_use_slots():
+    treasure = Treasure(TreasureType.SILVER, x=0, y=0)
+    assert not hasattr(treasure, "__dict__")
@@ -0,0 +1,62 @@
+import math
+
+from models.treasure import Treasure
+from models.treasure_pool import TreasurePool
+from utils.enums import TreasureType
+
+
+def test_value_decays_lazily_like_per_step_decay():
+    pool = TreasurePool()
+    pooled = Treasure(TreasureType.GOLD, 1, 1)
+    reference = Treasure(TreasureType.GOLD, 2, 2)
+    pool.append(pooled)
+    for _ in range(50):
+        pool.advance()
+        reference.value -= reference.value * 0.001
+    assert math.isclose(pooled.value, reference.value, rel_tol=1e-9)
+
+def test_removed_treasure_stops_decaying():
+    pool = TreasurePool()
+    treasure = Treasure(TreasureType.SILVER, 1, 1)
+    pool.append(treasure)
+    pool.advance()
+    pool.remove(treasure)
+    value = treasure.value
+    pool.advance()
+    assert treasure.value == value
+    assert treasure not in pool
+
+def test_advance_returns_depleted_treasures():
+    pool = TreasurePool()
+    keep = Treasure(TreasureType.GOLD, 1, 1)
+    drop = Treasure(TreasureType.BRONZE, 2, 2)
+    pool.append(keep)
+    pool.append(drop)
+    drop.value = 0.01001
+    assert pool.advance() == [drop]
+    assert list(pool) == [keep]
+    assert len(pool) == 1
+
+def test_depletion_step_matches_eager_decay():
+    pool = TreasurePool()
+    treasure = Treasure(TreasureType.BRONZE, 1, 1)
+    pool.append(treasure)
+    treasure.value = 0.02
+    reference = 0.02
+    steps = 0
+    while reference > 0.01:
+        reference -= reference * 0.001
+        steps += 1
+    for step in range(1, steps + 1):
+        depleted = pool.advance()
+        assert depleted == ([treasure] if step == steps else [])
+
+def test_list_operations():
+    pool = TreasurePool()
+    treasure = Treasure(TreasureType.GOLD, 1, 1)
+    pool.append(treasure)
+    pool.append(treasure)
+    assert len(pool) == 1
+    pool.clear()
+    assert len(pool) == 0
+    assert treasure.value == 13.0
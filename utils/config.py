@@ -0,0 +1,96 @@
+"""
+The rules of a world in one immutable object.
+
+A WorldConfig is handed to SimulationController and passed down to every model and controller
+that needs a rule, so runs with different rules can live side by side in one process. Being a
+frozen dataclass of numbers, it is cheap to pickle to worker processes and can key result caches.
+"""
+from dataclasses import asdict, dataclass, fields, replace
+
+from utils.constants import (
+    GARRISON_CAPACITY,
+    HIDEOUT_CAPACITY,
+    HUNTER_COLLAPSE_STEPS,
+    HUNTER_CRITICAL_STAMINA,
+    HUNTER_REST_GAIN,
+    HUNTER_STAMINA_LOSS_PER_MOVE,
+    KNIGHT_CHALLENGE_STAMINA_LOSS,
+    KNIGHT_DETAIN_STAMINA_LOSS,
+    KNIGHT_ENERGY_LOSS_PER_CHASE,
+    KNIGHT_ENERGY_LOSS_PER_MOVE,
+    KNIGHT_REST_GAIN,
+    KNIGHT_REST_THRESHOLD,
+    KNIGHT_SIGHTING_TTL,
+    RECRUIT_PROBABILITY,
+    TREASURE_DECAY_PERCENT,
+    TREASURE_SIGHTING_TTL,
+)
+
+# Share of the grid's cells populated with each entity type; the remaining cells stay empty
+DEFAULT_DENSITIES = {
+    "treasure": 0.04,
+    "knight": 0.04,
+    "hunter": 0.20,
+    "hideout": 0.10,
+    "garrison": 0.02,
+}
+
+
+@dataclass(frozen=True)
+class WorldConfig:
+    grid_size: int = 20
+    treasure_density: float = DEFAULT_DENSITIES["treasure"]
+    knight_density: float = DEFAULT_DENSITIES["knight"]
+    hunter_density: float = DEFAULT_DENSITIES["hunter"]
+    hideout_density: float = DEFAULT_DENSITIES["hideout"]
+    garrison_density: float = DEFAULT_DENSITIES["garrison"]
+
+    treasure_decay: float = TREASURE_DECAY_PERCENT
+    hunter_move_cost: float = HUNTER_STAMINA_LOSS_PER_MOVE
+    hunter_rest_gain: float = HUNTER_REST_GAIN
+    hunter_critical_stamina: float = HUNTER_CRITICAL_STAMINA
+    hunter_collapse_steps: int = HUNTER_COLLAPSE_STEPS
+    knight_move_cost: float = KNIGHT_ENERGY_LOSS_PER_MOVE
+    knight_chase_cost: float = KNIGHT_ENERGY_LOSS_PER_CHASE
+    knight_rest_threshold: float = KNIGHT_REST_THRESHOLD
+    knight_rest_gain: float = KNIGHT_REST_GAIN
+    detain_stamina_loss: float = KNIGHT_DETAIN_STAMINA_LOSS
+    challenge_stamina_loss: float = KNIGHT_CHALLENGE_STAMINA_LOSS
+    knight_sighting_ttl: int = KNIGHT_SIGHTING_TTL
+    treasure_sighting_ttl: int = TREASURE_SIGHTING_TTL
+    hideout_capacity: int = HIDEOUT_CAPACITY
+    garrison_capacity: int = GARRISON_CAPACITY
+    recruit_probability: float = RECRUIT_PROBABILITY
+
+    def __post_init__(self):
+        if self.grid_size < 1:
+            raise ValueError(f"Grid size must be positive, got {self.grid_size}")
+        if sum(self.densities.values()) > 1:
+            raise ValueError(f"Entity densities add up to more than the whole grid: {self.densities}")
+
+    @property
+    def densities(self):
+        """Densities keyed by entity name, like DEFAULT_DENSITIES."""
+        return {name: getattr(self, f"{name}_density") for name in DEFAULT_DENSITIES}
+
+    def replace(self, grid_size=None, densities=None, **changes):
+        """
+        Copy with some fields changed. Densities may be given as a partial mapping
+        keyed by entity name, e.g. replace(densities={"hunter": 0.3}).
+        """
+        if grid_size is not None:
+            changes["grid_size"] = grid_size
+        for name, density in (densities or {}).items():
+            if name not in DEFAULT_DENSITIES:
+                raise ValueError(f"Unknown entity density: {name}")
+            changes[f"{name}_density"] = density
+        return replace(self, **changes) if changes else self
+
+    def as_dict(self):
+        return asdict(self)
+
+
+# Field names a WorldConfig accepts, e.g. for parameter sweeps
+CONFIG_FIELDS = tuple(field.name for field in fields(WorldConfig))
+
+DEFAULT_CONFIG = WorldConfig()
@@ -12,12 +12,20 @@ HUNTER_CRITICAL_STAMINA = 0.06          # Below 6% → go rest
 HUNTER_REST_GAIN = 0.01                 # 1% per simulation step in hideout
 HUNTER_COLLAPSE_STEPS = 3               # Collapses after 3 steps at 0 stamina
 RECRUIT_PROBABILITY = 0.20              # 20% chance to recruit new hunter
+TREASURE_SIGHTING_TTL = 100             # Hunters and hideouts forget treasures not seen for 100 steps
 
 # === Knights ===
 KNIGHT_RADIUS = 3
 KNIGHT_ENERGY_LOSS_PER_CHASE = 0.20     # 20% energy per chase
 KNIGHT_REST_THRESHOLD = 0.20            # ≤ 20% → go rest
 KNIGHT_REST_GAIN = 0.10                 # 10% energy regained per rest step
+KNIGHT_SIGHTING_TTL = 20                # Hunters forget knights not seen for 20 steps
+KNIGHT_ENERGY_LOSS_PER_MOVE = 0.02      # 2% energy lost per plain move
+KNIGHT_DETAIN_STAMINA_LOSS = 0.05       # Detained hunters lose 5% stamina
+KNIGHT_CHALLENGE_STAMINA_LOSS = 0.20    # Challenged hunters lose 20% stamina
 
 # === Hideouts ===
 HIDEOUT_CAPACITY = 5                    # Max hunters per hideout
+
+# === Garrisons ===
+GARRISON_CAPACITY = 5                   # Max knights per garrison
@@ -28,3 +28,29 @@ class EntityStatus(Enum):
     RESTING = 2
     COLLAPSING = 3
     ELIMINATED = 4
+
+class EventType(Enum):
+    STEP = 0        # End of a step
+    CELL = 1        # A cell changed type
+    MOVE = 2
+    PICKUP = 3
+    DROP = 4
+    DETENTION = 5
+    DELIVERY = 6
+    RECRUIT = 7
+    COLLAPSE = 8
+    CHECKPOINT = 9  # A checkpoint of the world was saved; subject is its step
+    # Entity deltas, recorded by journals that save checkpoints (see controllers.deltas)
+    BIND = 10           # actor stands for the entity with id subject in the checkpoint just saved
+    SPAWN = 11          # actor joined the world; subject is its kind
+    NAME = 12           # Eight more bytes of actor's name, in x and y
+    HUNTER = 13         # Carried treasure, position and stamina
+    HUNTER_STATUS = 14  # Hideout, flags and collapse counter
+    KNIGHT = 15         # Target, position and energy
+    KNIGHT_STATUS = 16  # Garrison, flags and detentions
+    TREASURE = 17       # Epoch, position and value
+    HIDEOUT = 18        # Blackboard version and the version its residents read
+    JOIN = 19           # subject was added to a list of actor's (or the simulation's), or its due step changed
+    LEAVE = 20          # subject was removed from that list
+    KNOW = 21           # actor learned (x, y) in a knowledge store, last seen at step value
+    FORGET = 22         # actor forgot (x, y)
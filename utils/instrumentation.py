@@ -0,0 +1,111 @@
+"""
+Per-step profiling of the simulation.
+
+An Instrumentation object attached to a SimulationController (and through it to the grid)
+records how long each phase of a step took and how much work the hot paths did.
+When no instrumentation is attached the simulation only pays a None check per phase.
+"""
+import csv
+import json
+import time
+
+# Timed phases of a step, in the order they run
+PHASES = ("hunters", "knights", "treasures", "hideouts", "render")
+
+# Work counters reset every step
+COUNTERS = (
+    "hunters_processed",
+    "knights_processed",
+    "treasures_depleted",
+    "hideouts_processed",
+    "astar_calls",
+    "astar_nodes",
+    "hpa_calls",
+    "radius_queries",
+    "radius_cells_scanned",
+    "path_cache_hits",
+    "path_cache_invalidations",
+)
+
+FIELDS = ("step", "total_time") + tuple(f"{phase}_time" for phase in PHASES) + COUNTERS
+
+
+class Instrumentation:
+    """
+    Collects one record per step: {"step", "total_time", "<phase>_time", <counter>...}.
+    Records are kept in `records` and, when a path is given, streamed to a .csv or .jsonl file.
+    A record is written when the next step finishes (or on close()), so the render time of
+    the step's frame, which is measured after step() returns, ends up in the same record.
+    """
+
+    def __init__(self, path=None, keep_records=True):
+        self.keep_records = keep_records
+        self.records = []
+        self.last = None
+        self.counters = dict.fromkeys(COUNTERS, 0)
+        self.timers = dict.fromkeys(PHASES, 0.0)
+        self._step_started = None
+        self._pending = None
+
+        self._stream = None
+        self._writer = None
+        if path:
+            self._stream = open(path, "w", newline="", encoding="utf-8")
+            if path.endswith(".csv"):
+                self._writer = csv.DictWriter(self._stream, fieldnames=FIELDS)
+                self._writer.writeheader()
+
+    def count(self, name, amount=1):
+        self.counters[name] += amount
+
+    def add_time(self, phase, seconds):
+        """Add time to a phase; render time measured after a step goes to that step's record."""
+        if self._step_started is None and self.last is not None:
+            self.last[f"{phase}_time"] += seconds
+            self.last["total_time"] += seconds
+        else:
+            self.timers[phase] += seconds
+
+    def start_step(self):
+        self._step_started = time.perf_counter()
+
+    def end_step(self, step):
+        """Close the current step and return its record."""
+        record = {"step": step, "total_time": time.perf_counter() - self._step_started}
+        record.update((f"{phase}_time", seconds) for phase, seconds in self.timers.items())
+        record.update(self.counters)
+        self._step_started = None
+        self.timers = dict.fromkeys(PHASES, 0.0)
+        self.counters = dict.fromkeys(COUNTERS, 0)
+
+        self._write(self._pending)
+        self._pending = record
+        self.last = record
+        if self.keep_records:
+            self.records.append(record)
+        return record
+
+    def _write(self, record):
+        if record is None or self._stream is None:
+            return
+        if self._writer is not None:
+            self._writer.writerow(record)
+        else:
+            self._stream.write(json.dumps(record) + "\n")
+
+    def totals(self):
+        """Sum of every timer and counter over the kept records."""
+        totals = dict.fromkeys(FIELDS[1:], 0)
+        for record in self.records:
+            for name in totals:
+                totals[name] += record[name]
+        totals["steps"] = len(self.records)
+        return totals
+
+    def close(self):
+        """Write the last pending record and close the output file."""
+        self._write(self._pending)
+        self._pending = None
+        if self._stream is not None:
+            self._stream.close()
+            self._stream = None
@@ -0,0 +1,269 @@
+"""
+Append-only binary journal of what happens in a run, and a replayer for it.
+
+A Journal attached to a SimulationController (and through it to the grid) writes the grid's
+initial cell types followed by one fixed-size record per event: every cell type change plus
+typed events for moves, pickups, drops, detentions, deliveries, recruits and collapses, and a
+STEP record closing each step. Agents are identified by ids the journal hands out on first use.
+
+A Replayer reads a journal back through a memory map. It rebuilds the grid's cell types at any
+step from the CELL records alone, without running any AI or pathfinding, and keeps keyframes so
+that jumping around a long run only replays the steps since the nearest one.
+
+Those records do not describe the entities' inner state (stamina, carried treasure, hideout
+stores, knight targets, knowledge). For that, record with checkpoint_interval: the journal then
+saves a checkpoint (controllers.checkpoint) next to itself every that many steps and also records
+every step's entity deltas (controllers.deltas), and CELL records name the cell's new occupant.
+Replayer.state() restores the nearest checkpoint and applies the deltas recorded since, again
+without running any AI. Step numbers are the simulation's own, so a journal attached to a
+restored world continues them.
+"""
+import mmap
+import struct
+from collections import namedtuple
+
+from utils.enums import CellType, EventType
+
+MAGIC = b"KOEJRNL\0"
+FORMAT_VERSION = 3
+HEADER = struct.Struct("=8sHII")    # Magic, version, grid size, first step; the initial cell types follow
+RECORD = struct.Struct("=IBIIiid")  # Step, event type, actor, subject, x, y, value
+FLUSH_SIZE = 1 << 16                # Bytes buffered before they are written
+KEYFRAME_INTERVAL = 256             # Steps between the grid copies a Replayer keeps
+
+# actor and subject are journal ids (0 = none); for CELL records subject is the new CellType
+# value and for CHECKPOINT records the step the checkpoint was saved after. With entity deltas,
+# actor of a CELL record is the cell's new occupant and subject of a STEP record the pool's step.
+Event = namedtuple("Event", "step type actor subject x y value")
+
+_EVENT_TYPES = {event_type.value: event_type for event_type in EventType}
+_CELL = EventType.CELL.value
+_STEP = EventType.STEP.value
+_CHECKPOINT = EventType.CHECKPOINT.value
+
+
+def checkpoint_path(path, step):
+    """File of the checkpoint a journal at path saved after the given step."""
+    return f"{path}.{step}.ckpt"
+
+
+class Journal:
+    """
+    Writes the events of one simulation to path. Call close() when the run is over.
+    :param checkpoint_interval: also save a checkpoint when attaching and every that many steps,
+                                and record entity deltas, so Replayer.state() can rebuild whole worlds
+    """
+
+    def __init__(self, path, checkpoint_interval=None):
+        self.path = path
+        self.checkpoint_interval = checkpoint_interval
+        self.step = 1  # Step whose events are being recorded
+        self.ids = {}
+        self._sim = None
+        self._deltas = None  # controllers.deltas.DeltaRecorder, when checkpointing
+        self._buffer = bytearray()
+        self._stream = open(path, "wb")
+
+    def attach(self, grid):
+        """Write the grid's current cell types and record its changes from now on."""
+        self._sim = grid.simulation_controller
+        # Continue the simulation's step numbers, e.g. when it was restored from a checkpoint
+        first_step = self._sim.step_count if self._sim is not None else 0
+        if self.checkpoint_interval and self._sim is None:
+            raise ValueError("Checkpoints need a grid that belongs to a SimulationController")
+        self.step = first_step + 1
+        self._stream.write(HEADER.pack(MAGIC, FORMAT_VERSION, grid.size, first_step))
+        self._stream.write(grid.type_bytes())
+        grid.journal = self
+        grid.add_listener(self.cell_changed)
+        if self.checkpoint_interval:
+            # Imported here so plain journals do not load the checkpoint machinery
+            from controllers.deltas import DeltaRecorder
+            self._deltas = DeltaRecorder(self, self._sim)
+            self._checkpoint(first_step)
+
+    def id(self, entity):
+        """Journal id of an entity, assigned on first use."""
+        if entity is None:
+            return 0
+        entity_id = self.ids.get(entity)
+        if entity_id is None:
+            entity_id = self.ids[entity] = len(self.ids) + 1
+            if self._deltas is not None:
+                self._deltas.spawned(entity, entity_id)
+        return entity_id
+
+    def record(self, event_type, actor=None, subject=None, x=0, y=0, value=0.0):
+        self._buffer += RECORD.pack(self.step, event_type.value, self.id(actor), self.id(subject), x, y, value)
+
+    def write(self, event_type, actor=0, subject=0, x=0, y=0, value=0.0):
+        """Append a record whose actor and subject are already journal ids or codes."""
+        self._buffer += RECORD.pack(self.step, event_type.value, actor, subject, x, y, value)
+
+    def cell_changed(self, cell, old_type):
+        occupant = self.id(cell.content) if self._deltas is not None else 0
+        self._buffer += RECORD.pack(self.step, _CELL, occupant, cell.cell_type.value, cell.x, cell.y, 0.0)
+
+    def content_changed(self, cell):
+        """A cell got a new occupant of its current type; only entity deltas need to know."""
+        if self._deltas is not None:
+            self.cell_changed(cell, cell.cell_type)
+
+    def end_step(self):
+        pool_step = 0
+        if self._deltas is not None:
+            self._deltas.record_step()
+            pool_step = self._sim.treasures.step
+        self._buffer += RECORD.pack(self.step, _STEP, 0, pool_step, 0, 0, 0.0)
+        if self.checkpoint_interval and self.step % self.checkpoint_interval == 0:
+            self._checkpoint(self.step)
+        self.step += 1
+        if len(self._buffer) >= FLUSH_SIZE:
+            self.flush()
+
+    def _checkpoint(self, step):
+        # Imported here so plain journals do not load the checkpoint machinery
+        from controllers.checkpoint import save_checkpoint
+        checkpoint_ids = save_checkpoint(self._sim, checkpoint_path(self.path, step))
+        self._buffer += RECORD.pack(self.step, _CHECKPOINT, 0, step, 0, 0, 0.0)
+        self._deltas.bind(checkpoint_ids)
+
+    def flush(self):
+        self._stream.write(self._buffer)
+        self._buffer.clear()
+
+    def close(self):
+        if self._stream is not None:
+            self.flush()
+            self._stream.close()
+            self._stream = None
+
+
+class Replayer:
+    """Read access to a journal file: its events, and the grid as it was after any step."""
+
+    def __init__(self, path):
+        self.path = path
+        with open(path, "rb") as stream:
+            self._mapped = mmap.mmap(stream.fileno(), 0, access=mmap.ACCESS_READ)
+        magic, version, self.size, self.first_step = HEADER.unpack_from(self._mapped, 0)
+        if magic != MAGIC or version != FORMAT_VERSION:
+            self._mapped.close()
+            raise ValueError(f"{path} is not a journal this version can read")
+        self._initial = self._mapped[HEADER.size:HEADER.size + self.size * self.size]
+        self._start = HEADER.size + len(self._initial)
+
+        # Offset just past the STEP record of every step, found by scanning only the type bytes;
+        # _step_ends[i] is where the records of step first_step + i + 1 start
+        count = (len(self._mapped) - self._start) // RECORD.size
+        types = self._mapped[self._start + 4:self._start + count * RECORD.size:RECORD.size]
+        self._step_ends = [self._start]
+        index = types.find(_STEP)
+        while index != -1:
+            self._step_ends.append(self._start + (index + 1) * RECORD.size)
+            index = types.find(_STEP, index + 1)
+        # Steps after which a checkpoint was saved, read from their CHECKPOINT records
+        self.checkpoints = []
+        index = types.find(_CHECKPOINT)
+        while index != -1:
+            self.checkpoints.append(RECORD.unpack_from(self._mapped, self._start + index * RECORD.size)[3])
+            index = types.find(_CHECKPOINT, index + 1)
+        self._keyframes = {self.first_step: self._initial}
+
+    @property
+    def steps(self):
+        """Last complete step in the journal (the simulation's step count when recording stopped)."""
+        return self.first_step + len(self._step_ends) - 1
+
+    def _records(self, first_step, last_step):
+        start = self._step_ends[first_step - 1 - self.first_step]
+        stop = self._step_ends[last_step - self.first_step]
+        return RECORD.iter_unpack(self._mapped[start:stop])
+
+    def events(self, first_step=None, last_step=None, event_type=None):
+        """
+        Events of the given range of steps (inclusive, by default every step recorded),
+        optionally of one EventType only.
+        """
+        first_step = self.first_step + 1 if first_step is None else max(first_step, self.first_step + 1)
+        last_step = self.steps if last_step is None else min(last_step, self.steps)
+        if first_step > last_step:
+            return
+        wanted = None if event_type is None else event_type.value
+        for step, kind, actor, subject, x, y, value in self._records(first_step, last_step):
+            if wanted is None or kind == wanted:
+                yield Event(step, _EVENT_TYPES[kind], actor, subject, x, y, value)
+
+    def count(self, event_type, last_step=None):
+        """Number of events of a type up to a step."""
+        return sum(1 for _ in self.events(None, last_step, event_type))
+
+    def cell_types(self, step):
+        """Cell type values (row-major bytes) after the given step; first_step is the initial grid."""
+        step = max(self.first_step, min(step, self.steps))
+        base = step - (step - self.first_step) % KEYFRAME_INTERVAL
+        while base not in self._keyframes:
+            base -= KEYFRAME_INTERVAL
+        types = bytearray(self._keyframes[base])
+        size = self.size
+        for current in range(base + 1, step + 1):
+            for _, kind, _, subject, x, y, _ in self._records(current, current):
+                if kind == _CELL:
+                    types[y * size + x] = subject
+            if (current - self.first_step) % KEYFRAME_INTERVAL == 0:
+                self._keyframes[current] = bytes(types)
+        return bytes(types)
+
+    def state(self, step, **options):
+        """
+        The whole simulation as it was after the given step: restored from the nearest
+        checkpoint the journal saved at or before it, with the entity deltas recorded since
+        applied on top. Nothing is simulated; see controllers.deltas for what is rebuilt.
+        :param options: passed to controllers.checkpoint.load_world(); headless by default.
+                        A journal given here is attached once the step is rebuilt.
+        """
+        # Imported here so reading cell types does not load the simulation
+        from controllers.checkpoint import load_world
+        from controllers.deltas import replay
+        step = min(step, self.steps)
+        saved = [checkpoint for checkpoint in self.checkpoints if checkpoint <= step]
+        if not saved:
+            raise ValueError(f"{self.path} has no checkpoint at or before step {step}; "
+                             f"record it with Journal(path, checkpoint_interval=...)")
+        journal = options.pop("journal", None)
+        sim, entities = load_world(checkpoint_path(self.path, saved[-1]), **options)
+        if step > saved[-1]:
+            # The checkpoint's BIND records open the step after it
+            replay(sim, entities, self._records(saved[-1] + 1, step))
+        if journal is not None:
+            sim.journal = journal
+            journal.attach(sim.grid)
+        return sim
+
+    def frames(self, first_step=None, last_step=None):
+        """
+        Frames (see controllers.simulation_worker.Frame) of every step in the range, e.g. for
+        Gui.show_frame() to play a recorded run back without simulating it.
+        """
+        # Imported here so reading a journal does not load the threading machinery
+        from controllers.simulation_worker import Frame
+        first_step = self.first_step if first_step is None else max(first_step, self.first_step)
+        last_step = self.steps if last_step is None else min(last_step, self.steps)
+        types = bytearray(self.cell_types(first_step))
+        size = self.size
+        for step in range(first_step, last_step + 1):
+            if step > first_step:
+                for _, kind, _, subject, x, y, _ in self._records(step, step):
+                    if kind == _CELL:
+                        types[y * size + x] = subject
+            counts = tuple((cell_type, types.count(cell_type.value)) for cell_type in CellType)
+            yield Frame(step, bytes(types), counts, step == last_step)
+
+    def close(self):
+        self._mapped.close()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc_info):
+        self.close()
@@ -1,12 +1,156 @@
+"""
+Simulation logging built on the standard logging module.
+
+Every subsystem logs to its own category logger ("eldoria.hunter", "eldoria.knight", ...).
+Messages use %-style arguments, so a message below the configured level is never formatted,
+and callers that build expensive arguments guard them with enabled(). Nothing is written
+until configure() is called: by default logging is off and costs one level check per call.
+"""
+import atexit
 import logging
+import queue
+
+ROOT = "eldoria"
+OFF = logging.CRITICAL + 10
+LEVELS = {
+    "debug": logging.DEBUG,
+    "info": logging.INFO,
+    "warning": logging.WARNING,
+    "error": logging.ERROR,
+    "off": OFF,
+}
+
+_root_logger = logging.getLogger(ROOT)
+_root_logger.setLevel(OFF)
+_root_logger.propagate = False
+_root_logger.addHandler(logging.NullHandler())
+
+_listener = None
+_handlers = []
+
+
+def get_logger(category: str) -> logging.Logger:
+    """Logger of one category, e.g. get_logger("hunter")."""
+    return _root_logger.getChild(category)
+
+
+def enabled(logger: logging.Logger, level=logging.DEBUG) -> bool:
+    """True when a message at this level would be written; use it to guard costly arguments."""
+    return logger.isEnabledFor(level)
+
+
+class BatchFileHandler(logging.Handler):
+    """
+    File handler that keeps formatted lines in memory and writes them in batches,
+    instead of writing and flushing the file for every record.
+    """
+
+    def __init__(self, path, batch_size=1000, mode="w"):
+        super().__init__()
+        self.stream = open(path, mode, encoding="utf-8")
+        self.batch_size = batch_size
+        self.buffer = []
+
+    def emit(self, record):
+        try:
+            self.buffer.append(self.format(record))
+            if len(self.buffer) >= self.batch_size:
+                self.flush()
+        except Exception:
+            self.handleError(record)
+
+    def flush(self):
+        self.acquire()
+        try:
+            if self.buffer and self.stream:
+                self.stream.write("\n".join(self.buffer) + "\n")
+                self.stream.flush()
+                self.buffer.clear()
+        finally:
+            self.release()
+
+    def close(self):
+        self.acquire()
+        try:
+            self.flush()
+            if self.stream:
+                self.stream.close()
+                self.stream = None
+        finally:
+            self.release()
+        super().close()
+
+
+def configure(level="info", path="simulation.log", categories=None, batch_size=1000,
+              background=False, console=False):
+    """
+    Set up simulation logging.
+    :param level: name from LEVELS or a logging level number; "off" disables logging entirely
+    :param path: log file, written in batches of batch_size lines; None for no file
+    :param categories: optional mapping of category -> level overriding the global level,
+                       e.g. {"knight": "off", "hunter": "debug"}
+    :param background: write the file from a background thread fed by a queue
+    :param console: also echo records to stderr
+    """
+    shutdown()
+
+    level = LEVELS[level] if isinstance(level, str) else level
+    _root_logger.setLevel(level)
+    for category, category_level in (categories or {}).items():
+        category_level = LEVELS[category_level] if isinstance(category_level, str) else category_level
+        get_logger(category).setLevel(category_level)
+
+    if level >= OFF and not categories:
+        return
+
+    formatter = logging.Formatter("%(asctime)s - %(levelname)s - %(name)s - %(message)s")
+    sinks = []
+    if path:
+        sinks.append(BatchFileHandler(path, batch_size=batch_size))
+    if console:
+        sinks.append(logging.StreamHandler())
+    for sink in sinks:
+        sink.setFormatter(formatter)
+
+    global _listener
+    if background and sinks:
+        # Imported here: logging.handlers pulls in socket and pickle, which plain runs never need
+        from logging.handlers import QueueHandler, QueueListener
+        records = queue.SimpleQueue()
+        _listener = QueueListener(records, *sinks, respect_handler_level=True)
+        _listener.start()
+        front = [QueueHandler(records)]
+    else:
+        front = sinks
+
+    for handler in front:
+        _root_logger.addHandler(handler)
+    _handlers.extend(front)
+    _handlers.extend(sink for sink in sinks if sink not in front)
+
+
+def shutdown():
+    """Flush and detach every handler installed by configure() and switch logging off."""
+    global _listener
+    if _listener is not None:
+        _listener.stop()
+        _listener = None
+    for handler in _handlers:
+        _root_logger.removeHandler(handler)
+        handler.close()
+    _handlers.clear()
+    _root_logger.setLevel(OFF)
+    for name, logger in list(logging.root.manager.loggerDict.items()):
+        if name.startswith(ROOT + ".") and isinstance(logger, logging.Logger):
+            logger.setLevel(logging.NOTSET)
+
+
+atexit.register(shutdown)
+
+_default_logger = get_logger("simulation")
 
-# Set up logging config
-logging.basicConfig(
-    filename="simulation.log",
-    level=logging.INFO,
-    format="%(asctime)s - %(levelname)s - %(message)s"
-)
 
-def log(message: str):
-    print(message)
-    logging.info(message)
+def log(message: str, *args, level=logging.INFO):
+    """Log a message in the "simulation" category."""
+    if _default_logger.isEnabledFor(level):
+        _default_logger.log(level, message, *args)
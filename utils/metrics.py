@@ -0,0 +1,154 @@
+"""
+Per-step outcome metrics, kept up to date incrementally.
+
+The simulation's Metrics object counts alive hunters, hunters carrying treasure, stored
+treasures and their value, treasures lying on the grid and resting knights. The counters are
+adjusted as agents change state (the controllers report what processing an agent changed, and
+the grid reports cell changes), so reading them, and checking whether the run is over, costs
+O(1) instead of a scan over every hunter and hideout.
+
+After every step one record is pushed to each sink added with add_sink(): any callable,
+a generator waiting on send(), or one of the sinks below.
+"""
+import csv
+from array import array
+
+from utils.enums import CellType
+
+FIELDS = (
+    "step",
+    "alive_hunters",
+    "carriers",
+    "stored_treasures",
+    "stored_value",
+    "treasures_on_grid",
+    "resting_knights",
+)
+
+
+class Metrics:
+    def __init__(self, sim):
+        self.sim = sim
+        self.sinks = []
+        self.recount()
+        sim.grid.metrics = self
+        sim.grid.add_listener(self.cell_changed)
+
+    def recount(self):
+        """Compute every counter from scratch, e.g. after a world was restored."""
+        sim = self.sim
+        self.alive_hunters = sum(1 for hunter in sim.hunters if hunter.alive)
+        self.carriers = sum(1 for hunter in sim.hunters if hunter.carrying is not None)
+        stored = [treasure for hideout in sim.hideouts for treasure in hideout.stored_treasures]
+        self.stored_treasures = len(stored)
+        self.stored_value = sum(treasure.value for treasure in stored)
+        self.treasures_on_grid = len(sim.grid.positions_of(CellType.TREASURE))
+        self.resting_knights = sum(1 for knight in sim.knights if knight.resting)
+
+    # --- State transitions ---
+
+    def hunter_changed(self, hunter, carrying, alive):
+        """A hunter was processed; carrying and alive are its values from before."""
+        if hunter.alive != alive:
+            self.alive_hunters += 1 if hunter.alive else -1
+        if (hunter.carrying is None) != (carrying is None):
+            self.carriers += 1 if carrying is None else -1
+
+    def treasure_stored(self, treasure):
+        self.stored_treasures += 1
+        self.stored_value += treasure.value
+
+    def hunter_removed(self, hunter):
+        """A hunter left the simulation's list of hunters."""
+        if hunter.alive:
+            self.alive_hunters -= 1
+        if hunter.carrying is not None:
+            self.carriers -= 1
+
+    def knight_changed(self, knight, resting):
+        if knight.resting != resting:
+            self.resting_knights += 1 if knight.resting else -1
+
+    def cell_changed(self, cell, old_type):
+        if old_type == CellType.TREASURE:
+            self.treasures_on_grid -= 1
+        if cell.cell_type == CellType.TREASURE:
+            self.treasures_on_grid += 1
+
+    # --- Queries and output ---
+
+    def finished(self):
+        """True when no treasure is left in play or no hunter is alive."""
+        no_active_treasure = len(self.sim.treasures) == 0 and self.carriers == 0
+        return no_active_treasure or self.alive_hunters == 0
+
+    def record(self):
+        return {
+            "step": self.sim.step_count,
+            "alive_hunters": self.alive_hunters,
+            "carriers": self.carriers,
+            "stored_treasures": self.stored_treasures,
+            "stored_value": self.stored_value,
+            "treasures_on_grid": self.treasures_on_grid,
+            "resting_knights": self.resting_knights,
+        }
+
+    def add_sink(self, sink):
+        """Push every step's record to sink: a callable, or a generator receiving it via send()."""
+        if hasattr(sink, "send"):
+            next(sink)  # Run the generator up to its first yield
+            sink = sink.send
+        self.sinks.append(sink)
+
+    def end_step(self):
+        if not self.sinks:
+            return
+        record = self.record()
+        for sink in self.sinks:
+            sink(record)
+
+
+class CsvSink:
+    """Writes every record as a row of a CSV file."""
+
+    def __init__(self, path):
+        self._stream = open(path, "w", newline="", encoding="utf-8")
+        self._writer = csv.DictWriter(self._stream, fieldnames=FIELDS)
+        self._writer.writeheader()
+
+    def __call__(self, record):
+        self._writer.writerow(record)
+
+    def close(self):
+        self._stream.close()
+
+
+class ColumnSink:
+    """
+    Collects records column by column into fixed-size chunks of typed arrays, ready for
+    columnar analysis; the chunk being filled is `current`, full ones are in `chunks`.
+    """
+
+    def __init__(self, chunk_size=1024):
+        self.chunk_size = chunk_size
+        self.chunks = []
+        self.current = self._new_chunk()
+
+    def _new_chunk(self):
+        return {name: array("d" if name == "stored_value" else "q") for name in FIELDS}
+
+    def __call__(self, record):
+        current = self.current
+        for name in FIELDS:
+            current[name].append(record[name])
+        if len(current["step"]) >= self.chunk_size:
+            self.chunks.append(current)
+            self.current = self._new_chunk()
+
+    def column(self, name):
+        """All values of one field collected so far."""
+        values = array(self.current[name].typecode)
+        for chunk in self.chunks:
+            values.extend(chunk[name])
+        values.extend(self.current[name])
+        return values
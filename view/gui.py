@@ -1,10 +1,15 @@
+import queue
 import tkinter as tk
 from tkinter import messagebox
-from models.cell import Cell
 from utils.enums import CellType
 
 
 class Gui(tk.Tk):
+    # Largest side of the drawn world in pixels; bigger grids get smaller cells
+    MAX_CANVAS_SIZE = 800
+    # Milliseconds between two polls of the frame queue when following a background worker
+    FRAME_INTERVAL = 40
+
     def __init__(self, grid, sim_controller):
         super().__init__()
         self.grid_data = grid
@@ -13,7 +18,7 @@ class Gui(tk.Tk):
         self.protocol("WM_DELETE_WINDOW", self.on_closing)
         self.__closed = False
 
-        self.cell_size = 25
+        self.cell_size = max(1, min(25, self.MAX_CANVAS_SIZE // grid.size))
         self.color_map = {
             CellType.EMPTY: "white",
             CellType.HUNTER: "blue",
@@ -22,49 +27,108 @@ class Gui(tk.Tk):
             CellType.HIDEOUT: "green",
             CellType.GARRISON: "purple"  # Added color for garrison
         }
+        self.color_by_code = {cell_type.value: color for cell_type, color in self.color_map.items()}
 
-        self.grid_frame = tk.Frame(self)
-        self.grid_frame.pack()
+        canvas_size = self.cell_size * grid.size
+        self.canvas = tk.Canvas(self, width=canvas_size, height=canvas_size, highlightthickness=0)
+        self.canvas.pack()
 
         self.legend_panel = tk.Frame(self)
         self.legend_panel.pack(pady=10)
 
-        self._draw_legend()
-        self._draw_grid()
-
-    def _draw_legend(self):
-        for widget in self.legend_panel.winfo_children():
-            widget.destroy()
+        self.legend_texts = {}
+        self._build_legend()
+        self._build_grid()
 
-        counts = self._count_entities()
+        # Cell types currently drawn, used to diff incoming frames in follow mode
+        self.shown_types = grid.type_bytes()
+        self.frames = None
 
+    def _build_legend(self):
+        """Create the legend widgets once; render() only updates their text."""
         for cell_type, color in self.color_map.items():
             color_box = tk.Label(self.legend_panel, bg=color, width=2, height=1, relief="solid")
-            label = tk.Label(
-                self.legend_panel,
-                text=f"{cell_type.name.title()} ({counts.get(cell_type, 0)})"
-            )
+            text = tk.StringVar()
+            label = tk.Label(self.legend_panel, textvariable=text)
             color_box.pack(side=tk.LEFT, padx=5)
             label.pack(side=tk.LEFT, padx=5)
-
-    def _draw_grid(self):
-        for widget in self.grid_frame.winfo_children():
-            widget.destroy()
-
-        for y in range(self.grid_data.size):
-            for x in range(self.grid_data.size):
+            self.legend_texts[cell_type] = text
+        self._update_legend()
+
+    def _update_legend(self, counts=None):
+        counts = counts if counts is not None else self._count_entities()
+        for cell_type, text in self.legend_texts.items():
+            text.set(f"{cell_type.name.title()} ({counts.get(cell_type, 0)})")
+
+    def _build_grid(self):
+        """Draw one rectangle item per cell on the single canvas."""
+        size = self.grid_data.size
+        cell_size = self.cell_size
+        outline = "black" if cell_size >= 4 else ""
+        self.cell_items = []
+        for y in range(size):
+            for x in range(size):
                 cell = self.grid_data.get_cell(x, y)
-                color = self.color_map.get(cell.cell_type, "gray")
-                canvas = tk.Canvas(self.grid_frame, width=self.cell_size, height=self.cell_size,
-                                   bg=color, bd=1, relief="solid")
-                canvas.grid(row=y, column=x)
+                self.cell_items.append(self.canvas.create_rectangle(
+                    x * cell_size, y * cell_size, (x + 1) * cell_size, (y + 1) * cell_size,
+                    fill=self.color_map.get(cell.cell_type, "gray"), outline=outline))
+
+    def _recolor(self, positions):
+        size = self.grid_data.size
+        for x, y in positions:
+            cell = self.grid_data.get_cell(x, y)
+            self.canvas.itemconfigure(self.cell_items[y * size + x],
+                                      fill=self.color_map.get(cell.cell_type, "gray"))
 
     def render(self):
-        self._draw_legend()
-        self._draw_grid()
+        if self.grid_data.dirty is None:
+            # First synchronous render: from now on the grid records which cells change, so
+            # later renders only recolor those. Follow mode diffs frames and never tracks.
+            self.grid_data.track_changes()
+            size = self.grid_data.size
+            self._recolor([(x, y) for y in range(size) for x in range(size)])
+        else:
+            self._recolor(self.grid_data.pop_dirty())
+        self._update_legend()
         self.update()
         self.update_idletasks()
 
+    def follow(self, frames):
+        """
+        Display frames published on a queue by a SimulationWorker.
+        The queue is polled from the Tk event loop; frames that arrived since the last poll
+        are skipped so only the newest one is drawn.
+        """
+        self.frames = frames
+        self.after(self.FRAME_INTERVAL, self._poll_frames)
+
+    def _poll_frames(self):
+        if self.__closed:
+            return
+        latest = None
+        try:
+            while True:
+                latest = self.frames.get_nowait()
+        except queue.Empty:
+            pass
+        if latest is not None:
+            self.show_frame(latest)
+        if latest is None or not latest.finished:
+            self.after(self.FRAME_INTERVAL, self._poll_frames)
+
+    def show_frame(self, frame):
+        """Recolor the cells whose type differs from the last drawn frame and update the legend."""
+        types = frame.cell_types
+        shown = self.shown_types
+        if types != shown:
+            colors = self.color_by_code
+            for index, (new, old) in enumerate(zip(types, shown)):
+                if new != old:
+                    self.canvas.itemconfigure(self.cell_items[index], fill=colors.get(new, "gray"))
+            self.shown_types = types
+        self._update_legend(dict(frame.counts))
+        self.title(f"Knights of Eldoria - step {frame.step}" + (" (finished)" if frame.finished else ""))
+
     def on_closing(self):
         """Handle the window close event with confirmation dialog."""
         if messagebox.askokcancel("Quit", "Do you want to quit?"):
@@ -77,24 +141,4 @@ class Gui(tk.Tk):
 
     def _count_entities(self):
         """Count entities based on simulation controller lists."""
-        hunters = len(self.sim_controller.hunters)
-        knights = len(self.sim_controller.knights)
-        hideouts = len(self.sim_controller.hideouts)
-        garrisons = len(self.sim_controller.garrisons)
-        treasures_on_grid = len(self.sim_controller.treasures)
-        treasures = treasures_on_grid
-
-        # Calculate empty cells
-        total_cells = self.grid_data.size * self.grid_data.size
-        non_empty_cells = hunters + knights + hideouts + garrisons + treasures
-        empty = total_cells - non_empty_cells
-
-        counts = {
-            CellType.EMPTY: empty,
-            CellType.HUNTER: hunters,
-            CellType.KNIGHT: knights,
-            CellType.HIDEOUT: hideouts,
-            CellType.GARRISON: garrisons,
-            CellType.TREASURE: treasures,
-        }
-        return counts
+        return self.sim_controller.entity_counts()